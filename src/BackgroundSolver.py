@@ -0,0 +1,116 @@
+"""
+Runs a JobScheduler solve in a background thread and streams its improving solutions.
+
+The solver calls SolutionStreamer on every improving solution, and it keeps the objective, bound
+and raw values, so the app can poll the latest schedule while the search goes on. Stopping keeps
+the best schedule found so far, which is then viewed and validated like any other solve.
+"""
+import threading
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from SolutionViewer import SolutionViewer
+
+
+class SolutionStreamer(cp_model.CpSolverSolutionCallback):
+    """Records every improving solution so another thread can read the latest one."""
+
+    def __init__(self):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.schedule_model = None  # Set by JobScheduler._solve to the model being solved
+        self.history = []
+        self.stop_requested = False
+        self._solution = None
+        self._lock = threading.Lock()
+
+    def on_solution_callback(self):
+        point = {
+            'solution': len(self.history) + 1,
+            'objective': self.ObjectiveValue(),
+            'best_bound': self.BestObjectiveBound(),
+            'wall_time': self.WallTime(),
+        }
+        solution = np.asarray(self.response_proto.solution, dtype=np.int64)
+        with self._lock:
+            self.history.append(point)
+            self._solution = solution
+        if self.stop_requested:
+            self.StopSearch()
+
+    def latest(self):
+        """
+        The latest solution, or None before the first one arrives.
+
+        Returns:
+            dict: 'solution' (its count), 'objective', 'best_bound', 'wall_time' and 'schedule_df'.
+        """
+        with self._lock:
+            if not self.history:
+                return None
+            point, solution, model = self.history[-1], self._solution, self.schedule_model
+        schedule_df = SolutionViewer(None, model, solution=solution).generate_schedule_df()
+        return {**point, 'schedule_df': schedule_df}
+
+    def get_history(self):
+        """Objective and bound of every improving solution, in order."""
+        with self._lock:
+            return list(self.history)
+
+
+class BackgroundSolve:
+    """A JobScheduler.schedule_jobs call running in its own thread, which can be polled and stopped early."""
+
+    def __init__(self, scheduler, **schedule_kwargs):
+        """
+        Args:
+            scheduler: JobScheduler to solve with.
+            schedule_kwargs: Passed on to scheduler.schedule_jobs (e.g. cache, model).
+        """
+        self.scheduler = scheduler
+        self.schedule_kwargs = schedule_kwargs
+        self.streamer = SolutionStreamer()
+        self.solver = cp_model.CpSolver()
+        self.started = None
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started = time.time()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self._result = self.scheduler.schedule_jobs(solution_callback=self.streamer, solver=self.solver, **self.schedule_kwargs)
+        except Exception as e:
+            self._error = e
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def stop(self):
+        """Stops the search; the best schedule found so far becomes the result."""
+        self.streamer.stop_requested = True
+        self.solver.StopSearch()
+
+    def progress(self):
+        """Latest improving solution (see SolutionStreamer.latest), or None before the first one."""
+        return self.streamer.latest()
+
+    def result(self, timeout=None):
+        """
+        Waits for the solve to finish.
+
+        Returns:
+            Same as JobScheduler.schedule_jobs. Errors raised by the solve are raised here.
+        """
+        self._thread.join(timeout)
+        if self.running:
+            raise TimeoutError("Solve is still running")
+        if self._error is not None:
+            raise self._error
+        return self._result
@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 from test import test_data
 
 
@@ -13,6 +14,9 @@ def load_data(**kwargs):
         max_roster_df = load_and_set_index(kwargs.get('max_roster_file'), "Names", "Max Roster")
         proficiency_df = load_and_set_index(kwargs.get('proficiency_file'), "Names", "Proficiency")
 
+        # Previously generated schedule, used to warm start the solver
+        previous_schedule_df = load_and_set_index(kwargs.get('previous_schedule_file'), "Job", "Previous Schedule")
+
     except ValueError as e:
         raise ValueError(str(e))  # Handle invalid file format or empty file errors
 
@@ -25,6 +29,7 @@ def load_data(**kwargs):
     # Custom dfs
     data_dict['max_roster_df'] = max_roster_df
     data_dict['proficiency_df'] = proficiency_df
+    data_dict['previous_schedule_df'] = previous_schedule_df
     filtered_data_dict = {k: v for k, v in data_dict.items() if v is not None}
 
     test_data(**filtered_data_dict)
@@ -54,13 +59,146 @@ def get_data(**kwargs):
     return data_dict
 
 
+def get_masks(availability_df, skills_df, all_members, all_weeks, all_jobs, proficiency_df=None, max_roster_df=None):
+    """
+    Precomputes aligned NumPy arrays used to build and check the schedule model.
+
+    Rows follow all_members, and columns follow all_weeks or all_jobs, so model
+    construction can work on integer indices instead of label lookups.
+
+    Returns:
+        dict: availability_mask (M x W bool), skills_mask (M x J bool),
+              proficiency_matrix (M x J int), feasible_mask (M x W x J bool)
+              and max_roster_limits (M int, -1 for no limit).
+    """
+    availability_mask = availability_df.reindex(index=all_members, columns=all_weeks).fillna(False).to_numpy(dtype=bool)
+    skills_mask = skills_df.reindex(index=all_members, columns=all_jobs).fillna(False).to_numpy(dtype=bool)
+
+    if isinstance(proficiency_df, pd.DataFrame):
+        proficiency_matrix = proficiency_df.reindex(index=all_members, columns=all_jobs).fillna(0).to_numpy(dtype=np.int64)
+    else:
+        # If proficiency_df not present, just take all proficiency as 1
+        proficiency_matrix = np.ones((len(all_members), len(all_jobs)), dtype=np.int64)
+
+    if isinstance(max_roster_df, pd.DataFrame):
+        max_roster_limits = max_roster_df["max_roster"].reindex(all_members).fillna(-1).to_numpy(dtype=np.int64)
+    else:
+        max_roster_limits = np.full(len(all_members), -1, dtype=np.int64)
+
+    # A shift is feasible only if the member is available that week and has the skill
+    feasible_mask = availability_mask[:, :, None] & skills_mask[:, None, :]
+
+    return {
+        'availability_mask': availability_mask,
+        'skills_mask': skills_mask,
+        'proficiency_matrix': proficiency_matrix,
+        'feasible_mask': feasible_mask,
+        'max_roster_limits': max_roster_limits,
+    }
+
+
+def get_components(skills_mask, all_members, all_jobs):
+    """
+    Splits members and jobs into the connected components of the member-job skills graph.
+
+    Members in different components never compete for the same job, so each component can be
+    scheduled on its own when no objective term links them.
+
+    Returns:
+        list of dict: One {'members': [...], 'jobs': [...]} per component. Members with no skills
+                      and jobs nobody can do form components of their own.
+    """
+    n_members, n_jobs = skills_mask.shape
+    member_component = np.full(n_members, -1)
+    job_component = np.full(n_jobs, -1)
+    components = []
+
+    for start in range(n_members):
+        if member_component[start] != -1:
+            continue
+        component = len(components)
+        member_component[start] = component
+        frontier = np.array([start])
+        # Alternate between the jobs the frontier can do and the members who can do those jobs
+        while frontier.size:
+            jobs = np.flatnonzero(skills_mask[frontier].any(axis=0) & (job_component == -1))
+            job_component[jobs] = component
+            frontier = np.flatnonzero(skills_mask[:, jobs].any(axis=1) & (member_component == -1))
+            member_component[frontier] = component
+        components.append({
+            'members': [all_members[i] for i in np.flatnonzero(member_component == component)],
+            'jobs': [all_jobs[i] for i in np.flatnonzero(job_component == component)],
+        })
+
+    for j_idx in np.flatnonzero(job_component == -1):
+        components.append({'members': [], 'jobs': [all_jobs[j_idx]]})
+
+    return components
+
+
+def get_member_classes(*member_arrays):
+    """
+    Groups members whose rows are identical in every given array, so they are interchangeable.
+
+    Args:
+        member_arrays: Arrays whose first axis follows all_members, e.g. availability_mask (M x W),
+                       skills_mask (M x J), proficiency_matrix (M x J) and max_roster_limits (M).
+
+    Returns:
+        list of np.ndarray: Member indices of each class with two or more members, in index order.
+    """
+    n_members = len(member_arrays[0])
+    signature = np.concatenate([np.asarray(a).reshape(n_members, -1).astype(np.int64) for a in member_arrays], axis=1)
+    _, class_index = np.unique(signature, axis=0, return_inverse=True)
+    class_index = class_index.ravel()
+    order = np.argsort(class_index, kind="stable")
+    classes = np.split(order, np.flatnonzero(np.diff(class_index[order])) + 1)
+    return [members for members in classes if len(members) > 1]
+
+
+def get_assignments(schedule_df, all_weeks):
+    """
+    Lists the (member, week, job) assignments in a schedule shaped like SolutionViewer.generate_schedule_df.
+
+    Week columns are matched to all_weeks by their string form, and columns for other weeks are ignored.
+
+    Returns:
+        tuple: (assignments, weeks) where assignments is a list of (member, week, job)
+               and weeks lists the weeks of all_weeks that the schedule covers.
+    """
+    if "Job" in schedule_df.columns:
+        schedule_df = schedule_df.set_index("Job")
+    week_lookup = {str(w): w for w in all_weeks}
+    weeks = [week_lookup[str(col)] for col in schedule_df.columns if str(col) in week_lookup]
+    schedule_df = schedule_df.rename(columns=lambda col: week_lookup.get(str(col), col))
+
+    assignments = [
+        (m, w, j)
+        for w in weeks
+        for j, m in schedule_df[w].dropna().items()
+    ]
+    return assignments, weeks
+
+
+def get_schedule_df(assignments, all_weeks, all_jobs):
+    """
+    Builds a schedule DataFrame (a Job column plus one column per week) from (member, week, job) assignments.
+
+    This is the inverse of get_assignments, in the shape SolutionViewer.generate_schedule_df returns.
+    """
+    schedule = pd.DataFrame(np.nan, index=pd.Index(all_jobs, name="Job"), columns=[f"{w}" for w in all_weeks], dtype=object)
+    for m, w, j in assignments:
+        schedule.loc[j, f"{w}"] = m
+    return schedule.reset_index()
+
+
 def load_and_set_index(file, column_name, df_name="DataFrame"):
     """
-    Loads a CSV or Excel file into a DataFrame, checks if the specified column exists,
+    Loads a CSV, Excel or Parquet file into a DataFrame, checks if the specified column exists,
     sets it as the index, and returns the modified DataFrame.
 
     Args:
-        file (UploadedFile or None): The uploaded file object, or None.
+        file (UploadedFile, str or None): The uploaded file object, a file path (CSV, XLSX or Parquet), or None.
         column_name (str): The column to set as the index.
         df_name (str): Optional name of the DataFrame for error messages.
 
@@ -75,8 +213,14 @@ def load_and_set_index(file, column_name, df_name="DataFrame"):
         return None
 
     try:
-        # Load the file into a DataFrame
-        if file.type == "text/csv":
+        # Load the file into a DataFrame (plain paths have no MIME type, so use the extension)
+        file_name = str(getattr(file, "name", file)).lower()
+        file_type = getattr(file, "type", None)
+        if file_type is None and file_name.endswith(".csv"):
+            file_type = "text/csv"
+        if file_name.endswith(".parquet"):
+            df = pd.read_parquet(file)
+        elif file_type == "text/csv":
             df = pd.read_csv(file, index_col=0)
         else:
             df = pd.read_excel(file, index_col=0)
@@ -0,0 +1,243 @@
+"""
+Checks that a roster can be filled at all, and explains why when it cannot.
+
+Only three hard rules can make ScheduleModel infeasible: every crucial job is filled every week,
+a member does at most one job a week, and nobody goes over their max roster. check_feasibility
+tests necessary conditions for them on the NumPy masks, before the CP model is built: someone
+eligible for every crucial slot, a matching of each week's crucial jobs to distinct members
+(Hall's condition), and enough max roster capacity for each crucial job. When those pass but the
+solve still fails, find_infeasibility_core decides exactly with a small CP-SAT model in which each
+crucial slot and each max roster limit is an assumption, and returns a set of them that cannot
+all hold.
+"""
+import numpy as np
+from ortools.sat.python import cp_model
+
+ISSUE_MESSAGES = {
+    'no_eligible_member': "Crucial jobs nobody available, skilled and under their max roster can do",
+    'not_enough_members': "Weeks where crucial jobs share too few people to fill them all",
+    'max_roster_shortfall': "Crucial jobs needing more assignments than max roster limits allow",
+}
+
+
+class InfeasibleRosterError(ValueError):
+    """Raised when no schedule can satisfy the hard rules; report holds the details."""
+
+    def __init__(self, message, report=None):
+        super().__init__(message)
+        self.report = report
+
+    def __reduce__(self):
+        return type(self), (str(self), self.report)
+
+
+def check_feasibility(variable_mask, crucial_mask, all_members, all_weeks, all_jobs, max_roster_limits=None, fixed_mask=None):
+    """
+    Tests cheap necessary conditions for filling every crucial job, week by week.
+
+    Args:
+        variable_mask (np.ndarray): M x W x J bool, cells that can still be assigned (available,
+                                    skilled, free, and not taken by a fixed assignment).
+        crucial_mask (np.ndarray): J bool, jobs that must be filled every week.
+        all_members, all_weeks, all_jobs (list): Labels the masks are aligned to.
+        max_roster_limits (np.ndarray): M int, -1 for no limit. None skips the max roster check.
+        fixed_mask (np.ndarray): M x W x J bool assignments already made, which fill their job and
+                                 count towards their member's limit.
+
+    Returns:
+        dict: 'feasible' (bool) and 'issues', a dict from rule name (see ISSUE_MESSAGES) to a list of records.
+    """
+    n_members, n_weeks, n_jobs = variable_mask.shape
+    if fixed_mask is None:
+        fixed_mask = np.zeros_like(variable_mask)
+
+    # Assignments each member can still take (a fixed assignment over the limit allows no more)
+    limited = max_roster_limits is not None and (max_roster_limits >= 0).any()
+    remaining = np.full(n_members, n_weeks)
+    if limited:
+        remaining = np.where(max_roster_limits >= 0, np.maximum(max_roster_limits - fixed_mask.sum(axis=(1, 2)), 0), n_weeks)
+
+    # Crucial slots a fixed assignment has not already filled, and who can take them
+    open_slots = np.asarray(crucial_mask, dtype=bool)[None, :] & ~fixed_mask.any(axis=0)  # W x J
+    eligible = variable_mask & open_slots[None, :, :] & (remaining > 0)[:, None, None]
+    counts = eligible.sum(axis=0)
+
+    issues = {
+        'no_eligible_member': [
+            {'week': all_weeks[w], 'job': all_jobs[j]} for w, j in np.argwhere(open_slots & (counts == 0))
+        ],
+        'not_enough_members': [],
+        'max_roster_shortfall': [],
+    }
+
+    for w in range(n_weeks):
+        jobs = np.flatnonzero(counts[w] > 0)
+        if len(jobs) < 2:
+            continue
+        deficient_jobs, shared_members = _hall_violation(eligible[:, w, jobs])
+        if deficient_jobs:
+            issues['not_enough_members'].append({
+                'week': all_weeks[w],
+                'jobs': [all_jobs[jobs[j]] for j in deficient_jobs],
+                'members': [all_members[m] for m in shared_members],
+                'shortfall': len(deficient_jobs) - len(shared_members),
+            })
+
+    if limited:
+        # Slots nobody can take are already reported, so only coverable slots count as demand
+        coverable = counts > 0
+        for j in np.flatnonzero(coverable.any(axis=0)):
+            demand = int(coverable[:, j].sum())
+            capacity = int(np.minimum(remaining, eligible[:, :, j].sum(axis=1)).sum())
+            if capacity < demand:
+                issues['max_roster_shortfall'].append(
+                    {'job': all_jobs[j], 'demand': demand, 'capacity': capacity, 'shortfall': demand - capacity})
+        # Across all crucial jobs a member still takes at most one per week
+        demand = int(coverable.sum())
+        capacity = int(np.minimum(remaining, (eligible & coverable[None, :, :]).any(axis=2).sum(axis=1)).sum())
+        if capacity < demand and not issues['max_roster_shortfall']:
+            issues['max_roster_shortfall'].append(
+                {'job': "all crucial jobs", 'demand': demand, 'capacity': capacity, 'shortfall': demand - capacity})
+
+    return {
+        'feasible': not any(issues.values()),
+        'issues': issues,
+    }
+
+
+def _hall_violation(eligible):
+    """
+    Finds crucial jobs that cannot all get different members, via a maximum bipartite matching.
+
+    Args:
+        eligible (np.ndarray): M x K bool, who can take each of K jobs in one week.
+
+    Returns:
+        (list, list): Job and member indices of a set of jobs with fewer members between them than
+                      jobs (empty lists if every job can be matched).
+    """
+    job_members = [np.flatnonzero(eligible[:, k]).tolist() for k in range(eligible.shape[1])]
+    matched_job = {}  # Member -> job
+
+    def augment(k, seen):
+        for m in job_members[k]:
+            if m not in seen:
+                seen.add(m)
+                if m not in matched_job or augment(matched_job[m], seen):
+                    matched_job[m] = k
+                    return True
+        return False
+
+    unmatched = [k for k in range(len(job_members)) if not augment(k, set())]
+    if not unmatched:
+        return [], []
+
+    # Jobs reachable from an unmatched job by alternating paths all compete for the same members,
+    # who are all matched (otherwise the matching could grow)
+    jobs, members = set(unmatched), set()
+    frontier = list(unmatched)
+    while frontier:
+        for m in job_members[frontier.pop()]:
+            if m not in members:
+                members.add(m)
+                jobs.add(matched_job[m])
+                frontier.append(matched_job[m])
+    return sorted(jobs), sorted(members)
+
+
+def find_infeasibility_core(variable_mask, crucial_mask, all_members, all_weeks, all_jobs, max_roster_limits=None,
+                            fixed_mask=None, time_limit=10.0, num_workers=0):
+    """
+    Decides exactly whether the crucial jobs can be filled, and if not, which demands conflict.
+
+    Only crucial slots get variables. Filling each slot and respecting each max roster limit is
+    enforced by its own assumption literal, so an infeasible solve yields a set of slots and limits
+    that cannot all hold together (sufficient, not necessarily minimal).
+
+    Args:
+        Same as check_feasibility, plus:
+        time_limit: Seconds before giving up (status UNKNOWN).
+        num_workers: CP-SAT search workers (0 lets CP-SAT decide).
+
+    Returns:
+        dict: 'status' (CP-SAT status name), and for INFEASIBLE, 'slots' ({'week', 'job'} records)
+              and 'limits' ({'member', 'max_roster'} records) in the conflicting set.
+    """
+    if fixed_mask is None:
+        fixed_mask = np.zeros_like(variable_mask)
+    open_slots = np.asarray(crucial_mask, dtype=bool)[None, :] & ~fixed_mask.any(axis=0)
+    eligible = variable_mask & open_slots[None, :, :]
+
+    model = cp_model.CpModel()
+    cells = np.argwhere(eligible)
+    shifts = [model.NewBoolVar("") for _ in range(len(cells))]
+    by_slot, by_member_week, by_member = {}, {}, {}
+    for shift, (m, w, j) in zip(shifts, cells.tolist()):
+        by_slot.setdefault((w, j), []).append(shift)
+        by_member_week.setdefault((m, w), []).append(shift)
+        by_member.setdefault(m, []).append(shift)
+
+    assumptions, records = [], {}
+    for w, j in np.argwhere(open_slots).tolist():
+        literal = model.NewBoolVar(f"fill_{w}_{j}")
+        slot_shifts = by_slot.get((w, j), [])
+        model.AddBoolOr(slot_shifts).OnlyEnforceIf(literal)
+        model.AddAtMostOne(slot_shifts)
+        assumptions.append(literal)
+        records[literal.Index()] = {'week': all_weeks[w], 'job': all_jobs[j]}
+    for member_shifts in by_member_week.values():
+        model.AddAtMostOne(member_shifts)
+    if max_roster_limits is not None:
+        fixed_per_member = fixed_mask.sum(axis=(1, 2))
+        for m in np.flatnonzero(max_roster_limits >= 0).tolist():
+            if m in by_member:
+                literal = model.NewBoolVar(f"limit_{m}")
+                remaining = max(int(max_roster_limits[m] - fixed_per_member[m]), 0)
+                model.Add(sum(by_member[m]) <= remaining).OnlyEnforceIf(literal)
+                assumptions.append(literal)
+                records[literal.Index()] = {'member': all_members[m], 'max_roster': int(max_roster_limits[m])}
+    model.AddAssumptions(assumptions)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(time_limit)
+    solver.parameters.num_workers = int(num_workers)
+    status = solver.Solve(model)
+    result = {'status': solver.StatusName(status)}
+    if status == cp_model.INFEASIBLE:
+        core = [records[i] for i in solver.SufficientAssumptionsForInfeasibility()]
+        result['slots'] = [record for record in core if 'job' in record]
+        result['limits'] = [record for record in core if 'member' in record]
+    return result
+
+
+def describe_issues(report, max_examples=5):
+    """Readable summary of a check_feasibility report, one line per broken rule."""
+    lines = []
+    for rule, records in report['issues'].items():
+        if records:
+            examples = ", ".join(_describe(record) for record in records[:max_examples])
+            more = f" (and {len(records) - max_examples} more)" if len(records) > max_examples else ""
+            lines.append(f"{ISSUE_MESSAGES[rule]}: {examples}{more}")
+    return "\n".join(lines)
+
+
+def describe_core(core, max_examples=10):
+    """Readable summary of a find_infeasibility_core result."""
+    if core['status'] != "INFEASIBLE":
+        return f"Feasibility check ended {core['status']}"
+    slots = ", ".join(f"{record['job']} on {record['week']}" for record in core['slots'][:max_examples])
+    more = f" (and {len(core['slots']) - max_examples} more)" if len(core['slots']) > max_examples else ""
+    line = f"These crucial slots cannot all be filled together: {slots}{more}"
+    if core['limits']:
+        limits = ", ".join(f"{record['member']} (max {record['max_roster']})" for record in core['limits'][:max_examples])
+        line += f"\nunder the max roster limits of {limits}"
+    return line
+
+
+def _describe(record):
+    if 'jobs' in record:
+        return (f"{record['week']}: {', '.join(record['jobs'])} can only go to {', '.join(record['members'])} "
+                f"(short by {record['shortfall']})")
+    if 'demand' in record:
+        return f"{record['job']} needs {record['demand']} but limits allow {record['capacity']}"
+    return f"{record['job']} on {record['week']}"
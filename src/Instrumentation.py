@@ -0,0 +1,133 @@
+"""
+Measures where a solve spends its time and how big the model it solves is.
+
+PhaseTimer records a wall-clock span per phase (file parsing, variable creation, constraints,
+objective, CP-SAT presolve and search, solution extraction, charts, validation). model_stats and
+solver_stats describe the CP-SAT model and response, including the presolve reductions read from
+the solve log that SolverConfig keeps in the response.
+"""
+import json
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# CpSolverResponse fields copied into solver_stats
+RESPONSE_FIELDS = [
+    'num_booleans', 'num_fixed_booleans', 'num_integers', 'num_conflicts', 'num_branches',
+    'num_binary_propagations', 'num_integer_propagations', 'num_restarts', 'num_lp_iterations',
+    'wall_time', 'user_time', 'deterministic_time', 'gap_integral',
+]
+
+
+class PhaseTimer:
+    """Accumulates wall-clock seconds per named phase, in the order the phases first ran."""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def span(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def copy(self):
+        timer = PhaseTimer()
+        timer.phases = dict(self.phases)
+        return timer
+
+
+def model_stats(model):
+    """
+    Size of a CP-SAT model.
+
+    Returns:
+        dict: Variable counts by kind (boolean, integer, constant), total and largest domain size,
+              objective terms, and constraint counts in total and by type.
+    """
+    proto = model.Proto()
+    domain_sizes = []
+    booleans = 0
+    for variable in proto.variables:
+        bounds = list(variable.domain)
+        size = sum(bounds[i + 1] - bounds[i] + 1 for i in range(0, len(bounds), 2))
+        domain_sizes.append(size)
+        booleans += bounds == [0, 1]
+    constants = sum(size == 1 for size in domain_sizes)
+    constraint_types = Counter(c.WhichOneof('constraint') for c in proto.constraints)
+    return {
+        'variables': len(proto.variables),
+        'boolean_variables': booleans,
+        'integer_variables': len(domain_sizes) - booleans - constants,
+        'constant_variables': constants,
+        'total_domain_size': sum(domain_sizes),
+        'max_domain_size': max(domain_sizes, default=0),
+        'objective_terms': len(proto.objective.vars),
+        'constraints': len(proto.constraints),
+        'constraints_by_type': dict(constraint_types.most_common()),
+    }
+
+
+def presolve_stats(solve_log):
+    """
+    Model size before and after presolve, and presolve time, read from a CP-SAT solve log.
+
+    Returns:
+        dict: Empty if there is no log; sizes are None when presolve did not run.
+    """
+    if not solve_log:
+        return {}
+    sections = {'initial': {}, 'presolved': {}}
+    section = None
+    for line in solve_log.splitlines():
+        if line.startswith("Initial optimization model"):
+            section = sections['initial']
+        elif line.startswith("Presolved optimization model"):
+            section = sections['presolved']
+        elif not line.strip():
+            section = None
+        elif section is not None:
+            match = re.match(r"#(\w+): ([\d']+)", line)
+            if match:
+                section[match.group(1)] = int(match.group(2).replace("'", ""))
+
+    def size(counts):
+        if not counts:
+            return None, None
+        return counts.get('Variables'), sum(n for name, n in counts.items() if name.startswith('k'))
+
+    stats = {}
+    stats['initial_variables'], stats['initial_constraints'] = size(sections['initial'])
+    stats['presolved_variables'], stats['presolved_constraints'] = size(sections['presolved'])
+    stats['presolve_rules_applied'] = sum(int(n) for n in re.findall(r"was applied (\d+) time", solve_log.replace("'", "")))
+    search_start = re.search(r"Starting search at ([\d.]+)s", solve_log)
+    stats['presolve_time'] = float(search_start.group(1)) if search_start else None
+    return stats
+
+
+def solver_stats(solver):
+    """
+    Search statistics of a finished CP-SAT solve: conflicts, branches, propagations, times and presolve.
+
+    Returns:
+        dict: The RESPONSE_FIELDS, solution_info, and presolve_stats of the response's solve log.
+    """
+    response = solver.ResponseProto()
+    stats = {name: getattr(response, name) for name in RESPONSE_FIELDS}
+    stats['solution_info'] = response.solution_info
+    stats.update(presolve_stats(response.solve_log))
+    if stats.get('presolve_time') is not None:
+        stats['search_time'] = max(0.0, response.wall_time - stats['presolve_time'])
+    return stats
+
+
+def write_json_log(path, record):
+    """Appends record as one line of JSON to path (JSON Lines), with a timestamp."""
+    with open(path, "a") as f:
+        f.write(json.dumps({'time': time.time(), **record}, default=str) + "\n")
@@ -1,8 +1,28 @@
+import dataclasses
+import os
+import time
 from ortools.sat.python import cp_model
-from test import test_solution, test_data
+import numpy as np
+import pandas as pd
+from test import validate_solution, check_report
 import DataProcessor
-from ScheduleModel import ScheduleModel
+from ScheduleModel import ScheduleModel, OBJECTIVE_WEIGHTS, fix_variables, set_solution_hint
+from SolverConfig import SolverConfig
 from SolutionViewer import SolutionViewer
+from ResultCache import make_key
+from Instrumentation import PhaseTimer, model_stats, solver_stats, write_json_log
+from FeasibilityCheck import InfeasibleRosterError, check_feasibility, describe_issues, find_infeasibility_core, describe_core
+from QuickRoster import QuickRoster
+from NeighborhoodSearch import NeighborhoodSearch
+from ModelTemplate import ModelTemplate
+
+# Seconds spent looking for the conflicting crucial slots after a solve finds no schedule
+INFEASIBILITY_CORE_TIME_LIMIT = 10.0
+# Ways schedule_jobs can build a schedule: the exact CP-SAT model, QuickRoster's heuristic, or
+# large neighbourhood search with CP-SAT on parts of the model
+ENGINES = ["cp-sat", "quick", "lns"]
+# Default seconds of QuickRoster local search, as a quick engine or as a hint for CP-SAT
+QUICK_TIME_LIMIT = 0.5
 
 class JobScheduler:
     """Encapsulates job scheduling logic."""
@@ -16,22 +36,495 @@ class JobScheduler:
             skills_mapping_file: Path to the skills file.
             jobs_file: Path to the jobs file.
             model_kwargs: Additional keyword arguments for the model.
+            solver_config: SolverConfig (or dict of its settings) for time limit, workers, gap, seed and presolve.
+            previous_schedule_file: Optional previously generated schedule, used as a warm start hint.
+            instrumentation_log: Optional path of a JSON Lines file each solve's instrumentation is appended to.
+            engine: "cp-sat" (default) to solve exactly, "quick" for QuickRoster's heuristic (see schedule_jobs_quick),
+                    or "lns" for large neighbourhood search (see schedule_jobs_lns).
+            lns_workers: Neighbourhoods the "lns" engine solves at once, each in its own process (default 1).
+            quick_hint: Start CP-SAT from a QuickRoster schedule, unless a previous schedule is hinted already.
+            quick_time_limit: Seconds of QuickRoster local search (default QUICK_TIME_LIMIT).
+        """
+        timer = PhaseTimer()
+        with timer.span('load_data'):
+            data = DataProcessor.get_data(**kwargs)
+        self._set_data(data, timer)
+
+    @classmethod
+    def from_data(cls, data):
+        """Creates a JobScheduler from a data dictionary shaped like DataProcessor.get_data's output."""
+        scheduler = cls.__new__(cls)
+        scheduler._set_data(data)
+        return scheduler
+
+    def _set_data(self, data, timer=None):
+        self.data = data
+        self.timer = timer if timer is not None else PhaseTimer()  # Phases before any model is built
+        self.solve_info = None
+        self.hint_info = None
+        self.reroster_info = None
+        self.rolling_info = None
+        self.decomposition_info = None
+        self.validation_report = None
+        self.objective_breakdown = None
+        self.metrics = None
+        self.cache_info = None
+        self.instrumentation = None
+        self.feasibility_report = None
+        self.quick_info = None
+        self.lns_info = None
+
+    def build_model(self):
+        """Builds the ScheduleModel for this data, so it can be kept and passed back to schedule_jobs."""
+        return ScheduleModel(**self.data)
+
+    def build_template(self, variable_names=False):
+        """Builds a ModelTemplate for this data's members, weeks, jobs and skills, to pass to schedule_jobs for any availability."""
+        return ModelTemplate(self.data, variable_names=variable_names)
+
+    def schedule_jobs(self, cache=None, model=None, solution_callback=None, solver=None, charts=True):
+        """
+        Solves the scheduling problem and returns a DataFrame of the schedule.
+
+        If the solver's time limit is hit, the best roster found so far is returned; its
+        status, objective, bound and gap are kept in self.solve_info.
+
+        Args:
+            cache: Optional ResultCache. On a hit the search is skipped and the cached schedule is
+                   only evaluated for the charts; on a miss the new result is stored.
+            model: Optional ScheduleModel from build_model on the same input files. It is cloned and
+                   given this data's weights and solver settings instead of being rebuilt. Or a
+                   ModelTemplate from build_template, which also takes this data's availability; if
+                   the data does not match it, a new model is built.
+            solution_callback: Optional SolutionStreamer that receives every improving solution.
+            solver: Optional CpSolver to solve with, so the search can be stopped from another thread.
+            charts: Build the plotly figures. Without them plotly is never imported and the figures are None.
+
+        Phase timings, model size and CP-SAT search statistics of the solve are kept in self.instrumentation.
+        With data['engine'] set to "quick" or "lns", this is schedule_jobs_quick or schedule_jobs_lns
+        (cache and model are not used).
+
+        Raises:
+            InfeasibleRosterError: A ValueError, raised before the model is built when a crucial job
+                                   cannot be filled, or after a failed solve, naming the dates and jobs.
+        """
+        self.quick_info = None
+        self.lns_info = None
+        engine = self.data.get('engine') or "cp-sat"
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        if engine == "quick":
+            return self.schedule_jobs_quick(solution_callback=solution_callback, solver=solver, charts=charts)
+        if engine == "lns":
+            return self.schedule_jobs_lns(max_workers=self.data.get('lns_workers'), solution_callback=solution_callback,
+                                          solver=solver, charts=charts)
+
+        if cache is None:
+            return self._solve(self._get_model(model), solution_callback=solution_callback, solver=solver, charts=charts)
+
+        key = make_key(self.data)
+        entry = cache.get(key)
+        if entry is None:
+            result = self._solve(self._get_model(model), solution_callback=solution_callback, solver=solver, charts=charts)
+            cache.put(key, result[0], self.objective_breakdown, self.solve_info)
+            self.cache_info = {'key': key, 'hit': False}
+            return result
+
+        # Every assignment is fixed, so solving the full model just rebuilds the charts
+        print("Reusing cached schedule")
+        all_members, all_weeks, all_jobs = self.data['all_members'], self.data['all_weeks'], self.data['all_jobs']
+        assignments, _ = DataProcessor.get_assignments(entry['schedule_df'], all_weeks)
+        data = {k: v for k, v in self.data.items() if k != 'previous_schedule_df'}
+        full_model = ScheduleModel(**data, fixed_assignments=assignments,
+                                   free_mask=np.zeros((len(all_members), len(all_weeks), len(all_jobs)), dtype=bool))
+        result = self._solve(full_model, solution_callback=solution_callback, solver=solver, charts=charts)
+        self.solve_info = entry['solve_info']
+        self.objective_breakdown = entry['objective_breakdown']
+        self.cache_info = {'key': key, 'hit': True, 'created': entry['created']}
+        return (entry['schedule_df'],) + result[1:]
+
+    def _get_model(self, model=None):
+        """Builds a fresh ScheduleModel, instantiates a template, or re-weights a clone of a prebuilt model, and hints it if asked to."""
+        if isinstance(model, ModelTemplate):
+            if model.matches(self.data):
+                model = model.instantiate(self.data)
+            else:
+                print("Model template does not match this data, building a new model")
+                model = self.build_model()
+        elif model is None:
+            model = self.build_model()
+        else:
+            model = model.clone()
+            model.solver_config = SolverConfig.from_value(self.data.get('solver_config'))
+            model.set_objective_weights(**{name: self.data.get(name) for name in OBJECTIVE_WEIGHTS.values()})
+        if self.data.get('quick_hint') and model.hint_info is None:
+            with model.timer.span('quick_hint'):
+                quick = QuickRoster.from_model(model, seed=self._quick_seed())
+                hinted = model.hint_assignment(quick.solve(self.data.get('quick_time_limit') or QUICK_TIME_LIMIT))
+            self.quick_info = {**quick.info, 'hinted_assignments': hinted}
+        return model
+
+    def schedule_jobs_quick(self, solution_callback=None, solver=None, charts=True):
+        """
+        Builds the schedule with QuickRoster's greedy construction and local search instead of CP-SAT.
+
+        It takes about data['quick_time_limit'] seconds (default QUICK_TIME_LIMIT) whatever the size,
+        so it suits first drafts and rosters too big to solve exactly. The schedule is then evaluated
+        and validated like a solved one; its status is FEASIBLE with no bound or gap, and QuickRoster's
+        objective, timings and move counts are kept in self.quick_info.
+
+        Returns:
+            Same as schedule_jobs.
+
+        Raises:
+            InfeasibleRosterError: A crucial job cannot be filled at all.
+            ValueError: QuickRoster left a crucial job empty that the exact solver may still fill.
+        """
+        all_members, all_weeks, all_jobs = self.data['all_members'], self.data['all_weeks'], self.data['all_jobs']
+        timer = self.timer.copy()
+        with timer.span('quick_roster'):
+            quick = QuickRoster.from_data(self.data, seed=self._quick_seed())
+            self.feasibility_report = check_feasibility(
+                quick.eligible, quick.crucial_mask, all_members, all_weeks, all_jobs, max_roster_limits=quick.max_roster_limits,
+            )
+            if not self.feasibility_report['feasible']:
+                raise InfeasibleRosterError("\nNo solution found:\n" + describe_issues(self.feasibility_report), self.feasibility_report)
+            assignment = quick.solve(self.data.get('quick_time_limit') or QUICK_TIME_LIMIT)
+        self.quick_info = quick.info
+        if quick.info['unfilled_crucial']:
+            raise ValueError(f"\nNo solution found: the quick roster left {quick.info['unfilled_crucial']} crucial jobs empty. Try the exact solver.")
+
+        # Every assignment is fixed, so solving the full model just evaluates the quick roster
+        assignments = [(all_members[m], all_weeks[w], all_jobs[j]) for m, w, j in np.argwhere(assignment).tolist()]
+        data = {k: v for k, v in self.data.items() if k != 'previous_schedule_df'}
+        full_model = ScheduleModel(**data, fixed_assignments=assignments,
+                                   free_mask=np.zeros((len(all_members), len(all_weeks), len(all_jobs)), dtype=bool))
+        result = self._solve(full_model, solution_callback=solution_callback, solver=solver, charts=charts, timer=timer)
+        self.solve_info = {**self.solve_info, 'status': "FEASIBLE", 'best_bound': None, 'gap': None,
+                           'wall_time': quick.info['construction_time'] + quick.info['search_time']}
+        return result
+
+    def schedule_jobs_lns(self, time_limit=None, max_workers=None, sub_time_limit=None, solution_callback=None, solver=None, charts=True):
+        """
+        Builds the schedule by large neighbourhood search (see NeighborhoodSearch) instead of one CP-SAT solve.
+
+        Starting from a QuickRoster schedule, blocks of weeks, sets of members or sets of jobs are
+        re-solved in turn with the rest of the roster fixed. On rosters too big for CP-SAT to improve
+        as a whole this finds better schedules in the same time. The result has status FEASIBLE with
+        no bound or gap, and the objective-over-time history is kept in self.lns_info.
+
+        Args:
+            time_limit: Seconds to search (default: the solver_config time limit).
+            max_workers: Neighbourhoods solved at once, each in its own process (default 1).
+            sub_time_limit: Seconds per neighbourhood (default NeighborhoodSearch.SUB_TIME_LIMIT).
+
+        Returns:
+            Same as schedule_jobs.
+        """
+        model = self.build_model()
+        if time_limit is None:
+            time_limit = model.solver_config.max_time_in_seconds or 60.0
+        search_kwargs = {'sub_time_limit': sub_time_limit} if sub_time_limit is not None else {}
+        search = NeighborhoodSearch(model, max_workers=max_workers, seed=self._quick_seed(), **search_kwargs)
+        with model.timer.span('neighborhood_search'):
+            solution = search.run(time_limit)
+        self.lns_info = search.info
+
+        # Every shift is now fixed, so solving the model just evaluates the searched roster
+        fix_variables(model.model, model.shift_var_indices, solution[model.shift_var_indices])
+        set_solution_hint(model.model, solution)
+        result = self._solve(model, solution_callback=solution_callback, solver=solver, charts=charts)
+        self.solve_info = {**self.solve_info, 'status': "FEASIBLE", 'best_bound': None, 'gap': None, 'wall_time': search.info['wall_time']}
+        return result
+
+    def _quick_seed(self):
+        return SolverConfig.from_value(self.data.get('solver_config')).random_seed or 0
+
+    def reroster(self, previous_schedule, availability_changes=None, skill_changes=None, frozen_before=None, window_radius=1, churn_weight=1000):
+        """
+        Re-solves only the weeks affected by availability or skill changes, keeping the rest of a schedule.
+
+        Assignments outside the affected window are fixed as constants (no variables are created for them),
+        so fairness and back-to-back terms still see the whole horizon while the solver only searches the window.
+
+        Args:
+            previous_schedule: Schedule DataFrame as returned by schedule_jobs, or an uploaded schedule file.
+            availability_changes: dict {(member, week): bool} of changed availability cells.
+            skill_changes: dict {(member, job): bool} of changed skill cells.
+            frozen_before: Week label; earlier weeks are history and never change (changes to them are ignored).
+            window_radius: Number of neighbouring weeks around each affected week that may also change.
+            churn_weight: Objective penalty for each previous assignment in the window that is not kept.
+
+        Returns:
+            Same as schedule_jobs. The window and churn versus the previous schedule are kept in self.reroster_info.
+        """
+        if isinstance(previous_schedule, pd.DataFrame):
+            previous_schedule_df = previous_schedule
+        else:
+            previous_schedule_df = DataProcessor.load_and_set_index(previous_schedule, "Job", "Previous Schedule")
+        all_weeks = self.data['all_weeks']
+        frozen_weeks = set(all_weeks[:all_weeks.index(frozen_before)]) if frozen_before is not None else set()
+        previous_assignments, previous_weeks = DataProcessor.get_assignments(previous_schedule_df, all_weeks)
+
+        # Apply the changes to copies of the data, and collect the weeks they touch
+        availability_df = self.data['availability_df'].copy()
+        skills_df = self.data['skills_df'].copy()
+        affected_weeks = {w for w in all_weeks if w not in previous_weeks and w not in frozen_weeks}
+        for (m, w), available in (availability_changes or {}).items():
+            if w in frozen_weeks:
+                continue
+            availability_df.loc[m, w] = available
+            affected_weeks.add(w)
+        for (m, j), skilled in (skill_changes or {}).items():
+            skills_df.loc[m, j] = skilled
+            affected_weeks.update(w for pm, w, pj in previous_assignments if (pm, pj) == (m, j) and w not in frozen_weeks)
+
+        # Widen each affected week by window_radius so back-to-back swaps around it are possible
+        window_weeks = set()
+        for w in affected_weeks:
+            w_idx = all_weeks.index(w)
+            window_weeks.update(all_weeks[max(0, w_idx - window_radius):w_idx + window_radius + 1])
+        window_weeks -= frozen_weeks
+
+        free_weeks = np.array([w in window_weeks for w in all_weeks])
+        free_mask = np.broadcast_to(free_weeks[None, :, None], (len(self.data['all_members']), len(all_weeks), len(self.data['all_jobs'])))
+        fixed_assignments = [(m, w, j) for m, w, j in previous_assignments if w not in window_weeks]
+
+        data = {**self.data, 'availability_df': availability_df, 'skills_df': skills_df}
+        model = ScheduleModel(
+            **data,
+            fixed_assignments=fixed_assignments,
+            free_mask=free_mask,
+            previous_schedule_df=previous_schedule_df,
+            churn_weight=churn_weight,
+        )
+        print(f"Re-rostering {len(window_weeks)} of {len(all_weeks)} weeks with {len(model.shifts)} shift variables")
+        result = self._solve(model, validate_weeks=[w for w in all_weeks if w not in frozen_weeks])
+
+        new_assignments, _ = DataProcessor.get_assignments(result[0], all_weeks)
+        changed = set(previous_assignments) ^ set(new_assignments)
+        self.reroster_info = {
+            'window_weeks': [w for w in all_weeks if w in window_weeks],
+            'fixed_assignments': len(fixed_assignments),
+            'shift_variables': len(model.shifts),
+            'removed_assignments': sorted(set(previous_assignments) - set(new_assignments)),
+            'added_assignments': sorted(set(new_assignments) - set(previous_assignments)),
+            'churn': len(changed),
+        }
+        return result
+
+    def schedule_jobs_rolling(self, window_size=8, overlap=2):
+        """
+        Solves the schedule as a sequence of overlapping windows of window_size weeks.
+
+        Each window is solved with the committed prefix fixed as constants, so assignment counts and
+        last-week-rostered state carry across window boundaries. The last overlap weeks of every window
+        (except the final one) are not committed and get re-solved as the start of the next window.
+
+        Returns:
+            Same as schedule_jobs. Per-window results and the full-horizon objective of the
+            combined schedule are kept in self.rolling_info.
+        """
+        if window_size < 1 or not 0 <= overlap < window_size:
+            raise ValueError("Rolling horizon needs window_size >= 1 and 0 <= overlap < window_size")
+
+        all_weeks = self.data['all_weeks']
+        n_members, n_jobs = len(self.data['all_members']), len(self.data['all_jobs'])
+        committed = []
+        windows = []
+        start = 0
+        while start < len(all_weeks):
+            end = min(start + window_size, len(all_weeks))
+            commit_end = end if end == len(all_weeks) else end - overlap
+
+            # Only weeks up to the window end exist in this model, so the fairness average is pro-rated
+            data = {**self.data, 'all_weeks': all_weeks[:end], 'availability_df': self.data['availability_df'][all_weeks[:end]]}
+            free_weeks = np.arange(end) >= start
+            free_mask = np.broadcast_to(free_weeks[None, :, None], (n_members, end, n_jobs))
+            model = ScheduleModel(**data, fixed_assignments=committed, free_mask=free_mask)
+            solver, status = model.solve()
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                raise ValueError(f"\nNo solution found for weeks {all_weeks[start]} to {all_weeks[end - 1]}.")
+
+            commit_weeks = set(all_weeks[start:commit_end])
+            committed += [key for key in model.get_assignments(solver.ResponseProto().solution) if key[1] in commit_weeks]
+            windows.append({'start': all_weeks[start], 'end': all_weeks[end - 1], **model.solve_info})
+            print(f"Window {all_weeks[start]} to {all_weeks[end - 1]}: {model.solve_info['status']} in {model.solve_info['wall_time']:.2f}s")
+            start = commit_end
+
+        # Every assignment is now fixed, so solving the full model just evaluates the combined schedule
+        full_model = ScheduleModel(**self.data, fixed_assignments=committed, free_mask=np.zeros((n_members, len(all_weeks), n_jobs), dtype=bool))
+        result = self._solve(full_model)
+        self.rolling_info = {
+            'windows': windows,
+            'objective': self.solve_info['objective'],
+            'wall_time': sum(window['wall_time'] for window in windows),
+        }
+        return result
+
+    def schedule_jobs_decomposed(self, max_workers=None, fairness_scope="global"):
         """
-        self.data = DataProcessor.get_data(**kwargs)
+        Splits the roster into independent pools of members and jobs and solves them in parallel.
 
-    def schedule_jobs(self):
-        """Solves the scheduling problem and returns a DataFrame of the schedule."""
-        model = ScheduleModel(**self.data)
-        solver, status = model.solve()
+        Pools are the connected components of the skills graph. Squared deviation from a fixed average
+        is per member, so only the weekly minimum proficiency term links pools; when it is active this
+        falls back to schedule_jobs.
+
+        Args:
+            max_workers: Maximum number of solver processes (None for one per CPU, or as many as the
+                         CPUs fit when solver_config sets num_search_workers). When num_search_workers
+                         is left to CP-SAT, the CPUs are split evenly across the processes.
+            fairness_scope: "global" keeps the whole roster's average assignments as every member's
+                            target, "pool" uses each pool's own average.
+
+        Returns:
+            Same as schedule_jobs. Per-pool results are kept in self.decomposition_info.
+        """
+        if fairness_scope not in ("global", "pool"):
+            raise ValueError(f"Unknown fairness scope '{fairness_scope}', choose 'global' or 'pool'")
+
+        all_members, all_weeks, all_jobs = self.data['all_members'], self.data['all_weeks'], self.data['all_jobs']
+        skills_mask = DataProcessor.get_masks(self.data['availability_df'], self.data['skills_df'], all_members, all_weeks, all_jobs)['skills_mask']
+        components = DataProcessor.get_components(skills_mask, all_members, all_jobs)
+        pools = [c for c in components if c['members'] and c['jobs']]
+
+        if self.data.get('proficiency_deviation_weight') or len(pools) < 2:
+            print(f"Roster has {len(pools)} independent pool(s) or uses weekly proficiency, solving as one model")
+            return self.schedule_jobs()
+
+        for component in components:
+            if not component['members'] and set(component['jobs']) & set(self.data['crucial_jobs']):
+                raise ValueError(f"\nNo solution found: nobody can do crucial job(s) {component['jobs']}.")
+
+        global_avg = len(all_weeks) * len(all_jobs) // len(all_members)
+        pool_data = [
+            self._get_pool_data(pool['members'], pool['jobs'], global_avg if fairness_scope == "global" else None)
+            for pool in pools
+        ]
+        # Each process gets its share of the CPUs, rather than CP-SAT's one search worker per CPU
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        solver_config = SolverConfig.from_value(self.data.get('solver_config'))
+        if not solver_config.num_search_workers:
+            processes = min(max_workers or cpus, len(pools))
+            solver_config = dataclasses.replace(solver_config, num_search_workers=max(1, cpus // processes))
+        elif max_workers is None:
+            max_workers = max(1, cpus // solver_config.num_search_workers)
+        for data in pool_data:
+            data['solver_config'] = solver_config
+
+        print(f"Solving {len(pools)} independent pools in parallel")
+        from concurrent.futures import ProcessPoolExecutor  # Only the decomposed solve needs multiprocessing
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_solve_pool, pool_data))
+
+        self.decomposition_info = {'pools': []}
+        assignments = []
+        for pool, (pool_assignments, solve_info) in zip(pools, results):
+            self.decomposition_info['pools'].append({'members': len(pool['members']), 'jobs': pool['jobs'], **solve_info})
+            if pool_assignments is None:
+                raise ValueError(f"\nNo solution found for pool {pool['jobs']}.")
+            assignments += pool_assignments
+
+        # Every assignment is now fixed, so solving the full model just merges and evaluates the pools
+        full_data = {**self.data, 'avg_assignments': global_avg if fairness_scope == "global" else None}
+        full_model = ScheduleModel(**full_data, fixed_assignments=assignments,
+                                   free_mask=np.zeros((len(all_members), len(all_weeks), len(all_jobs)), dtype=bool))
+        return self._solve(full_model)
+
+    def _get_pool_data(self, members, jobs, avg_assignments):
+        """Restricts the data dictionary to one pool of members and jobs."""
+        data = {k: v for k, v in self.data.items() if k != 'previous_schedule_df'}
+        data['all_members'] = members
+        data['all_jobs'] = jobs
+        data['crucial_jobs'] = [j for j in self.data['crucial_jobs'] if j in jobs]
+        data['non_crucial_jobs'] = [j for j in self.data['non_crucial_jobs'] if j in jobs]
+        data['availability_df'] = self.data['availability_df'].loc[members]
+        data['skills_df'] = self.data['skills_df'].loc[members, jobs]
+        data['jobs_df'] = self.data['jobs_df'].loc[jobs]
+        if isinstance(data.get('proficiency_df'), pd.DataFrame):
+            data['proficiency_df'] = self.data['proficiency_df'].loc[members, jobs]
+        if isinstance(data.get('max_roster_df'), pd.DataFrame):
+            data['max_roster_df'] = self.data['max_roster_df'].loc[members]
+        data['avg_assignments'] = avg_assignments
+        return data
+
+    def _solve(self, model, validate_weeks=None, solution_callback=None, solver=None, charts=True, timer=None):
+        """Solves a built ScheduleModel, then views and validates the solution (timer holds the phases before the build)."""
+        self.hint_info = model.hint_info
+        self.feasibility_report = model.feasibility_report
+        if self.hint_info is not None:
+            print(f"Warm start: {self.hint_info['hinted_assignments']}/{self.hint_info['previous_assignments']} previous assignments hinted, "
+                  f"{self.hint_info['dropped_assignments']} dropped as infeasible")
+        if solution_callback is not None:
+            solution_callback.schedule_model = model
+        timer = (timer or self.timer).copy()
+        for phase, seconds in model.timer.phases.items():
+            timer.add(phase, seconds)
+        start = time.perf_counter()
+        solver, status = model.solve(solution_callback, solver)
+        solve_time = time.perf_counter() - start
+        self.solve_info = model.solve_info
+        self._record_solve(timer, model, solver, solve_time)
         
         if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            print("\nSolution found!")
-            viewer = SolutionViewer(
-                solver, model
-            )
-            solution_df = viewer.generate_schedule_df()
-            fig_assignments, fig_proficiency, fig_back_to_back = viewer.analyze_schedule()
-            test_solution(solution_df, model.availability_df, model.skills_df)
+            print(f"\nSolution found! ({self.solve_info['status']}, gap {self.solve_info['gap']:.2%})")
+            with timer.span('extract'):
+                viewer = SolutionViewer(
+                    solver, model
+                )
+                solution_df = viewer.generate_schedule_df()
+                self.objective_breakdown = model.get_objective_breakdown(solver)
+                self.metrics = viewer.get_metrics()
+            with timer.span('charts'):
+                fig_assignments, fig_proficiency, fig_back_to_back = viewer.analyze_schedule() if charts else (None, None, None)
+            with timer.span('validation'):
+                self.validation_report = validate_solution(
+                    solution_df, model.all_members, model.all_weeks, model.all_jobs,
+                    model.availability_mask, model.skills_mask,
+                    max_roster_limits=model.max_roster_limits, crucial_jobs=model.crucial_jobs, weeks=validate_weeks,
+                )
+            self._emit_instrumentation()
+            check_report(self.validation_report)
             return solution_df, fig_assignments, fig_proficiency, fig_back_to_back
         
+        self._emit_instrumentation()
+        stopped = solution_callback is not None and solution_callback.stop_requested
+        if status == cp_model.INFEASIBLE or (status == cp_model.UNKNOWN and not stopped):
+            # The quick checks passed, so ask a crucial-jobs-only model which demands conflict
+            core = find_infeasibility_core(
+                model.variable_mask, model.crucial_mask, model.all_members, model.all_weeks, model.all_jobs,
+                max_roster_limits=model.max_roster_limits, fixed_mask=model.fixed_mask, time_limit=INFEASIBILITY_CORE_TIME_LIMIT,
+                num_workers=model.solver_config.num_search_workers,
+            )
+            self.feasibility_report = {**self.feasibility_report, 'feasible': core['status'] != "INFEASIBLE", 'core': core}
+            if core['status'] == "INFEASIBLE":
+                raise InfeasibleRosterError("\nNo solution found:\n" + describe_core(core), self.feasibility_report)
         raise ValueError("\nNo solution found.")
+
+    def _record_solve(self, timer, model, solver, solve_time):
+        """Splits the solve into presolve and search and keeps the phases, model size and search statistics."""
+        stats = solver_stats(solver)
+        presolve_time = min(stats.get('presolve_time') or 0.0, solve_time)
+        if stats.get('presolve_time') is not None:
+            timer.add('presolve', presolve_time)
+        timer.add('search', solve_time - presolve_time)
+        self.instrumentation = {
+            'phases': timer.phases,  # Extraction, charts and validation are added as they run
+            'model': model_stats(model.model),
+            'solver': stats,
+        }
+
+    def _emit_instrumentation(self):
+        path = self.data.get('instrumentation_log')
+        if path is not None:
+            write_json_log(path, {'solve_info': self.solve_info, 'quick_info': self.quick_info, 'lns_info': self.lns_info, **self.instrumentation})
+
+
+def _solve_pool(data):
+    """Process pool worker: builds and solves one pool, returning its assignments and solve info."""
+    model = ScheduleModel(**data)
+    solver, status = model.solve()
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, model.solve_info
+    assignments = model.get_assignments(solver.ResponseProto().solution)
+    return assignments, model.solve_info
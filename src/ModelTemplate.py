@@ -0,0 +1,141 @@
+"""
+A ScheduleModel built once per data shape and re-used across requests by applying cheap deltas.
+
+The template is built with every member available every week. A request with the same members,
+weeks, jobs, skills, proficiency and max roster limits then only needs:
+    - its unavailable shifts fixed to 0 (variable bound changes, no new variables or constraints),
+    - its objective weights set on the existing objective components,
+    - its solver settings and, optionally, a previous schedule as hints.
+
+Templates pickle as their CP-SAT proto plus the variable bookkeeping, so one can be saved to disk
+and loaded by worker processes instead of being rebuilt.
+"""
+import hashlib
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import DataProcessor
+from FeasibilityCheck import InfeasibleRosterError, check_feasibility, describe_issues
+from Instrumentation import PhaseTimer
+from ResultCache import hash_dataframe
+from ScheduleModel import ScheduleModel, OBJECTIVE_WEIGHTS, fix_variables
+from SolverConfig import SolverConfig
+
+# Data dictionary entries a template is built from; requests must match them to use it
+SHAPE_DATAFRAMES = ['skills_df', 'jobs_df', 'max_roster_df', 'proficiency_df']
+SHAPE_SETTINGS = ['all_members', 'all_weeks', 'all_jobs', 'crucial_jobs', 'avg_assignments']
+
+
+def shape_key(data):
+    """
+    Hash of everything in a data dictionary that a ModelTemplate's structure depends on.
+
+    Availability, objective weights, solver settings and the previous schedule are left out,
+    since they are applied per request.
+    """
+    hasher = hashlib.sha256()
+    for name in SHAPE_DATAFRAMES:
+        df = data.get(name)
+        hasher.update(name.encode())
+        if isinstance(df, pd.DataFrame):
+            hash_dataframe(df, hasher)
+    settings = {name: data.get(name) for name in SHAPE_SETTINGS}
+    hasher.update(json.dumps(settings, default=str).encode())
+    return hasher.hexdigest()
+
+
+class ModelTemplate:
+    """A compiled ScheduleModel for one data shape, instantiated per request by bound and objective changes."""
+
+    def __init__(self, data, variable_names=False):
+        """
+        Builds the template's model with every member available every week.
+
+        Args:
+            data: Data dictionary as returned by DataProcessor.get_data.
+            variable_names: Name the CP-SAT variables. Off by default, which saves build time and memory.
+        """
+        self.key = shape_key(data)
+        all_available = pd.DataFrame(True, index=data['all_members'], columns=data['all_weeks'])
+        # Availability separates otherwise identical members per request, so members are not grouped
+        self.schedule_model = ScheduleModel(
+            **{**data, 'availability_df': all_available, 'previous_schedule_df': None, 'churn_weight': 0},
+            aggregate_members=False, variable_names=variable_names,
+        )
+        self.build_time = sum(self.schedule_model.timer.phases.values())
+        # Member and week of each shift variable, for fixing the unavailable ones
+        self.shift_members, self.shift_weeks = self.schedule_model.shift_indices[:, 0], self.schedule_model.shift_indices[:, 1]
+
+    def matches(self, data):
+        """Whether a request can use this template: same shape, and no churn term (it needs a previous schedule built in)."""
+        churn = data.get('churn_weight') and isinstance(data.get('previous_schedule_df'), pd.DataFrame)
+        return not churn and shape_key(data) == self.key
+
+    def instantiate(self, data):
+        """
+        ScheduleModel for one request, made from a copy of the template's model.
+
+        The request's unavailable shifts are fixed to 0, and its weights, solver settings and previous
+        schedule hints are applied. Nothing is rebuilt.
+
+        Raises:
+            ValueError: The request does not match the template (see matches).
+            InfeasibleRosterError: A crucial job cannot be filled with the request's availability.
+        """
+        if not self.matches(data):
+            raise ValueError("The data does not match this model template's members, weeks, jobs and skills")
+
+        model = self.schedule_model.clone()
+        model.timer = PhaseTimer()
+        with model.timer.span('masks'):
+            masks = DataProcessor.get_masks(
+                data['availability_df'], model.skills_df, model.all_members, model.all_weeks, model.all_jobs,
+                proficiency_df=model.proficiency_df, max_roster_df=model.max_roster_df,
+            )
+        model.availability_df = data['availability_df']
+        model.availability_mask = masks['availability_mask']
+        model.feasible_mask = masks['feasible_mask']
+        model.variable_mask = self.schedule_model.variable_mask & model.availability_mask[:, :, None]
+
+        with model.timer.span('feasibility'):
+            model.feasibility_report = check_feasibility(
+                model.variable_mask, model.crucial_mask, model.all_members, model.all_weeks, model.all_jobs,
+                max_roster_limits=model.max_roster_limits, fixed_mask=model.fixed_mask,
+            )
+        if not model.feasibility_report['feasible']:
+            raise InfeasibleRosterError("\nNo solution found:\n" + describe_issues(model.feasibility_report), model.feasibility_report)
+
+        with model.timer.span('availability'):
+            available = model.availability_mask[self.shift_members, self.shift_weeks]
+            unavailable = model.shift_var_indices[~available]
+            fix_variables(model.model, unavailable, np.zeros(len(unavailable), dtype=np.int64))
+            # Only shifts the request can take are hinted or read back by name
+            model.shifts = {key: shift for (key, shift), keep in zip(self.schedule_model.shifts.items(), available.tolist()) if keep}
+
+        model.solver_config = SolverConfig.from_value(data.get('solver_config'))
+        model.set_objective_weights(**{name: data.get(name) for name in OBJECTIVE_WEIGHTS.values()})
+        model.solve_info = None
+        model.previous_schedule_df = data.get('previous_schedule_df')
+        model.hint_info = None
+        model.hinted_assignments = set()
+        if isinstance(model.previous_schedule_df, pd.DataFrame):
+            with model.timer.span('hints'):
+                model.hint_info = model.add_hints(model.previous_schedule_df)
+        return model
+
+    def save(self, path):
+        """Writes the template (its CP-SAT proto and variable bookkeeping) to path."""
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a template written by save. The file is a pickle, so only load templates you wrote."""
+        with open(path, "rb") as f:
+            template = pickle.load(f)
+        if not isinstance(template, cls):
+            raise ValueError(f"{path} does not hold a model template")
+        return template
@@ -0,0 +1,247 @@
+"""
+Large neighbourhood search (LNS) over a ScheduleModel, for rosters too big for CP-SAT to improve as a whole.
+
+Starting from a QuickRoster schedule, each step frees one neighbourhood of the roster (a block of
+weeks, a subset of members or every week of some jobs), fixes every other shift to the incumbent
+and lets CP-SAT re-solve the small subproblem for a few seconds. Improvements are kept. The
+neighbourhoods grow while CP-SAT proves them optimal without gain and shrink when it runs out of
+time, so they stay about as big as the time limit allows.
+
+The subproblems are copies of the one ScheduleModel, so they share its constraints and objective,
+and with max_workers > 1 several neighbourhoods are solved at once in a process pool.
+
+The objective of every accepted improvement is recorded against wall time in history, to be
+compared with the SolutionStreamer history of a plain solve (see benchmark.py --compare-lns).
+"""
+import dataclasses
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from QuickRoster import QuickRoster
+from ScheduleModel import copy_model, fix_variables, set_solution_hint
+
+# Kinds of neighbourhood freed in a step
+NEIGHBORHOODS = ["weeks", "members", "jobs"]
+# Default seconds CP-SAT spends on one neighbourhood
+SUB_TIME_LIMIT = 2.0
+# Factor the neighbourhood size grows by after an exhausted neighbourhood, and shrinks by after a timeout
+SIZE_STEP = 1.2
+
+
+class NeighborhoodSearch:
+    """Improves a ScheduleModel's roster by repeatedly re-solving one neighbourhood with the rest fixed."""
+
+    def __init__(self, schedule_model, sub_time_limit=SUB_TIME_LIMIT, neighborhood_size=0.15,
+                 neighborhoods=None, max_workers=1, seed=0):
+        """
+        Args:
+            schedule_model: ScheduleModel to search; its solver_config supplies the other CP-SAT settings.
+            sub_time_limit: Seconds CP-SAT spends on each neighbourhood.
+            neighborhood_size: Starting share of the weeks, members or jobs a neighbourhood frees.
+            neighborhoods: Kinds of neighbourhood to pick from (default NEIGHBORHOODS).
+            max_workers: Neighbourhoods solved at once, each in its own process (1 solves in this process).
+            seed: Seed for the neighbourhood choice, the starting roster and the subproblem searches.
+        """
+        neighborhoods = list(neighborhoods or NEIGHBORHOODS)
+        unknown = set(neighborhoods) - set(NEIGHBORHOODS)
+        if unknown:
+            raise ValueError(f"Unknown neighborhoods {sorted(unknown)}, expected some of {NEIGHBORHOODS}")
+        if not 0 < neighborhood_size <= 1:
+            raise ValueError("neighborhood_size must be in (0, 1]")
+
+        self.schedule_model = schedule_model
+        self.sub_time_limit = sub_time_limit
+        self.neighborhood_size = neighborhood_size
+        self.neighborhoods = neighborhoods
+        self.max_workers = max(1, int(max_workers or 1))
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        # Member, week and job of each shift variable, for choosing what a neighbourhood frees
+        self.shift_members, self.shift_weeks, self.shift_jobs = schedule_model.shift_indices.T
+        self.members = np.unique(self.shift_members)
+        self.jobs = np.unique(self.shift_jobs)
+        self.n_weeks = len(schedule_model.all_weeks)
+
+        self.solution = None
+        self.objective = None
+        self.history = []
+        self.stats = None
+        self.info = None
+
+    def run(self, time_limit, initial_solution=None):
+        """
+        Searches for time_limit seconds from initial_solution (default: a completed QuickRoster schedule).
+
+        Returns:
+            np.ndarray: Best solution found, indexed like the model's variables (read it with
+                        ScheduleModel.get_assignment). Its objective, history and per-neighbourhood
+                        counts are kept in self.info.
+
+        Raises:
+            ValueError: No starting roster could be found.
+        """
+        start = time.perf_counter()
+        self.solution = initial_solution if initial_solution is not None else self._initial_solution(time_limit)
+        if self.solution is None:
+            raise ValueError("\nNo solution found to start the neighbourhood search from.")
+        self.objective = objective_value(self.schedule_model.model, self.solution)
+        initial_objective = self.objective
+        self.history = [{'wall_time': time.perf_counter() - start, 'objective': self.objective, 'neighborhood': 'initial'}]
+        self.stats = {kind: {'tried': 0, 'improved': 0, 'gain': 0.0} for kind in self.neighborhoods}
+        self.size = self.neighborhood_size
+        self._start = start
+
+        deadline = start + time_limit
+        if self.max_workers == 1:
+            while time.perf_counter() < deadline:
+                task = self._next_task(deadline)
+                self._accept(task[0], solve_neighborhood(self.schedule_model.model, *task[1:], self._solver_config()))
+        else:
+            self._run_pool(deadline)
+
+        self.info = {
+            'objective': self.objective,
+            'initial_objective': initial_objective,
+            'iterations': sum(stats['tried'] for stats in self.stats.values()),
+            'improvements': len(self.history) - 1,
+            'neighborhoods': self.stats,
+            'neighborhood_size': self.size,
+            'history': self.history,
+            'wall_time': time.perf_counter() - start,
+            'max_workers': self.max_workers,
+        }
+        return self.solution
+
+    def _run_pool(self, deadline):
+        """Keeps max_workers neighbourhoods in flight, each started from the incumbent at the time."""
+        model_bytes = self.schedule_model.model.Proto().SerializeToString()
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(model_bytes, self._solver_config())) as executor:
+            pending = {}
+            for _ in range(self.max_workers):
+                task = self._next_task(deadline)
+                pending[executor.submit(_solve_neighborhood, *task[1:])] = task[0]
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._accept(pending.pop(future), future.result())
+                    if time.perf_counter() < deadline:
+                        task = self._next_task(deadline)
+                        pending[executor.submit(_solve_neighborhood, *task[1:])] = task[0]
+
+    def _initial_solution(self, time_limit):
+        """A completed QuickRoster schedule, or CP-SAT's first solution if QuickRoster breaks a hard rule."""
+        quick = QuickRoster.from_model(self.schedule_model, seed=self.seed)
+        solution = self.schedule_model.complete_assignment(quick.solve())
+        if solution is not None:
+            return solution
+
+        solver = self._solver_config(time_limit).apply(cp_model.CpSolver())
+        solver.parameters.stop_after_first_solution = True
+        status = solver.Solve(self.schedule_model.model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        return np.asarray(solver.ResponseProto().solution, dtype=np.int64)
+
+    def _solver_config(self, time_limit=None):
+        """The model's solver settings, single-threaded and quiet, for one subproblem."""
+        return dataclasses.replace(
+            self.schedule_model.solver_config,
+            max_time_in_seconds=time_limit if time_limit is not None else self.sub_time_limit,
+            num_search_workers=1, log_search_progress=False, keep_solve_log=False,
+        )
+
+    def pick_neighborhood(self):
+        """
+        Picks a kind of neighbourhood, favouring the kinds that improved the roster most often.
+
+        Returns:
+            tuple: (kind, free) where free is a bool array over the model's shift variables.
+        """
+        scores = np.array([(self.stats[kind]['improved'] + 1) / (self.stats[kind]['tried'] + 1) for kind in self.neighborhoods])
+        kind = self.neighborhoods[self.rng.choice(len(self.neighborhoods), p=scores / scores.sum())]
+
+        if kind == "weeks":
+            block = max(1, round(self.n_weeks * self.size))
+            first = self.rng.integers(0, max(1, self.n_weeks - block + 1))
+            free = (self.shift_weeks >= first) & (self.shift_weeks < first + block)
+        elif kind == "members":
+            free = np.isin(self.shift_members, self._sample(self.members))
+        else:
+            free = np.isin(self.shift_jobs, self._sample(self.jobs))
+        return kind, free
+
+    def _sample(self, indices):
+        count = min(len(indices), max(1, round(len(indices) * self.size)))
+        return self.rng.choice(indices, count, replace=False)
+
+    def _next_task(self, deadline):
+        """Arguments for solve_neighborhood (after the model): a neighbourhood fixed to the incumbent."""
+        kind, free = self.pick_neighborhood()
+        self.stats[kind]['tried'] += 1
+        fixed_indices = self.schedule_model.shift_var_indices[~free]
+        time_limit = max(0.1, min(self.sub_time_limit, deadline - time.perf_counter()))
+        seed = int(self.rng.integers(2**31 - 1))
+        return kind, fixed_indices, self.solution[fixed_indices], self.solution, time_limit, seed
+
+    def _accept(self, kind, result):
+        """Keeps a subproblem's solution if it improves on the incumbent, and adapts the neighbourhood size."""
+        status, objective, solution = result
+        if solution is None or objective >= self.objective - 1e-6:
+            if status == cp_model.OPTIMAL:
+                self.size = min(1.0, self.size * SIZE_STEP)
+            elif status != cp_model.INFEASIBLE:
+                self.size = max(1e-3, self.size / SIZE_STEP)
+            return
+        self.stats[kind]['improved'] += 1
+        self.stats[kind]['gain'] += self.objective - objective
+        self.solution, self.objective = solution, objective
+        self.history.append({'wall_time': time.perf_counter() - self._start, 'objective': objective, 'neighborhood': kind})
+
+
+def objective_value(model, solution):
+    """Objective of a CpModel at a full solution (values indexed like its variables), as CpSolver.ObjectiveValue gives it."""
+    proto = model.Proto()
+    # Non-integer weights make Minimize store a floating point objective instead
+    if proto.HasField('floating_point_objective'):
+        objective = proto.floating_point_objective
+        return sum(coeff * int(solution[var]) for var, coeff in zip(objective.vars, objective.coeffs)) + objective.offset
+    objective = proto.objective
+    value = sum(coeff * int(solution[var]) for var, coeff in zip(objective.vars, objective.coeffs)) + objective.offset
+    return value * (objective.scaling_factor or 1)
+
+
+def solve_neighborhood(model, fixed_indices, fixed_values, hint, time_limit, seed, solver_config):
+    """
+    Re-solves a copy of a CpModel with some variables fixed, starting from a full solution hint.
+
+    Returns:
+        tuple: (status, objective, solution), with objective and solution None if no solution was found.
+    """
+    model = copy_model(model)
+    fix_variables(model, fixed_indices, fixed_values)
+    set_solution_hint(model, hint)
+    solver = dataclasses.replace(solver_config, max_time_in_seconds=time_limit, random_seed=seed).apply(cp_model.CpSolver())
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return status, None, None
+    return status, solver.ObjectiveValue(), np.asarray(solver.ResponseProto().solution, dtype=np.int64)
+
+
+_worker_state = {}
+
+
+def _init_worker(model_bytes, solver_config):
+    """Parses the shared model once per worker process."""
+    model = cp_model.CpModel()
+    model.Proto().ParseFromString(model_bytes)
+    _worker_state.update(model=model, solver_config=solver_config)
+
+
+def _solve_neighborhood(fixed_indices, fixed_values, hint, time_limit, seed):
+    """Process pool worker: solve_neighborhood on the shared model."""
+    return solve_neighborhood(_worker_state['model'], fixed_indices, fixed_values, hint, time_limit, seed, _worker_state['solver_config'])
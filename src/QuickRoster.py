@@ -0,0 +1,434 @@
+"""
+Builds a good roster in well under a second, without CP-SAT.
+
+A greedy construction fills crucial jobs first, hardest first (fewest eligible members), giving
+each to the eligible member it costs the objective least, and moving members between a week's jobs
+when every eligible member is already busy that week. Non-crucial jobs are then filled wherever
+that improves the objective. A local search then improves the roster with three moves, each scored
+against every candidate at once with NumPy: handing a slot to another member (or emptying a
+non-crucial slot), swapping two members' jobs within a week, and swapping two members'
+assignments across weeks.
+
+The objective is ScheduleModel's: the same components, weights and fairness target (churn aside),
+so a QuickRoster schedule can stand in for the exact solve on instances too big for it, or hint it.
+"""
+import time
+
+import numpy as np
+
+import DataProcessor
+from ScheduleModel import OBJECTIVE_WEIGHTS, OBJECTIVE_SENSES
+
+# Cost of leaving a crucial slot empty, so the local search fills one whenever it can
+UNFILLED_CRUCIAL_PENALTY = 10 ** 9
+
+
+class QuickRoster:
+    """Greedy construction plus local search over a W x J table of which member fills each slot."""
+
+    def __init__(self, variable_mask, crucial_mask, proficiency_matrix, max_roster_limits, avg_assignments,
+                 weights=None, fixed_mask=None, seed=0):
+        """
+        Args:
+            variable_mask (np.ndarray): M x W x J bool, cells that can be assigned (see ScheduleModel.variable_mask).
+            crucial_mask (np.ndarray): J bool, jobs that must be filled every week.
+            proficiency_matrix (np.ndarray): M x J int.
+            max_roster_limits (np.ndarray): M int, -1 for no limit.
+            avg_assignments (int): Fairness target of the squared assignment deviation.
+            weights (dict): ScheduleModel objective weights by name (missing or None counts as 0).
+            fixed_mask (np.ndarray): M x W x J bool assignments already made, which are never moved.
+            seed: Random seed of the local search.
+        """
+        n_members, n_weeks, n_jobs = variable_mask.shape
+        self.eligible = variable_mask
+        self.crucial_mask = np.asarray(crucial_mask, dtype=bool)
+        self.proficiency_matrix = proficiency_matrix
+        self.max_roster_limits = max_roster_limits
+        self.avg_assignments = avg_assignments
+        self.fixed_mask = fixed_mask if fixed_mask is not None else np.zeros_like(variable_mask)
+        self.weights = {name: (weights or {}).get(name) or 0 for name in OBJECTIVE_WEIGHTS.values()}
+        self.rng = np.random.default_rng(seed)
+        self.info = None
+
+        # Who fills each slot (-1 for nobody), starting from the fixed assignments
+        self.slot_fixed = self.fixed_mask.any(axis=0)
+        slot_member = np.full((n_weeks, n_jobs), -1)
+        members, weeks, jobs = np.nonzero(self.fixed_mask)
+        slot_member[weeks, jobs] = members
+        self._set_slots(slot_member)
+        # A fixed assignment over the limit allows no more, as in ScheduleModel
+        fixed_totals = self.fixed_mask.sum(axis=(1, 2))
+        self.capacity = np.where(max_roster_limits >= 0, np.maximum(max_roster_limits, fixed_totals), n_weeks)
+
+    @classmethod
+    def from_model(cls, model, seed=0):
+        """QuickRoster for a built ScheduleModel, with its masks, fixed assignments and weights."""
+        weights = {name: getattr(model, name) for name in OBJECTIVE_WEIGHTS.values()}
+        return cls(model.variable_mask, model.crucial_mask, model.proficiency_matrix, model.max_roster_limits,
+                   model.avg_assignments, weights, fixed_mask=model.fixed_mask, seed=seed)
+
+    @classmethod
+    def from_data(cls, data, seed=0):
+        """QuickRoster for a data dictionary shaped like DataProcessor.get_data's output, without building a CP model."""
+        all_members, all_weeks, all_jobs = data['all_members'], data['all_weeks'], data['all_jobs']
+        masks = DataProcessor.get_masks(
+            data['availability_df'], data['skills_df'], all_members, all_weeks, all_jobs,
+            proficiency_df=data.get('proficiency_df'), max_roster_df=data.get('max_roster_df'),
+        )
+        crucial_mask = np.isin(np.array(all_jobs, dtype=object), list(data['crucial_jobs']))
+        avg_assignments = data.get('avg_assignments')
+        if avg_assignments is None:
+            avg_assignments = len(all_weeks) * len(all_jobs) // len(all_members)
+        weights = {name: data.get(name) for name in OBJECTIVE_WEIGHTS.values()}
+        return cls(masks['feasible_mask'], crucial_mask, masks['proficiency_matrix'], masks['max_roster_limits'],
+                   avg_assignments, weights, seed=seed)
+
+    def solve(self, time_limit=0.5, max_iterations=None, patience=None):
+        """
+        Builds a roster greedily, then improves it with local search.
+
+        Args:
+            time_limit: Seconds of local search.
+            max_iterations: Local search moves tried at most (None for no limit).
+            patience: Moves without a new best before a few slots are reassigned at random (default 5 per open slot).
+
+        Returns:
+            np.ndarray: M x W x J bool assignment, fixed assignments included. Timings, move counts,
+                        the objective breakdown and any crucial slots left empty are kept in self.info.
+        """
+        start = time.perf_counter()
+        self.construct()
+        construction_time = time.perf_counter() - start
+        initial = self.evaluate()
+
+        start = time.perf_counter()
+        iterations, improvements = self.improve(time_limit, max_iterations, patience)
+        search_time = time.perf_counter() - start
+
+        final = self.evaluate()
+        self.info = {
+            'objective': final['objective'],
+            'objective_breakdown': final['breakdown'],
+            'initial_objective': initial['objective'],
+            'unfilled_crucial': final['unfilled_crucial'],
+            'construction_time': construction_time,
+            'search_time': search_time,
+            'iterations': iterations,
+            'improvements': improvements,
+        }
+        return self.get_assignment()
+
+    def get_assignment(self):
+        """M x W x J bool array of the current roster."""
+        assignment = np.zeros_like(self.eligible)
+        weeks, jobs = np.nonzero(self.slot_member >= 0)
+        assignment[self.slot_member[weeks, jobs], weeks, jobs] = True
+        return assignment
+
+    def evaluate(self):
+        """
+        Objective of the current roster, computed the way ScheduleModel defines it.
+
+        Returns:
+            dict: 'objective' (weighted, minimised), 'breakdown' (unweighted components) and
+                  'unfilled_crucial' (crucial slots left empty, which ScheduleModel would not allow).
+        """
+        rostered = self.rostered[:, 1:-1]
+        breakdown = {
+            'total_assignments': int(self.totals.sum()),
+            'assignment_deviation': int(((self.totals - self.avg_assignments) ** 2).sum()),
+            'back_to_back': int((rostered[:, 1:] & rostered[:, :-1]).sum()),
+            'min_proficiency': int(self.week_proficiency.min()) if len(self.week_proficiency) else 0,
+        }
+        objective = sum(
+            breakdown[component] * self.weights[weight_name] * OBJECTIVE_SENSES[component]
+            for component, weight_name in OBJECTIVE_WEIGHTS.items() if component in breakdown
+        )
+        unfilled = int((self.crucial_mask[None, :] & (self.slot_member < 0)).sum())
+        return {'objective': objective, 'breakdown': breakdown, 'unfilled_crucial': unfilled}
+
+    def construct(self):
+        """Fills crucial slots hardest first, then non-crucial slots wherever that lowers the objective."""
+        open_slots = ~self.slot_fixed & (self.slot_member < 0)
+        eligible_counts = self.eligible.sum(axis=0)  # W x J
+        for crucial in (True, False):
+            slots = np.argwhere(open_slots & (self.crucial_mask[None, :] == crucial))
+            order = np.argsort(eligible_counts[slots[:, 0], slots[:, 1]], kind="stable")
+            for w, j in slots[order].tolist():
+                candidates = self._free_candidates(w, j)
+                if candidates.size:
+                    cost = self._add_cost(candidates, w)
+                    # Cheapest member, and the most proficient among equally cheap ones
+                    best = np.lexsort((-self.proficiency_matrix[candidates, j], cost))[0]
+                    if crucial or cost[best] < 0:
+                        self._assign(w, j, candidates[best])
+                elif crucial:
+                    self._augment(w, j) or self._release_capacity(w, j)
+
+    def improve(self, time_limit=1.0, max_iterations=None, patience=None):
+        """
+        Iterated local search: repeatedly applies the best candidate of a random move if it does not
+        worsen the objective, and after patience moves without a new best, hands a few random slots
+        to random members to escape. The best roster found is kept.
+
+        Returns:
+            (int, int): Moves tried and how many of them found a new best roster.
+        """
+        open_slots = np.argwhere(~self.slot_fixed)
+        if not len(open_slots):
+            return 0, 0
+        patience = patience if patience is not None else 5 * len(open_slots)
+        kick_size = max(2, len(open_slots) // 50)
+        deadline = time.perf_counter() + time_limit
+        current = best_objective = self._penalised_objective()
+        best = self.slot_member.copy()
+        iterations = improvements = stale = 0
+        while max_iterations is None or iterations < max_iterations:
+            if iterations % 64 == 0 and time.perf_counter() > deadline:
+                break
+            iterations += 1
+            w, j = open_slots[self.rng.integers(len(open_slots))]
+            move = self.rng.random()
+            if move < 0.5:
+                delta = self._reassign(w, j)
+            elif move < 0.7:
+                delta = self._swap_within_week(w, j)
+            else:
+                delta = self._swap_across_weeks(w, j)
+            current += delta or 0
+            if current < best_objective:
+                best_objective, best = current, self.slot_member.copy()
+                improvements += 1
+                stale = 0
+            else:
+                stale += 1
+            if stale >= patience:
+                self._kick(open_slots, kick_size)
+                current = self._penalised_objective()
+                stale = 0
+        self._set_slots(best)
+        return iterations, improvements
+
+    def _set_slots(self, slot_member):
+        """Makes slot_member (W x J) the current roster and derives everything the moves look up from it."""
+        n_members, n_weeks, _ = self.eligible.shape
+        self.slot_member = slot_member.copy()
+        weeks, jobs = np.nonzero(slot_member >= 0)
+        members = slot_member[weeks, jobs]
+        # Which job each member does each week (-1 for none)
+        self.member_job = np.full((n_members, n_weeks), -1)
+        self.member_job[members, weeks] = jobs
+        # Rostered weeks padded with an empty week on each side, so week w's neighbours are columns w and w + 2
+        self.rostered = np.zeros((n_members, n_weeks + 2), dtype=bool)
+        self.rostered[:, 1:-1] = self.member_job >= 0
+        self.totals = np.bincount(members, minlength=n_members)
+        self.week_proficiency = np.bincount(weeks, weights=self.proficiency_matrix[members, jobs], minlength=n_weeks).astype(np.int64)
+
+    def _penalised_objective(self):
+        """Objective the local search minimises: evaluate's, plus the penalty for empty crucial slots."""
+        evaluation = self.evaluate()
+        return evaluation['objective'] + UNFILLED_CRUCIAL_PENALTY * evaluation['unfilled_crucial']
+
+    def _kick(self, open_slots, size):
+        """Hands size random slots to random members who can take them (or empties non-crucial ones)."""
+        for w, j in open_slots[self.rng.choice(len(open_slots), size=min(size, len(open_slots)), replace=False)].tolist():
+            candidates = self._free_candidates(w, j)
+            if not self.crucial_mask[j]:
+                candidates = np.append(candidates, -1)
+            if len(candidates):
+                self._assign(w, j, candidates[self.rng.integers(len(candidates))])
+
+    def _assign(self, w, j, m):
+        """Puts member m (-1 for nobody) in slot (w, j), taking it from whoever had it."""
+        current = self.slot_member[w, j]
+        if current >= 0:
+            self.member_job[current, w] = -1
+            self.rostered[current, w + 1] = False
+            self.totals[current] -= 1
+            self.week_proficiency[w] -= self.proficiency_matrix[current, j]
+        if m >= 0:
+            self.member_job[m, w] = j
+            self.rostered[m, w + 1] = True
+            self.totals[m] += 1
+            self.week_proficiency[w] += self.proficiency_matrix[m, j]
+        self.slot_member[w, j] = m
+
+    def _free_candidates(self, w, j):
+        """Members who can take slot (w, j) without giving anything up: eligible, free that week and under their limit."""
+        return np.flatnonzero(self.eligible[:, w, j] & (self.member_job[:, w] < 0) & (self.totals < self.capacity))
+
+    def _add_cost(self, members, w):
+        """Change in the objective, proficiency aside, of giving each of members one more assignment in week w."""
+        cost = -self.weights['total_assignments_weight']
+        cost = cost + self.weights['assignment_deviation_weight'] * (2 * (self.totals[members] - self.avg_assignments) + 1)
+        cost = cost + self.weights['back_to_back_weight'] * (self.rostered[members, w].astype(int) + self.rostered[members, w + 2])
+        return cost
+
+    def _remove_cost(self, m, w):
+        """Change in the objective, proficiency aside, of taking member m's assignment in week w away."""
+        return (self.weights['total_assignments_weight']
+                + self.weights['assignment_deviation_weight'] * (1 - 2 * (self.totals[m] - self.avg_assignments))
+                - self.weights['back_to_back_weight'] * (int(self.rostered[m, w]) + int(self.rostered[m, w + 2])))
+
+    def _proficiency_cost(self, new_values, weeks):
+        """
+        Change in the objective from the minimum weekly proficiency, when weeks take new_values.
+
+        Args:
+            new_values (list of np.ndarray): New proficiency of each changed week, one value per candidate.
+            weeks (list of int or np.ndarray): The changed weeks, one week (or one per candidate) each.
+        """
+        weight = self.weights['proficiency_deviation_weight']
+        if not weight:
+            return 0
+        current = self.week_proficiency.min()
+        # Smallest value among the weeks that do not change: the smallest few are enough
+        order = np.argsort(self.week_proficiency, kind="stable")[:len(weeks) + 1]
+        new_min = np.full(np.broadcast(*new_values).shape, np.inf)
+        for week in order[::-1]:
+            untouched = True
+            for changed in weeks:
+                untouched = untouched & (np.asarray(changed) != week)
+            new_min = np.where(untouched, self.week_proficiency[week], new_min)
+        for values in new_values:
+            new_min = np.minimum(new_min, values)
+        return -weight * (new_min - current)
+
+    def _apply_best(self, deltas, allow_equal=True):
+        """Index of the best candidate if it does not worsen the objective (ties taken half the time), else None."""
+        if not len(deltas):
+            return None
+        best = int(np.argmin(deltas))
+        if deltas[best] < 0 or (allow_equal and deltas[best] == 0 and self.rng.random() < 0.5):
+            return best
+        return None
+
+    def _reassign(self, w, j):
+        """Hands slot (w, j) to the best free member, or empties it if it is not crucial."""
+        current = self.slot_member[w, j]
+        candidates = self._free_candidates(w, j)
+        if current >= 0:
+            base = self._remove_cost(current, w)
+            week_without = self.week_proficiency[w] - self.proficiency_matrix[current, j]
+            if not self.crucial_mask[j]:
+                candidates = np.append(candidates, -1)  # Leave the slot empty
+        else:
+            base = -UNFILLED_CRUCIAL_PENALTY if self.crucial_mask[j] else 0
+            week_without = self.week_proficiency[w]
+        proficiency = np.where(candidates >= 0, self.proficiency_matrix[candidates, j], 0)
+        add = np.where(candidates >= 0, self._add_cost(candidates, w), 0)
+        deltas = base + add + self._proficiency_cost([week_without + proficiency], [w])
+        best = self._apply_best(deltas, allow_equal=current >= 0)
+        if best is None:
+            return None
+        self._assign(w, j, candidates[best])
+        return deltas[best]
+
+    def _swap_within_week(self, w, j):
+        """Swaps the member in slot (w, j) with the member of another of week w's jobs, for proficiency."""
+        a = self.slot_member[w, j]
+        if a < 0 or not self.weights['proficiency_deviation_weight']:
+            return None
+        others = self.slot_member[w]
+        jobs = np.flatnonzero((others >= 0) & ~self.slot_fixed[w])
+        jobs = jobs[jobs != j]
+        b = others[jobs]
+        swappable = self.eligible[b, w, j] & self.eligible[a, w, jobs]
+        jobs, b = jobs[swappable], b[swappable]
+        proficiency = self.proficiency_matrix
+        new_week = self.week_proficiency[w] - proficiency[a, j] - proficiency[b, jobs] + proficiency[b, j] + proficiency[a, jobs]
+        deltas = self._proficiency_cost([new_week], [w])
+        deltas = np.broadcast_to(deltas, jobs.shape)
+        best = self._apply_best(deltas)
+        if best is None:
+            return None
+        j2, b = jobs[best], b[best]
+        self._assign(w, j, -1)
+        self._assign(w, j2, a)
+        self._assign(w, j, b)
+        return deltas[best]
+
+    def _swap_across_weeks(self, w, j):
+        """Swaps the member in slot (w, j) with the member of a slot in another week, for back to backs and proficiency."""
+        a = self.slot_member[w, j]
+        if a < 0:
+            return None
+        weeks, jobs = np.nonzero((self.slot_member >= 0) & ~self.slot_fixed)
+        b = self.slot_member[weeks, jobs]
+        swappable = ((weeks != w) & (b != a) & self.eligible[a, weeks, jobs] & self.eligible[b, w, j]
+                     & (self.member_job[a, weeks] < 0) & (self.member_job[b, w] < 0))
+        weeks, jobs, b = weeks[swappable], jobs[swappable], b[swappable]
+        if not len(weeks):
+            return None
+
+        # a leaves w for weeks, b leaves weeks for w; a neighbouring week that was just left does not count
+        adjacent = (np.abs(weeks - w) == 1).astype(int)
+        a_rostered, b_rostered = self.rostered[a].astype(int), self.rostered[b].astype(int)
+        a_change = a_rostered[weeks] + a_rostered[weeks + 2] - adjacent - a_rostered[w] - a_rostered[w + 2]
+        b_change = b_rostered[:, w] + b_rostered[:, w + 2] - adjacent - b_rostered[np.arange(len(b)), weeks] - b_rostered[np.arange(len(b)), weeks + 2]
+        deltas = self.weights['back_to_back_weight'] * (a_change + b_change)
+
+        proficiency = self.proficiency_matrix
+        new_w = self.week_proficiency[w] - proficiency[a, j] + proficiency[b, j]
+        new_weeks = self.week_proficiency[weeks] - proficiency[b, jobs] + proficiency[a, jobs]
+        deltas = deltas + self._proficiency_cost([new_w, new_weeks], [w, weeks])
+        best = self._apply_best(deltas)
+        if best is None:
+            return None
+        w2, j2, b = weeks[best], jobs[best], b[best]
+        self._assign(w, j, b)
+        self._assign(w2, j2, a)
+        return deltas[best]
+
+    def _augment(self, w, j):
+        """
+        Fills crucial slot (w, j) when everyone eligible is busy that week, by moving members along
+        a chain of week w's jobs until one ends with a free member (or an emptied non-crucial job).
+        """
+        moved_from = {j: None}  # Job -> (member moving out of it, job they move into)
+        queue = [j]
+        fallback = None
+        while queue:
+            job = queue.pop(0)
+            for m in np.flatnonzero(self.eligible[:, w, job]).tolist():
+                busy_job = self.member_job[m, w]
+                if busy_job < 0:
+                    if self.totals[m] < self.capacity[m]:
+                        self._shift_chain(w, job, m, moved_from)
+                        return True
+                elif busy_job not in moved_from and not self.slot_fixed[w, busy_job]:
+                    moved_from[busy_job] = (m, job)
+                    queue.append(busy_job)
+                    if fallback is None and not self.crucial_mask[busy_job]:
+                        fallback = busy_job
+        if fallback is not None:
+            self._shift_chain(w, fallback, -1, moved_from)
+            return True
+        return False
+
+    def _release_capacity(self, w, j):
+        """
+        Fills crucial slot (w, j) when everyone eligible and free that week is at their max roster, by
+        handing one of their other assignments to someone else (or emptying it, if it is not crucial).
+        """
+        at_limit = np.flatnonzero(self.eligible[:, w, j] & (self.member_job[:, w] < 0))
+        for m in at_limit.tolist():
+            for w2 in np.flatnonzero(self.member_job[m] >= 0).tolist():
+                j2 = self.member_job[m, w2]
+                if self.slot_fixed[w2, j2]:
+                    continue
+                candidates = self._free_candidates(w2, j2)
+                if len(candidates) or not self.crucial_mask[j2]:
+                    self._assign(w2, j2, candidates[np.argmin(self._add_cost(candidates, w2))] if len(candidates) else -1)
+                    self._assign(w, j, m)
+                    return True
+        return False
+
+    def _shift_chain(self, w, job, newcomer, moved_from):
+        """Puts newcomer in job and moves each displaced member one step back along the chain."""
+        while True:
+            move = moved_from[job]
+            self._assign(w, job, newcomer)
+            if move is None:
+                return
+            newcomer, job = move
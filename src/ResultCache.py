@@ -0,0 +1,196 @@
+"""
+Caches solved schedules by a hash of everything that determines the solve.
+
+The key covers the normalized input DataFrames, the objective weights and the solver settings,
+so pressing "Generate Schedule" again with the same files and sliders returns the stored schedule
+instead of searching again. Entries live in memory and, optionally, in a directory on disk so
+batch runs and restarts can reuse them.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ScheduleModel import OBJECTIVE_WEIGHTS
+from SolverConfig import SolverConfig
+
+# Data dictionary entries that change the solved schedule
+CACHED_DATAFRAMES = ['availability_df', 'skills_df', 'jobs_df', 'max_roster_df', 'proficiency_df', 'previous_schedule_df']
+CACHED_SETTINGS = list(OBJECTIVE_WEIGHTS.values()) + ['avg_assignments', 'quick_hint', 'quick_time_limit']
+
+
+def hash_dataframe(df, hasher):
+    """Feeds a DataFrame into hasher, independent of its row and column order and numeric dtype."""
+    df = df.sort_index(axis=0, key=lambda index: index.astype(str)).sort_index(axis=1, key=lambda index: index.astype(str))
+    hasher.update(json.dumps([str(df.index.name)] + [str(i) for i in df.index] + [str(c) for c in df.columns]).encode())
+    try:
+        values = df.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        values = pd.util.hash_pandas_object(df.astype(object), index=False).to_numpy()
+    hasher.update(np.ascontiguousarray(values).tobytes())
+
+
+def make_key(data):
+    """
+    Stable hash of a data dictionary (as returned by DataProcessor.get_data) and its solver settings.
+
+    Returns:
+        str: Hex digest; equal inputs give equal keys across processes and restarts.
+    """
+    hasher = hashlib.sha256()
+    for name in CACHED_DATAFRAMES:
+        df = data.get(name)
+        hasher.update(name.encode())
+        if isinstance(df, pd.DataFrame):
+            hash_dataframe(df, hasher)
+    settings = {name: data.get(name) for name in CACHED_SETTINGS}
+    settings['solver_config'] = SolverConfig.from_value(data.get('solver_config')).to_dict()
+    hasher.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Least-recently-used store of solved schedules with a time-to-live.
+
+    One cache can be shared by threads (e.g. every app session), and its directory by processes:
+    files are written whole and then renamed into place, and missing or unreadable files are misses.
+    """
+
+    def __init__(self, max_entries=32, ttl_seconds=24 * 3600, directory=None):
+        """
+        Args:
+            max_entries: Entries kept in memory (and on disk) before the oldest are evicted.
+            ttl_seconds: Entries older than this are treated as missing (None to keep them forever).
+            directory: Optional directory where entries are also pickled, to survive restarts.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """
+        Looks up a key, first in memory and then on disk.
+
+        Returns:
+            dict or None: 'schedule_df', 'objective_breakdown', 'solve_info' and 'created' (epoch seconds).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self.directory is not None:
+                entry = self._load(key)
+            if entry is None:
+                return None
+            if self._expired(entry):
+                self.delete(key)
+                return None
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict_memory()
+            return {**entry, 'schedule_df': entry['schedule_df'].copy()}
+
+    def put(self, key, schedule_df, objective_breakdown, solve_info):
+        """Stores a solved schedule and its objective components under key."""
+        entry = {
+            'schedule_df': schedule_df.copy(),
+            'objective_breakdown': dict(objective_breakdown),
+            'solve_info': dict(solve_info),
+            'created': time.time(),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict_memory()
+            if self.directory is not None:
+                self._write(key, entry)
+                self._evict_disk()
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            if self.directory is not None:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self._path(key))
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries) + self._disk_keys():
+                self.delete(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def _expired(self, entry):
+        return self.ttl_seconds is not None and time.time() - entry['created'] > self.ttl_seconds
+
+    def _evict_memory(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict_disk(self):
+        """
+        Trims the directory to max_entries files, oldest first, and removes expired ones. It lists the
+        whole directory, so it only runs when an entry is written; get checks the one entry it reads.
+        Files another process has already removed are skipped.
+        """
+        modified = {key: self._mtime(key) for key in self._disk_keys()}
+        keys = sorted((key for key, mtime in modified.items() if mtime is not None), key=modified.get)
+        for i, key in enumerate(keys):
+            expired = self.ttl_seconds is not None and time.time() - modified[key] > self.ttl_seconds
+            if expired or i < len(keys) - self.max_entries:
+                self.delete(key)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _mtime(self, key):
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def _disk_keys(self):
+        if self.directory is None:
+            return []
+        return [f[:-len(".pkl")] for f in os.listdir(self.directory) if f.endswith(".pkl")]
+
+    def _write(self, key, entry):
+        """Pickles an entry to a temporary file and renames it into place, so readers never see half a file."""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_path)
+            raise
+
+    def _load(self, key):
+        try:
+            entry = pd.read_pickle(self._path(key))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # A corrupt or foreign file is a miss, and is removed so it is not read again
+            self.delete(key)
+            return None
+        if not isinstance(entry, dict) or not {'schedule_df', 'created'} <= set(entry):
+            self.delete(key)
+            return None
+        return entry
@@ -0,0 +1,248 @@
+"""
+Generates rosters from files on disk, without the web app.
+
+An input set is a directory holding the files the app asks for, recognised by name: availability,
+skills and jobs, plus optional max_roster, proficiency and previous_schedule files, each as CSV,
+XLSX or Parquet. Input sets are solved in a bounded process pool, and each writes its schedule and
+metrics to its own folder in the output directory, with a summary.csv across all of them. With
+--cache-dir, solved schedules are kept on disk, and input sets unchanged since an earlier run are
+not solved again.
+
+Neither streamlit nor plotly is imported.
+
+Usage:
+    python RosterBatch.py ministries/ --output rosters/ --processes 4 --time-limit 120
+    python RosterBatch.py demo --output demo_roster/
+    python RosterBatch.py ministries/ --output drafts/ --engine quick
+    python RosterBatch.py ministries/ --output rosters/ --cache-dir roster_cache/
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from SolverConfig import SolverConfig
+
+# JobScheduler argument -> file name fragments that identify it, checked in this order
+INPUT_FILES = {
+    'date_availability_file': ['availability'],
+    'skills_mapping_file': ['skills'],
+    'max_roster_file': ['max_roster', 'maxroster'],
+    'proficiency_file': ['proficiency'],
+    'previous_schedule_file': ['previous_schedule', 'previous'],
+    'jobs_file': ['jobs'],
+}
+REQUIRED_FILES = ['date_availability_file', 'skills_mapping_file', 'jobs_file']
+# When a role has several files, the first format in this list wins
+FILE_EXTENSIONS = ['.csv', '.parquet', '.xlsx', '.xls']
+# Solved schedules kept in a --cache-dir before the oldest are evicted
+CACHE_ENTRIES = 1000
+
+
+def find_input_files(directory):
+    """
+    Matches the files in a directory to JobScheduler file arguments by name and extension.
+
+    Returns:
+        dict or None: Argument name -> path, or None if a required file is missing.
+    """
+    candidates = {}
+    for file_name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(file_name)
+        extension = extension.lower()
+        if extension not in FILE_EXTENSIONS or file_name.startswith(("~$", ".")):
+            continue
+        stem = stem.lower().replace("-", "_").replace(" ", "_")
+        for key, fragments in INPUT_FILES.items():
+            if any(fragment in stem for fragment in fragments):
+                candidates.setdefault(key, []).append((FILE_EXTENSIONS.index(extension), os.path.join(directory, file_name)))
+                break
+
+    if not all(key in candidates for key in REQUIRED_FILES):
+        return None
+    return {key: min(paths)[1] for key, paths in candidates.items()}
+
+
+def find_input_sets(paths):
+    """
+    Expands paths into input sets. A path is an input set itself or a directory of input sets.
+
+    Returns:
+        list of (name, files): One entry per input set, files as from find_input_files.
+
+    Raises:
+        ValueError: If a path does not exist or holds no input set.
+    """
+    input_sets = []
+    for path in paths:
+        if not os.path.isdir(path):
+            raise ValueError(f"Error: {path} is not a directory!")
+        files = find_input_files(path)
+        if files is not None:
+            input_sets.append((os.path.basename(os.path.normpath(path)), files))
+            continue
+        found = [
+            (entry.name, find_input_files(entry.path))
+            for entry in sorted(os.scandir(path), key=lambda e: e.name) if entry.is_dir()
+        ]
+        found = [(name, files) for name, files in found if files is not None]
+        if not found:
+            raise ValueError(f"Error: no availability, skills and jobs files found in {path} or its subdirectories!")
+        input_sets += found
+    return input_sets
+
+
+def run_input_set(name, files, output_dir, solver_config=None, cache_dir=None, **weights):
+    """
+    Solves one input set and writes its results to output_dir/name.
+
+    With cache_dir, the schedule is looked up in (and stored to) a ResultCache in that directory,
+    so an input set already solved with the same files and settings, by an earlier run or another
+    process, is not searched again.
+
+    Writes schedule.csv, member_metrics.csv, weekly_metrics.csv, metrics.json (including the solve's
+    phase timings and statistics) and log.txt (everything the solve printed). Errors are reported in
+    metrics.json rather than raised.
+
+    Returns:
+        dict: Summary row with the input set name, status, objective, gap, validity and timings.
+    """
+    # Imported here so finding input sets and --help never load pandas or ortools
+    import pandas as pd
+    from JobScheduler import JobScheduler
+    from ResultCache import ResultCache
+
+    set_dir = os.path.join(output_dir, name)
+    os.makedirs(set_dir, exist_ok=True)
+    if weights.get('proficiency_deviation_weight') is None and 'proficiency_file' in files:
+        weights['proficiency_deviation_weight'] = 50
+
+    start = time.perf_counter()
+    log = io.StringIO()
+    summary = {'name': name, 'status': "ERROR", 'error': None}
+    scheduler = None
+    try:
+        with contextlib.redirect_stdout(log):
+            scheduler = JobScheduler(**files, **weights, solver_config=solver_config)
+            cache = ResultCache(max_entries=CACHE_ENTRIES, directory=cache_dir) if cache_dir is not None else None
+            schedule_df = scheduler.schedule_jobs(cache=cache, charts=False)[0]
+
+        schedule_df.to_csv(os.path.join(set_dir, "schedule.csv"), index=False)
+        member_metrics = pd.DataFrame({k: v for k, v in scheduler.metrics.items() if k != 'total_proficiency_per_week'})
+        member_metrics.rename_axis("Names").to_csv(os.path.join(set_dir, "member_metrics.csv"))
+        scheduler.metrics['total_proficiency_per_week'].rename_axis("Week").rename("total_proficiency").to_csv(
+            os.path.join(set_dir, "weekly_metrics.csv"))
+
+        report = scheduler.validation_report
+        summary.update(scheduler.solve_info)
+        summary.update({
+            'objective_breakdown': scheduler.objective_breakdown,
+            'instrumentation': scheduler.instrumentation,
+            'quick': scheduler.quick_info,
+            'lns': scheduler.lns_info,
+            'cached': bool(scheduler.cache_info and scheduler.cache_info['hit']),
+            'valid': report['valid'],
+            'violations': {rule: len(records) for rule, records in report['violations'].items()},
+        })
+    except Exception as e:
+        if scheduler is not None and scheduler.solve_info is not None:
+            summary.update(scheduler.solve_info)
+            summary['instrumentation'] = scheduler.instrumentation
+        summary['error'] = f"{type(e).__name__}: {e}".strip()
+        log.write(traceback.format_exc())
+    summary['total_time'] = time.perf_counter() - start
+    summary['files'] = files
+
+    with open(os.path.join(set_dir, "log.txt"), "w") as f:
+        f.write(log.getvalue())
+    with open(os.path.join(set_dir, "metrics.json"), "w") as f:
+        json.dump(summary, f, indent=2, default=str)
+    return summary
+
+
+def run_batch(paths, output_dir, max_workers=None, solver_config=None, cache_dir=None, **weights):
+    """
+    Solves every input set found under paths in a process pool of at most max_workers processes.
+
+    Args:
+        paths: Input set directories, or directories of them.
+        output_dir: Where each input set's folder and summary.csv are written.
+        max_workers: Input sets solved at once (None for one per CPU).
+        solver_config: SolverConfig (or dict) used for every input set.
+        cache_dir: Optional directory of solved schedules shared by the processes and later runs (see run_input_set).
+        weights: Objective weights (and instrumentation_log, engine and quick_hint), as accepted by JobScheduler.
+
+    Returns:
+        pd.DataFrame: One summary row per input set (see run_input_set), also written to summary.csv.
+    """
+    import pandas as pd
+
+    input_sets = find_input_sets(paths)
+    os.makedirs(output_dir, exist_ok=True)
+    summaries = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_input_set, name, files, output_dir, solver_config, cache_dir, **weights): name
+            for name, files in input_sets
+        }
+        for future in as_completed(futures):
+            summary = future.result()
+            print(f"{summary['name']}: {summary['status']}" + (f" ({summary['error']})" if summary['error'] else "")
+                  + (" from cache" if summary.get('cached') else "")
+                  + f" in {summary['total_time']:.1f}s")
+            summaries.append(summary)
+
+    order = [name for name, _ in input_sets]
+    table = pd.DataFrame(summaries).set_index('name').loc[order]
+    table.drop(columns=['files', 'objective_breakdown', 'violations', 'instrumentation', 'quick', 'lns'], errors='ignore').to_csv(os.path.join(output_dir, "summary.csv"))
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Input set directories, or directories of input sets")
+    parser.add_argument("--output", required=True, help="Output directory")
+    parser.add_argument("--processes", type=int, default=None, help="Input sets solved at once (default one per CPU)")
+    parser.add_argument("--total", type=int, default=50, help="Total assignments weight")
+    parser.add_argument("--deviation", type=int, default=50, help="Assignment deviation weight")
+    parser.add_argument("--back-to-back", type=int, default=50, help="Back to back weight")
+    parser.add_argument("--proficiency-weight", type=int, default=None, help="Proficiency weight (default 50 when there is a proficiency file)")
+    parser.add_argument("--time-limit", type=float, default=60, help="Solver time limit per input set, in seconds")
+    parser.add_argument("--search-workers", type=int, default=1, help="CP-SAT search workers per input set")
+    parser.add_argument("--gap", type=float, default=0.0, help="Relative gap at which to stop each solve")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible schedules")
+    parser.add_argument("--engine", choices=["cp-sat", "quick", "lns"], default="cp-sat",
+                        help="Solve exactly, build a quick heuristic roster in about a second, or run large neighbourhood search")
+    parser.add_argument("--quick-hint", action="store_true", help="Start CP-SAT from a quick heuristic roster")
+    parser.add_argument("--cache-dir", default=None, help="Directory where solved schedules are kept and reused by later runs")
+    parser.add_argument("--log-json", default=None, help="JSON Lines file every solve's phase timings and statistics are appended to")
+    args = parser.parse_args()
+
+    solver_config = SolverConfig(
+        max_time_in_seconds=args.time_limit,
+        num_search_workers=args.search_workers,
+        relative_gap_limit=args.gap,
+        random_seed=args.seed,
+        keep_solve_log=args.log_json is not None,  # The JSON log records the presolve statistics
+    )
+    table = run_batch(
+        args.paths, args.output, args.processes, solver_config, args.cache_dir,
+        total_assignments_weight=args.total,
+        assignment_deviation_weight=args.deviation,
+        back_to_back_weight=args.back_to_back,
+        proficiency_deviation_weight=args.proficiency_weight,
+        instrumentation_log=args.log_json,
+        engine=args.engine,
+        quick_hint=args.quick_hint,
+    )
+    failed = table['status'].isin(["ERROR", "INFEASIBLE", "MODEL_INVALID", "UNKNOWN"]).sum()
+    print(f"\nSolved {len(table) - failed} of {len(table)} input sets, results written to {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
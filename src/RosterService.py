@@ -0,0 +1,701 @@
+"""
+Serves roster jobs for many teams over a small HTTP/JSON API, on one machine with no external broker.
+
+Jobs wait in an in-process queue that is served round-robin across tenants, and run on a fixed
+pool of solver processes. Each process is pinned to its own CPUs, and every job gets a solver time
+limit plus a hard deadline after which its process is replaced, so concurrent users can neither
+starve each other nor the machine. Jobs can be polled while they run and cancelled; a cancelled
+solve keeps the best schedule found so far. Worker processes keep model templates (see
+ModelTemplate) for rosters they have seen, so a repeat request with new availability or weights
+skips the model build.
+
+API (JSON in and out):
+    POST   /jobs                    Submit a roster job -> 202 {"job_id": ..., "status": "queued"}
+    GET    /jobs                    The caller's jobs
+    GET    /jobs/<id>               Status, progress, and the result once finished
+    GET    /jobs/<id>/schedule.csv  The schedule as CSV
+    DELETE /jobs/<id>               Cancel a queued or running job
+    GET    /health                  Workers, queue length and budgets
+
+A job is the app's input files plus its settings, e.g.
+    {"files": {"date_availability_file": "<CSV text>", "skills_mapping_file": "<CSV text>", "jobs_file": "<CSV text>",
+               "proficiency_file": {"filename": "proficiency.xlsx", "base64": "..."}},
+     "settings": {"total_assignments_weight": 50, "back_to_back_weight": 100, "engine": "cp-sat"},
+     "solver": {"max_time_in_seconds": 60, "num_search_workers": 2}}
+
+With --tokens (a JSON file of token -> tenant), requests need "Authorization: Bearer <token>" and
+each tenant only sees its own jobs. Without it the tenant is the X-Tenant header, or "default".
+
+Usage:
+    python RosterService.py --port 8080 --workers 2 --cpus-per-job 2 --max-time 300
+    curl -X POST localhost:8080/jobs -H "Content-Type: application/json" -d @job.json
+"""
+import argparse
+import base64
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from RosterBatch import INPUT_FILES, REQUIRED_FILES
+
+# JobScheduler settings a job may set, and the objective weights used when it does not
+JOB_SETTINGS = ['total_assignments_weight', 'assignment_deviation_weight', 'back_to_back_weight', 'proficiency_deviation_weight',
+                'churn_weight', 'engine', 'quick_hint', 'quick_time_limit']
+DEFAULT_WEIGHTS = {'total_assignments_weight': 50, 'assignment_deviation_weight': 50, 'back_to_back_weight': 50}
+# SolverConfig settings a job may set; its time limit and workers are capped by the service
+JOB_SOLVER_SETTINGS = ['max_time_in_seconds', 'num_search_workers', 'relative_gap_limit', 'random_seed', 'presolve_level']
+# Solver settings that must be whole numbers
+INTEGER_SOLVER_SETTINGS = ['num_search_workers', 'random_seed', 'presolve_level']
+# Solver settings that must be greater than 0, and those that must not be negative
+POSITIVE_SOLVER_SETTINGS = ['max_time_in_seconds', 'num_search_workers']
+NON_NEGATIVE_SOLVER_SETTINGS = ['relative_gap_limit', 'presolve_level', 'random_seed']
+# Seconds a job may run past its solver time limit (loading, building, validating) before its process is replaced
+GRACE_SECONDS = 60
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 50 * 1024 ** 2
+# Seconds finished jobs are kept for polling
+RESULT_TTL = 24 * 3600
+# Model templates each worker process keeps, for rosters it is asked to solve again
+TEMPLATES_PER_WORKER = 4
+# Characters of a job's solver output kept with its result
+LOG_CHARS = 20000
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+
+class ServiceError(ValueError):
+    """A request the service turns down, with the HTTP status to answer it with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class RosterJob:
+    """One submitted roster and everything known about its progress."""
+    id: str
+    tenant: str
+    request: dict
+    time_limit: float
+    cpus: int
+    status: str = "queued"
+    submitted: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    progress: dict = None
+    result: dict = None
+    error: str = None
+    cancel_requested: bool = False
+
+    def to_dict(self, include_result=True):
+        summary = {
+            'job_id': self.id, 'tenant': self.tenant, 'status': self.status,
+            'submitted': self.submitted, 'started': self.started, 'finished': self.finished,
+            'time_limit': self.time_limit, 'cpus': self.cpus, 'progress': self.progress, 'error': self.error,
+        }
+        if include_result and self.result is not None:
+            summary['result'] = {k: v for k, v in self.result.items() if k != 'schedule_csv'}
+            summary['result']['schedule'] = self.result['schedule_records']
+        return summary
+
+
+class FairQueue:
+    """Jobs waiting for a worker, handed out round-robin across tenants so no tenant can starve the others."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._tenants = OrderedDict()  # Tenant -> deque of jobs, in the order tenants are served
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return self._size
+
+    def put(self, job):
+        with self._condition:
+            if self._size >= self.max_size:
+                raise ServiceError("The queue is full, try again later", status=429)
+            self._tenants.setdefault(job.tenant, deque()).append(job)
+            self._size += 1
+            self._condition.notify()
+
+    def get(self):
+        """Blocks until a job is waiting, and returns it (None once the queue is closed)."""
+        with self._condition:
+            while not self._size and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return None
+            tenant, jobs = next(iter(self._tenants.items()))
+            job = jobs.popleft()
+            # The tenant goes to the back of the line, or leaves it when it has nothing else waiting
+            del self._tenants[tenant]
+            if jobs:
+                self._tenants[tenant] = jobs
+            self._size -= 1
+            return job
+
+    def remove(self, job):
+        """Takes a job out of the queue; False if it was no longer waiting."""
+        with self._condition:
+            jobs = self._tenants.get(job.tenant)
+            if not jobs or job not in jobs:
+                return False
+            jobs.remove(job)
+            if not jobs:
+                del self._tenants[job.tenant]
+            self._size -= 1
+            return True
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class WorkerSlot:
+    """One solver process, pinned to its CPUs, and the thread that feeds it jobs from the queue."""
+
+    def __init__(self, service, index, cpus):
+        self.service = service
+        self.index = index
+        self.cpus = cpus
+        self.process = None
+        self.connection = None
+        self.job = None
+        self._spawn()
+        self.thread = threading.Thread(target=self._run, name=f"roster-worker-{index}", daemon=True)
+        self.thread.start()
+
+    def _spawn(self):
+        context = multiprocessing.get_context("spawn")
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_connection, self.cpus), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def _replace(self):
+        """Kills the process (e.g. a job overran its deadline) and starts a fresh one."""
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        self._spawn()
+
+    def _run(self):
+        while True:
+            job = self.service.queue.get()
+            if job is None:
+                return
+            self.job = job
+            self.service._start(job)
+            outcome = self.solve(job)
+            self.job = None
+            self.service._finish(job, outcome)
+
+    def solve(self, job):
+        """
+        Runs one job in the process, forwarding cancellation and progress, within its deadline.
+
+        Returns:
+            dict: {'result': ...} or {'error': message}.
+        """
+        if not self.process.is_alive():
+            self._spawn()
+        self.connection.send(job.request)
+        deadline = time.monotonic() + job.time_limit + GRACE_SECONDS
+        cancel_sent = False
+        while True:
+            if job.cancel_requested and not cancel_sent:
+                self.connection.send("cancel")
+                cancel_sent = True
+            try:
+                if self.connection.poll(0.2):
+                    kind, payload = self.connection.recv()
+                    if kind == "progress":
+                        job.progress = payload
+                        continue
+                    return payload
+            except (EOFError, OSError):
+                pass
+            if not self.process.is_alive():
+                self._spawn()
+                return {'error': "The solver process stopped unexpectedly"}
+            if time.monotonic() > deadline:
+                self._replace()
+                return {'error': f"The job ran {GRACE_SECONDS}s past its {job.time_limit:g}s time limit and was stopped"}
+
+    def stop(self):
+        with contextlib.suppress(OSError):
+            self.connection.send(None)
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class RosterService:
+    """Queues roster jobs from many tenants and solves them on a bounded pool of solver processes."""
+
+    def __init__(self, workers=2, cpus_per_job=None, max_time=300.0, default_time=60.0, max_queue=100, max_jobs_per_tenant=4):
+        """
+        Starts the solver processes.
+
+        Args:
+            workers: Jobs solved at once, each in its own process.
+            cpus_per_job: CPUs (and CP-SAT search workers) per job. Defaults to an even share of the machine.
+                          Processes are pinned to disjoint CPUs when there are enough of them.
+            max_time: Longest solver time limit a job may ask for, in seconds.
+            default_time: Solver time limit of jobs that do not set one.
+            max_queue: Jobs that may wait at once before submissions are turned down.
+            max_jobs_per_tenant: Queued and running jobs one tenant may have at once.
+        """
+        available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        self.workers = workers
+        self.cpus_per_job = cpus_per_job or max(1, len(available) // workers)
+        self.max_time = max_time
+        self.default_time = min(default_time, max_time)
+        self.max_jobs_per_tenant = max_jobs_per_tenant
+        self.jobs = {}
+        self.queue = FairQueue(max_queue)
+        self._lock = threading.Lock()
+
+        pinned = hasattr(os, "sched_setaffinity") and workers * self.cpus_per_job <= len(available)
+        self.slots = [
+            WorkerSlot(self, i, available[i * self.cpus_per_job:(i + 1) * self.cpus_per_job] if pinned else None)
+            for i in range(workers)
+        ]
+
+    def submit(self, tenant, request):
+        """
+        Checks a job request and queues it.
+
+        Returns:
+            RosterJob: The queued job.
+
+        Raises:
+            ServiceError: The request is malformed (400), or the tenant or the queue is full (429).
+        """
+        request = self._check_request(request)
+        solver = request['solver']
+        time_limit = min(float(solver.get('max_time_in_seconds') or self.default_time), self.max_time)
+        cpus = min(int(solver.get('num_search_workers') or self.cpus_per_job), self.cpus_per_job)
+        request['solver'] = {**solver, 'max_time_in_seconds': time_limit, 'num_search_workers': cpus}
+
+        job = RosterJob(id=uuid.uuid4().hex, tenant=tenant, request=request, time_limit=time_limit, cpus=cpus)
+        with self._lock:
+            self._forget_old_jobs()
+            active = sum(1 for j in self.jobs.values() if j.tenant == tenant and j.status not in FINISHED_STATES)
+            if active >= self.max_jobs_per_tenant:
+                raise ServiceError(f"Tenant '{tenant}' already has {active} jobs queued or running", status=429)
+            self.queue.put(job)
+            self.jobs[job.id] = job
+        return job
+
+    def _check_request(self, request):
+        if not isinstance(request, dict):
+            raise ServiceError("The job must be a JSON object")
+        files = request.get('files')
+        if not isinstance(files, dict):
+            raise ServiceError("The job needs a 'files' object")
+        missing = [name for name in REQUIRED_FILES if name not in files]
+        unknown = set(files) - set(INPUT_FILES)
+        if missing or unknown:
+            raise ServiceError(f"Missing files {missing}" if missing else f"Unknown files {sorted(unknown)}, expected some of {list(INPUT_FILES)}")
+        for name, content in files.items():
+            if not isinstance(content, str) and not (isinstance(content, dict) and {'filename', 'base64'} <= set(content)):
+                raise ServiceError(f"'{name}' must be CSV text or an object with 'filename' and 'base64'")
+
+        settings, solver = request.get('settings') or {}, request.get('solver') or {}
+        for given, known, label in ((settings, JOB_SETTINGS, "settings"), (solver, JOB_SOLVER_SETTINGS, "solver settings")):
+            if not isinstance(given, dict):
+                raise ServiceError(f"The job's {label} must be an object")
+            unknown = set(given) - set(known)
+            if unknown:
+                raise ServiceError(f"Unknown {label} {sorted(unknown)}, expected some of {known}")
+        for name, value in solver.items():
+            if value is None:
+                continue
+            integer = name in INTEGER_SOLVER_SETTINGS
+            if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+                raise ServiceError(f"Solver setting '{name}' must be {'a whole number' if integer else 'a number'}")
+            if name in POSITIVE_SOLVER_SETTINGS and not value > 0:
+                raise ServiceError(f"Solver setting '{name}' must be greater than 0")
+            if name in NON_NEGATIVE_SOLVER_SETTINGS and value < 0:
+                raise ServiceError(f"Solver setting '{name}' must not be negative")
+        return {'files': files, 'settings': settings, 'solver': solver}
+
+    def get(self, tenant, job_id):
+        """The tenant's job with this id; ServiceError (404) if there is none."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if job is None or job.tenant != tenant:
+            raise ServiceError(f"No job {job_id}", status=404)
+        return job
+
+    def list(self, tenant):
+        """The tenant's jobs, oldest first."""
+        with self._lock:
+            self._forget_old_jobs()
+            return [job for job in self.jobs.values() if job.tenant == tenant]
+
+    def cancel(self, tenant, job_id):
+        """
+        Cancels a job. A queued job never runs; a running one stops its search and keeps the best
+        schedule found so far. Finished jobs are left as they are.
+        """
+        job = self.get(tenant, job_id)
+        with self._lock:
+            if job.status in FINISHED_STATES:
+                return job
+            job.cancel_requested = True
+            if self.queue.remove(job):
+                job.status, job.finished = "cancelled", time.time()
+        return job
+
+    def health(self):
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            'workers': self.workers,
+            'busy_workers': sum(slot.job is not None for slot in self.slots),
+            'cpus_per_job': self.cpus_per_job,
+            'pinned': all(slot.cpus is not None for slot in self.slots),
+            'max_time': self.max_time,
+            'queued': len(self.queue),
+            'jobs': counts,
+        }
+
+    def close(self):
+        """Cancels running jobs, stops taking queued ones and shuts the solver processes down."""
+        with self._lock:
+            for job in self.jobs.values():
+                if job.status == "running":
+                    job.cancel_requested = True
+        self.queue.close()
+        for slot in self.slots:
+            slot.thread.join(GRACE_SECONDS)
+            slot.stop()
+
+    def _start(self, job):
+        with self._lock:
+            job.status, job.started = "running", time.time()
+
+    def _finish(self, job, outcome):
+        with self._lock:
+            job.result = outcome.get('result')
+            job.error = outcome.get('error')
+            if job.cancel_requested:
+                job.status = "cancelled"
+            else:
+                job.status = "done" if job.result is not None else "failed"
+            job.finished = time.time()
+
+    def _forget_old_jobs(self):
+        cutoff = time.time() - RESULT_TTL
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished is not None and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+
+class _Upload(io.BytesIO):
+    """Stands in for the Streamlit UploadedFile that DataProcessor reads."""
+
+    def __init__(self, content, name, type=None):
+        super().__init__(content)
+        self.name = name
+        self.type = type
+
+
+def _upload(name, content):
+    if isinstance(content, str):
+        return _Upload(content.encode(), f"{name}.csv", "text/csv")
+    file_name = os.path.basename(content['filename'])
+    return _Upload(base64.b64decode(content['base64']), file_name, "text/csv" if file_name.lower().endswith(".csv") else None)
+
+
+def run_roster_job(request, solver, streamer, templates, seen_shapes):
+    """
+    Solves one job request in a worker process.
+
+    Args:
+        request: Checked job request ('files', 'settings' and 'solver').
+        solver: CpSolver to solve with, so the job can be stopped from another thread.
+        streamer: SolutionStreamer that records progress and tells the solve it was cancelled.
+        templates: OrderedDict of shape key -> ModelTemplate kept by this process.
+        seen_shapes: Shape keys this process has solved before; a template is built on the second request.
+
+    Returns:
+        dict: The schedule (as records and CSV), solve info, objective breakdown and validation summary.
+    """
+    # Imported here so the service process itself never loads pandas or ortools
+    import DataProcessor
+    from JobScheduler import JobScheduler
+    from ModelTemplate import shape_key
+
+    uploads = {name: _upload(name, content) for name, content in request['files'].items()}
+    data = DataProcessor.get_data(**uploads)
+    data = {k: v for k, v in data.items() if k not in uploads}
+    settings = {**DEFAULT_WEIGHTS, **request['settings']}
+    if settings.get('proficiency_deviation_weight') is None and 'proficiency_file' in uploads:
+        settings['proficiency_deviation_weight'] = 50
+    data.update(settings, solver_config=request['solver'])
+    scheduler = JobScheduler.from_data(data)
+
+    # A roster seen before is instantiated from its template instead of being built again
+    model = None
+    if (data.get('engine') or "cp-sat") == "cp-sat":
+        key = shape_key(data)
+        if key in templates:
+            templates.move_to_end(key)
+            model = templates[key]
+        elif key in seen_shapes:
+            model = templates[key] = scheduler.build_template()
+            if len(templates) > TEMPLATES_PER_WORKER:
+                templates.popitem(last=False)
+        seen_shapes.add(key)
+
+    schedule_df = scheduler.schedule_jobs(model=model, solution_callback=streamer, solver=solver, charts=False)[0]
+    report = scheduler.validation_report
+    return {
+        'schedule_records': json.loads(schedule_df.to_json(orient="records")),
+        'schedule_csv': schedule_df.to_csv(index=False),
+        'solve_info': scheduler.solve_info,
+        'objective_breakdown': scheduler.objective_breakdown,
+        'valid': report['valid'],
+        'violations': {rule: len(records) for rule, records in report['violations'].items()},
+        'template': model is not None,
+    }
+
+
+def _worker_main(connection, cpus):
+    """Worker process: solves the job requests sent down connection one at a time, until it receives None."""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    from ortools.sat.python import cp_model
+    from BackgroundSolver import SolutionStreamer
+
+    templates = OrderedDict()
+    seen_shapes = set()
+    while True:
+        request = connection.recv()
+        if request is None:
+            return
+        if request == "cancel":
+            continue  # The job it was meant for already finished
+        solver = cp_model.CpSolver()
+        streamer = SolutionStreamer()
+        outcome = {}
+        log = io.StringIO()
+
+        def target():
+            try:
+                with contextlib.redirect_stdout(log):
+                    outcome['result'] = run_roster_job(request, solver, streamer, templates, seen_shapes)
+            except Exception as e:
+                outcome['error'] = f"{type(e).__name__}: {e}".strip()
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        sent = 0
+        while thread.is_alive():
+            thread.join(0.2)
+            if connection.poll() and connection.recv() == "cancel":
+                streamer.stop_requested = True
+            if streamer.stop_requested:
+                solver.StopSearch()  # Repeated, since a stop before the search starts is ignored
+            history = streamer.get_history()
+            if len(history) > sent:
+                sent = len(history)
+                connection.send(("progress", history[-1]))
+        if 'result' in outcome:
+            outcome['result']['log'] = log.getvalue()[-LOG_CHARS:]
+        connection.send(("done", outcome))
+
+
+class RosterRequestHandler(BaseHTTPRequestHandler):
+    """Maps the HTTP API onto the server's RosterService."""
+    server_version = "RosterService"
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method):
+        service = self.server.service
+        try:
+            tenant = self._tenant()
+            parts = [part for part in self.path.split("?")[0].split("/") if part]
+            if method == "GET" and parts == ["health"]:
+                return self._send_json(200, service.health())
+            if parts[:1] != ["jobs"] or len(parts) > 3:
+                raise ServiceError(f"No route for {method} {self.path}", status=404)
+            if len(parts) == 1:
+                if method == "POST":
+                    job = service.submit(tenant, self._read_json())
+                    return self._send_json(202, {'job_id': job.id, 'status': job.status})
+                if method == "GET":
+                    return self._send_json(200, {'jobs': [job.to_dict(include_result=False) for job in service.list(tenant)]})
+            elif len(parts) == 2:
+                if method == "GET":
+                    return self._send_json(200, service.get(tenant, parts[1]).to_dict())
+                if method == "DELETE":
+                    return self._send_json(200, service.cancel(tenant, parts[1]).to_dict(include_result=False))
+            elif parts[2] == "schedule.csv" and method == "GET":
+                job = service.get(tenant, parts[1])
+                if job.result is None:
+                    raise ServiceError(f"Job {job.id} has no schedule ({job.status})", status=409)
+                return self._send(200, job.result['schedule_csv'].encode(), "text/csv")
+            raise ServiceError(f"No route for {method} {self.path}", status=405)
+        except ServiceError as e:
+            self._send_json(e.status, {'error': str(e)})
+
+    def _tenant(self):
+        tokens = self.server.tokens
+        if tokens is None:
+            return self.headers.get("X-Tenant") or "default"
+        scheme, _, token = (self.headers.get("Authorization") or "").partition(" ")
+        if scheme.lower() != "bearer" or token not in tokens:
+            raise ServiceError("A valid bearer token is required", status=401)
+        return tokens[token]
+
+    def _read_json(self):
+        header = self.headers.get("Content-Length")
+        if header is None:
+            raise ServiceError("The request needs a Content-Length", status=411)
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise ServiceError("The Content-Length is not a valid length")
+        if length > MAX_BODY_BYTES:
+            raise ServiceError(f"The job is larger than {MAX_BODY_BYTES // 1024 ** 2}MB", status=413)
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            raise ServiceError("The body is not valid JSON")
+
+    def _send_json(self, status, body):
+        self._send(status, json.dumps(body, default=str).encode(), "application/json")
+
+    def _send(self, status, content, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def make_server(service, host="127.0.0.1", port=8080, tokens=None):
+    """HTTP server for a RosterService; tokens maps bearer tokens to tenants (None trusts X-Tenant)."""
+    server = ThreadingHTTPServer((host, port), RosterRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.tokens = tokens
+    return server
+
+
+class RosterClient:
+    """Submits roster jobs to a RosterService and waits for them, using only the standard library."""
+
+    def __init__(self, url="http://127.0.0.1:8080", token=None, tenant=None):
+        self.url = url.rstrip("/")
+        self.headers = {"Content-Type": "application/json"}
+        if token is not None:
+            self.headers["Authorization"] = f"Bearer {token}"
+        if tenant is not None:
+            self.headers["X-Tenant"] = tenant
+
+    def _request(self, method, path, body=None):
+        data = None if body is None else json.dumps(body).encode()
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers=self.headers)
+        try:
+            with urllib.request.urlopen(request) as response:
+                content = response.read()
+                return json.loads(content) if response.headers.get_content_type() == "application/json" else content.decode()
+        except urllib.error.HTTPError as e:
+            raise ServiceError(json.loads(e.read() or b"{}").get('error', str(e)), status=e.code)
+
+    def submit(self, files, settings=None, solver=None):
+        """
+        Submits a job from file paths keyed like JobScheduler's arguments (e.g. date_availability_file).
+
+        Returns:
+            str: The job id.
+        """
+        encoded = {}
+        for name, path in files.items():
+            with open(path, "rb") as f:
+                content = f.read()
+            encoded[name] = content.decode() if path.lower().endswith(".csv") else {
+                'filename': os.path.basename(path), 'base64': base64.b64encode(content).decode()}
+        return self._request("POST", "/jobs", {'files': encoded, 'settings': settings or {}, 'solver': solver or {}})['job_id']
+
+    def status(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id):
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def schedule_csv(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}/schedule.csv")
+
+    def wait(self, job_id, poll_interval=1.0, timeout=None):
+        """Polls until the job finishes (or timeout seconds pass) and returns its last status."""
+        start = time.monotonic()
+        while True:
+            status = self.status(job_id)
+            if status['status'] in FINISHED_STATES or (timeout is not None and time.monotonic() - start > timeout):
+                return status
+            time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=2, help="Jobs solved at once, each in its own process")
+    parser.add_argument("--cpus-per-job", type=int, default=None, help="CPUs and CP-SAT workers per job (default an even share)")
+    parser.add_argument("--max-time", type=float, default=300, help="Longest solver time limit a job may ask for, in seconds")
+    parser.add_argument("--default-time", type=float, default=60, help="Solver time limit of jobs that do not set one")
+    parser.add_argument("--queue-size", type=int, default=100, help="Jobs that may wait at once")
+    parser.add_argument("--jobs-per-tenant", type=int, default=4, help="Queued and running jobs one tenant may have")
+    parser.add_argument("--tokens", default=None, help="JSON file mapping bearer tokens to tenant names")
+    args = parser.parse_args()
+
+    tokens = None
+    if args.tokens:
+        with open(args.tokens) as f:
+            tokens = json.load(f)
+    service = RosterService(args.workers, args.cpus_per_job, args.max_time, args.default_time, args.queue_size, args.jobs_per_tenant)
+    server = make_server(service, args.host, args.port, tokens)
+    print(f"Roster service on http://{args.host}:{args.port} with {args.workers} workers of {service.cpus_per_job} CPUs"
+          + (" (pinned)" if service.health()['pinned'] else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
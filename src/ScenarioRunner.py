@@ -0,0 +1,213 @@
+"""
+Solves one roster under many objective weightings, to compare the trade-offs between them.
+
+The ScheduleModel is built once; each scenario only swaps the objective weights and is solved in
+its own process. The result is a table of objective components per scenario, with the
+Pareto-efficient scenarios marked.
+
+Usage:
+    python ScenarioRunner.py --availability demo/demo_date_availability.csv --skills demo/demo_skills_mapping.csv \
+        --jobs demo/demo_jobs.csv --total 0 50 100 --deviation 0 50 100 --time-limit 10 --output scenarios.csv
+"""
+import argparse
+import dataclasses
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from ortools.sat.python import cp_model
+
+import DataProcessor
+from ScheduleModel import ScheduleModel, OBJECTIVE_WEIGHTS, OBJECTIVE_SENSES, copy_model, set_linear_objective
+from SolverConfig import SolverConfig
+
+WEIGHT_NAMES = ['total_assignments_weight', 'assignment_deviation_weight', 'back_to_back_weight', 'proficiency_deviation_weight']
+
+# Objective components compared across scenarios, oriented so that smaller is better
+PARETO_COMPONENTS = {
+    'total_assignments': -1,
+    'assignment_deviation': 1,
+    'back_to_back': 1,
+    'min_proficiency': -1,
+}
+
+
+def weight_grid(**weight_values):
+    """
+    Expands lists of values per weight into every combination.
+
+    Example:
+        weight_grid(total_assignments_weight=[0, 50], back_to_back_weight=[10, 100])
+        gives 4 scenarios, each a dict of weights.
+    """
+    names = list(weight_values)
+    return [dict(zip(names, values)) for values in itertools.product(*weight_values.values())]
+
+
+def pareto_efficient(table):
+    """Marks rows whose objective components are not dominated by any other solved row."""
+    solved = table['status'].isin(["OPTIMAL", "FEASIBLE"]).to_numpy()
+    costs = np.column_stack([table[c].to_numpy(dtype=float) * sense for c, sense in PARETO_COMPONENTS.items()])
+
+    efficient = np.zeros(len(table), dtype=bool)
+    for i in np.flatnonzero(solved):
+        others = costs[solved]
+        dominated = np.any(np.all(others <= costs[i], axis=1) & np.any(others < costs[i], axis=1))
+        efficient[i] = not dominated
+    return efficient
+
+
+class ScenarioRunner:
+    """Runs a batch of objective weightings against a single, reused ScheduleModel."""
+
+    def __init__(self, data, solver_config=None):
+        """
+        Builds the model once.
+
+        Args:
+            data: Data dictionary as returned by DataProcessor.get_data.
+            solver_config: SolverConfig (or dict) applied to every scenario; defaults to data['solver_config'].
+        """
+        self.data = data
+        self.solver_config = SolverConfig.from_value(solver_config if solver_config is not None else data.get('solver_config'))
+        self.schedule_model = ScheduleModel(**data)
+
+        # Everything a worker process needs to rebuild the model and read the solution back
+        self.model_bytes = self.schedule_model.model.Proto().SerializeToString()
+        self.component_indices = {name: var.Index() for name, var in self.schedule_model.objective_components.items()}
+        self.assignments = {}
+
+    def run(self, scenarios, max_workers=None):
+        """
+        Solves every scenario (a dict of weights) in a process pool.
+
+        Args:
+            scenarios: Dicts of objective weights; weights left out keep the model's.
+            max_workers: Scenarios solved at once (None for one per CPU). Unless it is given, scenarios
+                         whose solver settings leave num_search_workers to CP-SAT get one search worker
+                         each, so the pool does not run a full-machine search per CPU.
+
+        Returns:
+            pd.DataFrame: One row per scenario with its weights, status, objective, bound,
+                          objective components, solve time and a 'pareto' flag.
+        """
+        scenarios = [{name: scenario.get(name, getattr(self.schedule_model, name)) for name in WEIGHT_NAMES} for scenario in scenarios]
+        solver_config = self.solver_config
+        if max_workers is None and not solver_config.num_search_workers:
+            solver_config = dataclasses.replace(solver_config, num_search_workers=1)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self.model_bytes, self.component_indices, solver_config),
+        ) as executor:
+            outputs = list(executor.map(_solve_scenario, scenarios))
+
+        rows = []
+        for scenario_id, (scenario, output) in enumerate(zip(scenarios, outputs)):
+            solution = output.pop('solution')
+            if solution is not None:
+                self.assignments[scenario_id] = self.schedule_model.get_assignments(solution)
+            rows.append({'scenario': scenario_id, **scenario, **output})
+
+        table = pd.DataFrame(rows).set_index('scenario')
+        table['pareto'] = pareto_efficient(table)
+        return table
+
+    def get_schedule_df(self, scenario_id):
+        """Schedule DataFrame for one solved scenario, in the shape SolutionViewer.generate_schedule_df returns."""
+        return DataProcessor.get_schedule_df(self.assignments[scenario_id], self.data['all_weeks'], self.data['all_jobs'])
+
+
+_worker_state = {}
+
+
+def _init_worker(model_bytes, component_indices, solver_config):
+    """Parses the shared model once per worker process."""
+    model = cp_model.CpModel()
+    model.Proto().ParseFromString(model_bytes)
+    _worker_state.update(model=model, component_indices=component_indices, solver_config=solver_config)
+
+
+def _solve_scenario(weights):
+    """Process pool worker: re-weights a copy of the shared model's objective, by variable index, and solves it."""
+    model = copy_model(_worker_state['model'])
+    component_indices = _worker_state['component_indices']
+
+    terms = {}
+    for component, weight_name in OBJECTIVE_WEIGHTS.items():
+        if component in component_indices and weights.get(weight_name):
+            terms[component_indices[component]] = weights[weight_name] * OBJECTIVE_SENSES[component]
+    set_linear_objective(model, terms.keys(), terms.values())
+
+    solver = _worker_state['solver_config'].apply(cp_model.CpSolver())
+    status = solver.Solve(model)
+    found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    solution = np.asarray(solver.ResponseProto().solution, dtype=np.int64) if found else None
+
+    output = {
+        'status': solver.StatusName(status),
+        'objective': solver.ObjectiveValue() if found and terms else None,
+        'best_bound': solver.BestObjectiveBound() if found and terms else None,
+        'wall_time': solver.WallTime(),
+    }
+    for component, index in component_indices.items():
+        output[component] = int(solution[index]) if found else None
+    output['solution'] = solution
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--availability", required=True, help="Availability file (CSV/XLSX)")
+    parser.add_argument("--skills", required=True, help="Skills mapping file (CSV/XLSX)")
+    parser.add_argument("--jobs", required=True, help="Jobs file (CSV/XLSX)")
+    parser.add_argument("--max-roster", default=None, help="Optional max roster file")
+    parser.add_argument("--proficiency", default=None, help="Optional proficiency file")
+    parser.add_argument("--total", type=int, nargs="+", default=[50], help="Values for the total assignments weight")
+    parser.add_argument("--deviation", type=int, nargs="+", default=[50], help="Values for the assignment deviation weight")
+    parser.add_argument("--back-to-back", type=int, nargs="+", default=[50], help="Values for the back to back weight")
+    parser.add_argument("--proficiency-weight", type=int, nargs="+", default=None, help="Values for the proficiency weight (default 50 with a proficiency file, else 0)")
+    parser.add_argument("--time-limit", type=float, default=30, help="Solver time limit per scenario, in seconds")
+    parser.add_argument("--search-workers", type=int, default=1, help="CP-SAT search workers per scenario")
+    parser.add_argument("--processes", type=int, default=None, help="Scenarios solved at once (default one per CPU)")
+    parser.add_argument("--output", default="scenarios.csv", help="Where to write the scenario table")
+    parser.add_argument("--schedules", default=None, help="Optional directory to write the Pareto-efficient schedules to")
+    args = parser.parse_args()
+
+    proficiency_weights = args.proficiency_weight or ([50] if args.proficiency else [0])
+    data = DataProcessor.get_data(
+        date_availability_file=args.availability,
+        skills_mapping_file=args.skills,
+        jobs_file=args.jobs,
+        max_roster_file=args.max_roster,
+        proficiency_file=args.proficiency,
+        total_assignments_weight=args.total[0],
+        assignment_deviation_weight=args.deviation[0],
+        back_to_back_weight=args.back_to_back[0],
+        proficiency_deviation_weight=proficiency_weights[0],
+    )
+    scenarios = weight_grid(
+        total_assignments_weight=args.total,
+        assignment_deviation_weight=args.deviation,
+        back_to_back_weight=args.back_to_back,
+        proficiency_deviation_weight=proficiency_weights,
+    )
+
+    runner = ScenarioRunner(data, SolverConfig(max_time_in_seconds=args.time_limit, num_search_workers=args.search_workers))
+    table = runner.run(scenarios, max_workers=args.processes)
+    table.to_csv(args.output)
+
+    print(f"\nSolved {len(table)} scenarios, table written to {args.output}")
+    print("\nPareto-efficient scenarios:")
+    print(table[table['pareto']].to_string())
+
+    if args.schedules:
+        os.makedirs(args.schedules, exist_ok=True)
+        for scenario_id in table.index[table['pareto']]:
+            runner.get_schedule_df(scenario_id).to_csv(os.path.join(args.schedules, f"scenario_{scenario_id}.csv"), index=False)
+
+
+if __name__ == "__main__":
+    main()
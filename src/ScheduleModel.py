@@ -2,6 +2,93 @@ from ortools.sat.python import cp_model
 import pandas as pd
 import math
 import numpy as np
+from collections import defaultdict, namedtuple
+import DataProcessor
+from Instrumentation import PhaseTimer
+from FeasibilityCheck import InfeasibleRosterError, check_feasibility, describe_issues
+from SolverConfig import SolverConfig
+
+# Objective term -> weight attribute, and whether the term is minimised (1) or maximised (-1)
+OBJECTIVE_WEIGHTS = {
+    'total_assignments': 'total_assignments_weight',
+    'assignment_deviation': 'assignment_deviation_weight',
+    'back_to_back': 'back_to_back_weight',
+    'min_proficiency': 'proficiency_deviation_weight',
+    'churn': 'churn_weight',
+}
+OBJECTIVE_SENSES = {
+    'total_assignments': -1,
+    'assignment_deviation': 1,
+    'back_to_back': 1,
+    'min_proficiency': -1,
+    'churn': 1,
+}
+
+def copy_model(model):
+    """
+    Copy of a CpModel's proto, for adding hints, bounds or an objective to.
+
+    Unlike CpModel.Clone it does not create a Python object per variable, so GetIntVarFromProtoIndex
+    does not work on the copy; the original model's variables can be used with it instead.
+    """
+    copied = cp_model.CpModel()
+    copied.Proto().CopyFrom(model.Proto())
+    return copied
+
+
+def fix_variables(model, indices, values):
+    """Fixes the CpModel variables at the given proto indices to values, by shrinking their domains."""
+    variables = model.Proto().variables
+    for index, value in zip(np.asarray(indices).tolist(), np.asarray(values).tolist()):
+        variables[index].domain[:] = [value, value]
+
+
+def set_solution_hint(model, solution):
+    """Hints every variable of a CpModel with a full solution (values indexed like its variables)."""
+    model.ClearHints()
+    hint = model.Proto().solution_hint
+    hint.vars.extend(range(len(solution)))
+    hint.values.extend(np.asarray(solution).tolist())
+
+
+def set_linear_objective(model, indices, coefficients):
+    """
+    Replaces a CpModel's objective with minimizing sum(coefficient * variable) over proto indices.
+
+    Integral coefficients give an exact objective, others a floating point one, as Minimize would.
+    No coefficients leave the model without an objective.
+    """
+    model.ClearObjective()
+    indices, coefficients = list(indices), list(coefficients)
+    if not indices:
+        return
+    if all(float(c).is_integer() for c in coefficients):
+        objective = model.Proto().objective
+        coefficients = [int(c) for c in coefficients]
+    else:
+        objective = model.Proto().floating_point_objective
+    objective.vars.extend(indices)
+    objective.coeffs.extend(coefficients)
+
+
+# Stands in for a CP-SAT variable (by its proto index) in a pickled ScheduleModel
+VariableIndex = namedtuple('VariableIndex', 'index')
+# Groupings of variables only used while building the constraints, left out when pickling
+BUILD_ONLY_ATTRIBUTES = ['shifts_by_member', 'shifts_by_member_week', 'shifts_by_week_job', 'shifts_by_week', 'is_rostered']
+
+
+def map_variables(value, function):
+    """Copy of value (nested dicts, lists and tuples) with function applied to every CP-SAT variable or VariableIndex in it."""
+    if isinstance(value, (cp_model.IntVar, VariableIndex)):
+        return function(value)
+    if isinstance(value, defaultdict):
+        return defaultdict(value.default_factory, {k: map_variables(v, function) for k, v in value.items()})
+    if isinstance(value, dict):
+        return {k: map_variables(v, function) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(map_variables(v, function) for v in value)
+    return value
+
 
 class ScheduleModel:
     def __init__(self, **kwargs):
@@ -28,153 +115,547 @@ class ScheduleModel:
             # If proficiency_df not present, just take all proficiency as 1
             self.proficiency_df = pd.DataFrame(index=self.all_members, columns=self.all_jobs, data=1)
         self.proficiency_deviation_weight = kwargs.get('proficiency_deviation_weight')
+        self.avg_assignments = kwargs.get('avg_assignments')
+
+        # Solver Settings
+        self.solver_config = SolverConfig.from_value(kwargs.get('solver_config'))
+        self.solve_info = None
+
+        # Warm start from a previously generated schedule (None if not present)
+        self.previous_schedule_df = kwargs.get('previous_schedule_df')
+        self.hint_info = None
+        self.hinted_assignments = set()
+        self.churn_weight = kwargs.get('churn_weight') or 0
+
+        # Interchangeable members are solved as one class that fills up to its size of slots a week
+        self.aggregate_members = kwargs.get('aggregate_members', True)
+        self.member_classes = []
+
+        # Frozen assignments are constants rather than variables, and only cells in free_mask
+        # (M x W x J bool, None for everything) get shift variables
+        self.fixed_assignments = set(kwargs.get('fixed_assignments') or [])
+        self.free_mask = kwargs.get('free_mask')
+
+        # Names make the proto readable in logs and dumps, but cost time and memory on large rosters
+        self.variable_names = kwargs.get('variable_names', True)
+
+        # Seconds spent in each build phase
+        self.timer = PhaseTimer()
+
+        # Aligned NumPy masks so model construction never does per-cell label lookups
+        with self.timer.span('masks'):
+            masks = DataProcessor.get_masks(
+                self.availability_df, self.skills_df, self.all_members, self.all_weeks, self.all_jobs,
+                proficiency_df=self.proficiency_df, max_roster_df=self.max_roster_df
+            )
+        self.availability_mask = masks['availability_mask']
+        self.skills_mask = masks['skills_mask']
+        self.proficiency_matrix = masks['proficiency_matrix']
+        self.feasible_mask = masks['feasible_mask']
+        self.max_roster_limits = masks['max_roster_limits']
+
+        member_index = {m: i for i, m in enumerate(self.all_members)}
+        week_index = {w: i for i, w in enumerate(self.all_weeks)}
+        job_index = {j: i for i, j in enumerate(self.all_jobs)}
+        self.fixed_mask = np.zeros_like(self.feasible_mask)
+        for m, w, j in self.fixed_assignments:
+            self.fixed_mask[member_index[m], week_index[w], job_index[j]] = True
+        self.variable_mask = self._get_variable_mask()
+        self.crucial_mask = np.isin(np.array(self.all_jobs, dtype=object), list(self.crucial_jobs))
+
+        # Catch crucial jobs that cannot be filled before building anything CP-SAT would have to refute
+        with self.timer.span('feasibility'):
+            self.feasibility_report = check_feasibility(
+                self.variable_mask, self.crucial_mask, self.all_members, self.all_weeks, self.all_jobs,
+                max_roster_limits=self.max_roster_limits, fixed_mask=self.fixed_mask,
+            )
+        if not self.feasibility_report['feasible']:
+            raise InfeasibleRosterError("\nNo solution found:\n" + describe_issues(self.feasibility_report), self.feasibility_report)
+
+        # Only the first member of a class gets variables, standing for class_sizes of them
+        if self.aggregate_members:
+            with self.timer.span('member_classes'):
+                self.member_classes = self._get_member_classes()
+        self.class_sizes = np.ones(len(self.all_members), dtype=np.int64)
+        for members in self.member_classes:
+            self.class_sizes[members] = 0
+            self.class_sizes[members[0]] = len(members)
+        self.model_members = [m for m_idx, m in enumerate(self.all_members) if self.class_sizes[m_idx]]
+        self.class_size = {m: int(size) for m, size in zip(self.all_members, self.class_sizes)}
 
         self.model = cp_model.CpModel()
         self.shifts = {}
         self.total_assignments = {}
         self.back_to_back = {}
-        self.deviation = {}
         self.squared_assignment_deviation = {}
         self.total_proficiency_per_week = {}
 
 
         # Set Constraints and Objectives
-        self._create_variables()
-        self._add_base_constraints()
-        self._add_custom_constraints()
-        self._set_objective()
+        with self.timer.span('variables'):
+            self._create_variables()
+        with self.timer.span('constraints'):
+            self._add_base_constraints()
+            self._add_custom_constraints()
+        with self.timer.span('objective'):
+            self._set_objective()
+
+        if isinstance(self.previous_schedule_df, pd.DataFrame):
+            with self.timer.span('hints'):
+                self.hint_info = self.add_hints(self.previous_schedule_df)
     
+    def _get_variable_mask(self):
+        # Only create shifts for (member, week, job) triples that pass availability and skills,
+        # are free, and whose job and member-week are not already taken by a fixed assignment
+        self.fixed_job_filled = self.fixed_mask.any(axis=0)  # W x J
+        self.fixed_member_rostered = self.fixed_mask.any(axis=2)  # M x W
+        variable_mask = self.feasible_mask & ~self.fixed_job_filled[None, :, :] & ~self.fixed_member_rostered[:, :, None]
+        if self.free_mask is not None:
+            variable_mask &= self.free_mask
+        return variable_mask
+
+    def _get_member_classes(self):
+        # Members are interchangeable when they can take the same shifts, have the same fixed
+        # assignments, proficiency and limit, and no previous schedule tells them apart
+        previous_mask = np.zeros_like(self.fixed_mask)
+        if isinstance(self.previous_schedule_df, pd.DataFrame):
+            member_index = {m: i for i, m in enumerate(self.all_members)}
+            week_index = {w: i for i, w in enumerate(self.all_weeks)}
+            job_index = {j: i for i, j in enumerate(self.all_jobs)}
+            for m, w, j in DataProcessor.get_assignments(self.previous_schedule_df, self.all_weeks)[0]:
+                if m in member_index and j in job_index:
+                    previous_mask[member_index[m], week_index[w], job_index[j]] = True
+        return DataProcessor.get_member_classes(
+            self.variable_mask, self.fixed_mask, previous_mask, self.proficiency_matrix, self.max_roster_limits
+        )
+
     def _create_variables(self):
-        self.shifts = {
-            (m, w, j): self.model.NewBoolVar(f"shift_m{m}_w{w}_j{j}")
-            for m in self.all_members for w in self.all_weeks for j in self.all_jobs
-        }
-        
+        variable_mask = self.variable_mask & (self.class_sizes > 0)[:, None, None]
+        self.shift_indices = np.argwhere(variable_mask)
+        self.shifts = {}
+
+        # Group the sparse keys so every sum only visits shifts that exist
+        self.shifts_by_member = defaultdict(list)
+        self.shifts_by_member_week = defaultdict(list)
+        self.shifts_by_week_job = defaultdict(list)
+        self.shifts_by_week = defaultdict(list)
+        shift_var_indices = []
+        names = self.variable_names
+        for m_idx, w_idx, j_idx in self.shift_indices.tolist():
+            m, w, j = self.all_members[m_idx], self.all_weeks[w_idx], self.all_jobs[j_idx]
+            shift = self.model.NewBoolVar(f"shift_m{m}_w{w}_j{j}" if names else "")
+            self.shifts[(m, w, j)] = shift
+            shift_var_indices.append(shift.Index())
+            self.shifts_by_member[m].append(shift)
+            self.shifts_by_member_week[(m, w)].append(shift)
+            self.shifts_by_week_job[(w, j)].append(shift)
+            self.shifts_by_week[w].append((shift, int(self.proficiency_matrix[m_idx, j_idx])))
+        # Proto index of each shift, in shift_indices order, for reading all values back in one go
+        self.shift_var_indices = np.array(shift_var_indices, dtype=np.int64)
+
+        # One shared "rostered in week w" indicator per (member, week); a lone shift is its own indicator,
+        # and a fixed assignment makes it the constant True. For a class it counts the members rostered.
+        self.is_rostered = {}
+        for (m, w), member_shifts in self.shifts_by_member_week.items():
+            size = self.class_size[m]
+            if len(member_shifts) == 1:
+                self.is_rostered[(m, w)] = member_shifts[0]
+            elif size == 1:
+                self.is_rostered[(m, w)] = self.model.NewBoolVar(f"is_rostered_{m}_{w}" if names else "")
+            else:
+                self.is_rostered[(m, w)] = self.model.NewIntVar(0, min(size, len(member_shifts)), f"is_rostered_{m}_{w}" if names else "")
+        for m_idx, w_idx in np.argwhere(self.fixed_member_rostered).tolist():
+            self.is_rostered[(self.all_members[m_idx], self.all_weeks[w_idx])] = True
+
+        # Constant contributions of the fixed assignments
+        self.fixed_assignments_per_member = self.fixed_mask.sum(axis=(1, 2))
+        self.fixed_proficiency_per_week = (self.fixed_mask * self.proficiency_matrix[:, None, :]).sum(axis=(0, 2))
+
+        # A member works at most one job per week, so their total is bounded by the weeks they can work
+        # (and by their max roster, if they have one)
+        weeks_workable = self.variable_mask.any(axis=2).sum(axis=1)
+        limited = self.max_roster_limits != -1
+        weeks_workable[limited] = np.minimum(weeks_workable[limited], self.max_roster_limits[limited] - self.fixed_assignments_per_member[limited])
+        weeks_workable = np.maximum(weeks_workable, 0) + self.fixed_assignments_per_member
+        self.max_assignments = {m: int(weeks_workable[m_idx]) for m_idx, m in enumerate(self.all_members)}
+
         self.total_assignments = {
-            m: self.model.NewIntVar(0, len(self.all_weeks) * len(self.all_jobs), f"total_assignments_{m}")
-            for m in self.all_members
+            m: self.model.NewIntVar(0, self.max_assignments[m] * self.class_size[m], f"total_assignments_{m}" if names else "")
+            for m in self.model_members
         }
-        
-        self.deviation = {
-            m: self.model.NewIntVar(0, len(self.all_weeks) * len(self.all_jobs), f"deviation_{m}")
+
+        # Squared deviation can only take one value per possible total, so it is looked up in a table
+        # The fairness target can be overridden, e.g. to keep the full roster's average when solving one pool
+        if self.avg_assignments is None:
+            self.avg_assignments = len(self.all_weeks) * len(self.all_jobs) // len(self.all_members)
+        self.squared_deviation_table = {
+            m: [(t - self.avg_assignments) ** 2 for t in range(self.max_assignments[m] + 1)]
             for m in self.all_members
         }
-        
+        # A class's total is spread as evenly as possible over its members (see get_assignment),
+        # so its deviation is the sum over a split into totals q and q + 1
+        self.class_deviation_table = {}
+        for m in self.model_members:
+            size = self.class_size[m]
+            self.class_deviation_table[m] = [
+                (size - t % size) * (t // size - self.avg_assignments) ** 2 + (t % size) * (t // size + 1 - self.avg_assignments) ** 2
+                for t in range(self.max_assignments[m] * size + 1)
+            ]
         self.squared_assignment_deviation = {
-            m: self.model.NewIntVar(0, (len(self.all_weeks) * len(self.all_jobs)) ** 2, f"squared_assignment_deviation_{m}")
-            for m in self.all_members
+            m: self.model.NewIntVar(min(self.class_deviation_table[m]), max(self.class_deviation_table[m]), f"squared_assignment_deviation_{m}" if names else "")
+            for m in self.model_members
         }
         
         self.back_to_back = {
-            m: self.model.NewIntVar(0, len(self.all_weeks) - 1, f"back_to_back_{m}")
-            for m in self.all_members
+            m: self.model.NewIntVar(0, (len(self.all_weeks) - 1) * self.class_size[m], f"back_to_back_{m}" if names else "")
+            for m in self.model_members
         }
+        total_proficiency = int(self.proficiency_matrix.sum())
         self.total_proficiency_per_week = {
-            w: self.model.NewIntVar(0, sum(self.proficiency_df.values.flatten()), f"total_proficiency_week_{w}")
+            w: self.model.NewIntVar(0, total_proficiency, f"total_proficiency_week_{w}" if names else "")
             for w in self.all_weeks
         }
 
-        self.min_proficiency_per_week = self.model.NewIntVar(0, np.sum(self.proficiency_df.values), "min_proficiency_per_week")
+        self.min_proficiency_per_week = self.model.NewIntVar(0, total_proficiency, "min_proficiency_per_week" if names else "")
 
 
     def _add_base_constraints(self):
-        # Crucial job assignment constraints
+        # Availability and skill constraints are implied: infeasible shifts are never created
+
+        # Jobs already filled by a fixed assignment need no constraint (their other shifts are never created)
+        job_filled = {
+            (w, j): bool(self.fixed_job_filled[w_idx, j_idx])
+            for w_idx, w in enumerate(self.all_weeks) for j_idx, j in enumerate(self.all_jobs)
+        }
+
+        # Crucial job assignment constraints (an empty list makes the model infeasible, as it should)
         for w in self.all_weeks:
             for j in self.crucial_jobs:
-                self.model.AddExactlyOne(self.shifts[(m, w, j)] for m in self.all_members)
+                if not job_filled[(w, j)]:
+                    self.model.AddExactlyOne(self.shifts_by_week_job[(w, j)])
 
         # Non-crucial job constraints
         for w in self.all_weeks:
             for j in self.non_crucial_jobs:
-                self.model.AddAtMostOne(self.shifts[(m, w, j)] for m in self.all_members)
-
-        # Each member does at most one job per week
-        for m in self.all_members:
-            for w in self.all_weeks:
-                self.model.AddAtMostOne(self.shifts[(m, w, j)] for j in self.all_jobs)
-
-        # Availability constraints
-        for m in self.all_members:
-            for w in self.all_weeks:
-                if not self.availability_df.loc[m, w]: 
-                    for j in self.all_jobs:
-                        self.model.Add(self.shifts[(m, w, j)] == 0)
-
-        # Skill constraints
-        for m in self.all_members:
-            for j in self.all_jobs:
-                if not self.skills_df.loc[m, j]: 
-                    for w in self.all_weeks:
-                        self.model.Add(self.shifts[(m, w, j)] == 0)
+                if len(self.shifts_by_week_job[(w, j)]) > 1:
+                    self.model.AddAtMostOne(self.shifts_by_week_job[(w, j)])
+
+        # Each member does at most one job per week (member-weeks with a fixed assignment have no shifts).
+        # A class's week count is capped at its size by its domain instead.
+        for (m, w), member_shifts in self.shifts_by_member_week.items():
+            if len(member_shifts) > 1 and self.class_size[m] == 1:
+                self.model.AddAtMostOne(member_shifts)
         
 
     def _add_custom_constraints(self):
         try:
-            # Max Rostering Constraint
-            if isinstance(self.max_roster_df, pd.DataFrame):
-                for m in self.all_members:
-                    max_shifts = self.max_roster_df.loc[m, "max_roster"]
-                    if max_shifts != -1:  # Only enforce if there is a limit
-                        self.model.Add(self.total_assignments[m] <= max_shifts)
+            # Max Rostering Constraint (-1 means there is no limit)
+            # Frozen assignments can already exceed a limit, in which case no more are allowed
+            for m_idx in np.flatnonzero((self.max_roster_limits != -1) & (self.class_sizes > 0)):
+                m = self.all_members[m_idx]
+                limit = max(self.max_roster_limits[m_idx], self.fixed_assignments_per_member[m_idx])
+                self.model.Add(self.total_assignments[m] <= int(limit) * self.class_size[m])
         except:
             raise ValueError("One of the custom constraint didnt work...")
     
     def _set_objective(self):
                 
         # Penalise Deviation in Assignments
-        avg_assignments = len(self.all_weeks) * len(self.all_jobs) // len(self.all_members)
-        for m in self.all_members:
-            self.model.Add(self.total_assignments[m] == sum(self.shifts[(m, w, j)] for w in self.all_weeks for j in self.all_jobs))
-            # Get absolute deviation
-            self.model.Add(self.deviation[m] >= self.total_assignments[m] - avg_assignments)
-            self.model.Add(self.deviation[m] >= avg_assignments - self.total_assignments[m])
-            # Square deviation to penalise outliers more
-            self.model.AddMultiplicationEquality(self.squared_assignment_deviation[m], [self.deviation[m], self.deviation[m]])
+        for m_idx, m in enumerate(self.all_members):
+            if m not in self.total_assignments:
+                continue  # Counted by their class's first member
+            self.model.Add(self.total_assignments[m] == sum(self.shifts_by_member[m]) + int(self.fixed_assignments_per_member[m_idx]))
+            # Square deviation to penalise outliers more: squared_assignment_deviation = table[total_assignments]
+            self.model.AddElement(self.total_assignments[m], self.class_deviation_table[m], self.squared_assignment_deviation[m])
+
+        # Each member does at most one job per week, so the indicator is exactly the week's shift sum
+        for (m, w), member_shifts in self.shifts_by_member_week.items():
+            if len(member_shifts) > 1:
+                self.model.Add(self.is_rostered[(m, w)] == sum(member_shifts))
 
         # Penalise Consecutive week assignments
-        for m in self.all_members:
+        names = self.variable_names
+        for m in self.model_members:
+            size = self.class_size[m]
             consecutive_assignments = []
-            for w_idx in range(len(self.all_weeks) - 1):
-                is_rostered_w = self.model.NewBoolVar(f"is_rostered_{m}_{self.all_weeks[w_idx]}")
-                is_rostered_w_next = self.model.NewBoolVar(f"is_rostered_{m}_{self.all_weeks[w_idx + 1]}")
-                self.model.Add(is_rostered_w == sum(self.shifts[(m, self.all_weeks[w_idx], j)] for j in self.all_jobs))
-                self.model.Add(is_rostered_w_next == sum(self.shifts[(m, self.all_weeks[w_idx + 1], j)] for j in self.all_jobs))
-                consecutive = self.model.NewBoolVar(f"consecutive_{m}_{self.all_weeks[w_idx]}")
-                self.model.AddMultiplicationEquality(consecutive, [is_rostered_w, is_rostered_w_next])
-                consecutive_assignments.append(consecutive)
-            self.model.Add(self.back_to_back[m] == sum(consecutive_assignments))
+            fixed_consecutive = 0
+            for w, w_next in zip(self.all_weeks, self.all_weeks[1:]):
+                is_rostered_w = self.is_rostered.get((m, w))
+                is_rostered_w_next = self.is_rostered.get((m, w_next))
+                if is_rostered_w is None or is_rostered_w_next is None:
+                    continue  # Member cannot work one of the two weeks, so never back to back
+                if size > 1:
+                    # Members of a class take turns (see get_assignment), so only the count beyond
+                    # the class size works both weeks
+                    overlap = self.model.NewIntVar(0, size, f"consecutive_{m}_{w}" if names else "")
+                    self.model.AddMaxEquality(overlap, [0, is_rostered_w + is_rostered_w_next - size])
+                    consecutive_assignments.append(overlap)
+                elif is_rostered_w is True and is_rostered_w_next is True:
+                    fixed_consecutive += 1
+                elif is_rostered_w is True or is_rostered_w_next is True:
+                    # One week is fixed, so the pair is back to back exactly when the other week is rostered
+                    consecutive_assignments.append(is_rostered_w_next if is_rostered_w is True else is_rostered_w)
+                else:
+                    # consecutive <=> is_rostered_w AND is_rostered_w_next
+                    consecutive = self.model.NewBoolVar(f"consecutive_{m}_{w}" if names else "")
+                    self.model.AddImplication(consecutive, is_rostered_w)
+                    self.model.AddImplication(consecutive, is_rostered_w_next)
+                    self.model.AddBoolOr([is_rostered_w.Not(), is_rostered_w_next.Not(), consecutive])
+                    consecutive_assignments.append(consecutive)
+            self.model.Add(self.back_to_back[m] == sum(consecutive_assignments) + fixed_consecutive)
             
 
         # Maximise the minimum proficiency across all weeks - naturally decreases deviation as well
-        for w in self.all_weeks:
+        for w_idx, w in enumerate(self.all_weeks):
             self.model.Add(self.total_proficiency_per_week[w] == sum(
-                self.shifts[(m, w, j)] * self.proficiency_df.loc[m, j]
-                for m in self.all_members
-                for j in self.all_jobs
-            ))
+                shift * proficiency
+                for shift, proficiency in self.shifts_by_week[w]
+                if proficiency != 0
+            ) + int(self.fixed_proficiency_per_week[w_idx]))
 
         # Ensure min_proficiency_per_week is the minimum among all weeks
         self.model.AddMinEquality(self.min_proficiency_per_week, list(self.total_proficiency_per_week.values()))
 
 
+        # Each objective term is summed into one variable, so weights can be changed without rebuilding
+        self.objective_components = {
+            'total_assignments': self._new_sum_var(self.total_assignments.values(), "objective_total_assignments"),
+            'assignment_deviation': self._new_sum_var(self.squared_assignment_deviation.values(), "objective_assignment_deviation"),
+            'back_to_back': self._new_sum_var(self.back_to_back.values(), "objective_back_to_back"),
+            'min_proficiency': self.min_proficiency_per_week,
+        }
+        if self.churn_weight and self.previous_schedule_df is not None:
+            churn, max_churn = self._churn_expression()
+            self.objective_components['churn'] = self.model.NewIntVar(0, max_churn, "objective_churn" if names else "")
+            self.model.Add(self.objective_components['churn'] == churn)
+
+        self.set_objective_weights()
+
+    def _new_sum_var(self, variables, name):
+        """Creates an IntVar equal to the sum of the given variables, bounded by their domains."""
+        variables = list(variables)
+        lower = sum(self.model.Proto().variables[v.Index()].domain[0] for v in variables)
+        upper = sum(self.model.Proto().variables[v.Index()].domain[-1] for v in variables)
+        total = self.model.NewIntVar(lower, upper, name if self.variable_names else "")
+        self.model.Add(total == sum(variables))
+        return total
+
+    def set_objective_weights(self, **weights):
+        """
+        Sets (or re-sets) the objective from the current weights, updated with any given as keyword arguments.
+
+        Only the objective changes; variables and constraints are reused, so sweeping weights is cheap.
+        """
+        for name, value in weights.items():
+            if name not in OBJECTIVE_WEIGHTS.values():
+                raise ValueError(f"Unknown objective weight '{name}'")
+            setattr(self, name, value)
+
         terms = []
-        if self.total_assignments_weight != 0:
-            terms.append(-sum(self.total_assignments[m] for m in self.all_members) * self.total_assignments_weight)
-        if self.assignment_deviation_weight != 0:
-            terms.append(sum(self.squared_assignment_deviation[m] for m in self.all_members) * self.assignment_deviation_weight)
-        if self.back_to_back_weight != 0:
-            terms.append(sum(self.back_to_back[m] for m in self.all_members) * self.back_to_back_weight)
-        if self.proficiency_deviation_weight != 0 and self.proficiency_deviation_weight:
-            terms.append(-self.min_proficiency_per_week * self.proficiency_deviation_weight)
+        for component, weight_name in OBJECTIVE_WEIGHTS.items():
+            weight = getattr(self, weight_name)
+            if component in self.objective_components and weight:
+                terms.append(self.objective_components[component] * weight * OBJECTIVE_SENSES[component])
 
+        self.model.ClearObjective()
         if terms:
             self.model.Minimize(sum(terms))
 
-    def solve(self):
+    def clone(self):
+        """
+        Copy that shares the variable bookkeeping but has its own CpModel.
+
+        The copy's objective weights and solver settings can be changed without affecting this
+        model, so a built model can be kept and re-solved under different settings.
+        """
+        cloned = object.__new__(type(self))
+        cloned.__dict__.update(self.__dict__)
+        cloned.model = copy_model(self.model)
+        cloned.timer = self.timer.copy()
+        return cloned
+
+    def __getstate__(self):
+        """
+        Pickles the CpModel as its serialized proto and every variable as its proto index.
+
+        A built model can then be written to disk or sent to a worker process, which gets it back
+        with all its bookkeeping (except BUILD_ONLY_ATTRIBUTES) without running the build again.
+        """
+        state = {
+            name: map_variables(value, lambda var: VariableIndex(var.Index()))
+            for name, value in self.__dict__.items() if name != 'model' and name not in BUILD_ONLY_ATTRIBUTES
+        }
+        state['model'] = self.model.Proto().SerializeToString()
+        return state
+
+    def __setstate__(self, state):
+        # Like copy_model, only the variables the model refers to get a Python object
+        model = cp_model.CpModel()
+        model.Proto().ParseFromString(state.pop('model'))
+        proto = model.Proto()
+        variables = {}
+
+        def get_variable(ref):
+            var = variables.get(ref.index)
+            if var is None:
+                domain = proto.variables[ref.index].domain
+                is_boolean = len(domain) == 2 and domain[0] >= 0 and domain[1] <= 1
+                var = variables[ref.index] = cp_model.IntVar(proto, ref.index, is_boolean, None)
+            return var
+
+        self.__dict__.update({name: map_variables(value, get_variable) for name, value in state.items()})
+        self.model = model
+
+    def _churn_expression(self):
+        """Number of previous assignments (that still have a shift variable) the new schedule drops, and its maximum."""
+        previous_assignments, _ = DataProcessor.get_assignments(self.previous_schedule_df, self.all_weeks)
+        kept = [self.shifts[key] for key in previous_assignments if key in self.shifts]
+        return len(kept) - sum(kept), len(kept)
+
+    def add_hints(self, schedule_df):
+        """
+        Hints the solver with a previous schedule, in the shape SolutionViewer.generate_schedule_df returns.
+
+        Assignments that are no longer feasible (member unavailable, unskilled or unknown) are dropped,
+        and fixed assignments are skipped since they are already constants.
+        Every other shift in the weeks covered by the previous schedule is hinted as unassigned.
+
+        Returns:
+            dict: Counts of previous, hinted and dropped assignments, and the fraction that survived.
+        """
+        previous_assignments, hinted_weeks = DataProcessor.get_assignments(schedule_df, self.all_weeks)
+
+        hinted = set()
+        dropped = []
+        for key in previous_assignments:
+            if key in self.shifts:
+                hinted.add(key)
+            elif key not in self.fixed_assignments:
+                dropped.append(key)
+
+        # Complete hint over the covered weeks, so the solver starts from the whole old roster
+        hinted_week_set = set(hinted_weeks)
+        self.model.ClearHints()
+        for key, shift in self.shifts.items():
+            if key[1] in hinted_week_set:
+                self.model.AddHint(shift, key in hinted)
+
+        previous_assignments = len(hinted) + len(dropped)
+        self.hinted_assignments = hinted
+        return {
+            'hinted_weeks': len(hinted_weeks),
+            'previous_assignments': previous_assignments,
+            'hinted_assignments': len(hinted),
+            'dropped_assignments': len(dropped),
+            'dropped': dropped,
+            'hint_completion': len(hinted) / previous_assignments if previous_assignments else 0.0,
+        }
+
+    def get_shift_values(self, assignment):
+        """Value of each shift (in shift_indices order) for an M x W x J bool assignment, classes on their first member."""
+        assignment = assignment.copy()
+        for members in self.member_classes:
+            assignment[members[0]] = assignment[members].any(axis=0)
+        return assignment[tuple(self.shift_indices.T)].astype(np.int64)
+
+    def complete_assignment(self, assignment):
+        """
+        Value of every model variable for an M x W x J bool assignment, e.g. a QuickRoster schedule.
+
+        The shifts are fixed to the assignment in a copy of the model, which is solved for the rest.
+
+        Returns:
+            np.ndarray: Values indexed like the model's variables, or None if the assignment breaks a hard rule.
+        """
+        fixed = copy_model(self.model)
+        fix_variables(fixed, self.shift_var_indices, self.get_shift_values(assignment))
         solver = cp_model.CpSolver()
-        status = solver.Solve(self.model)
+        solver.parameters.num_workers = 1
+        status = solver.Solve(fixed)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        return np.asarray(solver.ResponseProto().solution, dtype=np.int64)
+
+    def hint_assignment(self, assignment):
+        """
+        Hints the solver with a whole solution built from an M x W x J bool assignment (see complete_assignment).
+
+        Starting from a complete solution, the search does not have to repair a partial one. If the
+        assignment breaks a hard rule only the shifts are hinted.
+
+        Returns:
+            int: Shifts hinted as assigned.
+        """
+        values = self.get_shift_values(assignment)
+        solution = self.complete_assignment(assignment)
+        self.model.ClearHints()
+        if solution is not None:
+            set_solution_hint(self.model, solution)
+        else:
+            for shift, value in zip(self.shifts.values(), values.tolist()):
+                self.model.AddHint(shift, value)
+        return int(values.sum())
+
+    def solve(self, solution_callback=None, solver=None):
+        """
+        Solves the model with self.solver_config.
+
+        Args:
+            solution_callback: Optional CpSolverSolutionCallback called on every improving solution.
+            solver: Optional CpSolver to use, so another thread can call its StopSearch.
+        """
+        solver = self.solver_config.apply(solver if solver is not None else cp_model.CpSolver())
+        status = solver.Solve(self.model, solution_callback)
+        self.solve_info = self._get_solve_info(solver, status)
         return solver, status
 
+    def get_objective_breakdown(self, solver):
+        """Unweighted value of each objective component in the solver's solution."""
+        return {name: int(solver.Value(var)) for name, var in self.objective_components.items()}
+
+    def get_assignment(self, solution):
+        """
+        M x W x J bool array of the assignments in a solution, fixed assignments included.
+
+        Args:
+            solution (array-like): Value of every model variable, e.g. the response's solution field.
+
+        The slots a class of interchangeable members fills are handed to its members in turn,
+        carrying on from week to week, which evens out their totals and keeps back to backs to
+        the minimum the model counted.
+        """
+        assignment = self.fixed_mask.copy()
+        solution = np.asarray(solution, dtype=np.int64)
+        assignment[tuple(self.shift_indices.T)] = solution[self.shift_var_indices].astype(bool)
+        for members in self.member_classes:
+            slots = np.argwhere(assignment[members[0]])  # (week, job), in week order
+            assignment[members[0]] = False
+            turns = members[np.arange(len(slots)) % len(members)]
+            assignment[turns, slots[:, 0], slots[:, 1]] = True
+        return assignment
+
+    def get_assignments(self, solution):
+        """(member, week, job) of every assignment in a solution (see get_assignment), fixed assignments included."""
+        assignment = self.get_assignment(solution)
+        return [
+            (self.all_members[m], self.all_weeks[w], self.all_jobs[j])
+            for m, w, j in np.argwhere(assignment).tolist()
+        ]
+
+    def _get_solve_info(self, solver, status):
+        """Summarises how the solve ended: status, objective, best bound and relative gap."""
+        found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        objective = solver.ObjectiveValue() if found else None
+        bound = solver.BestObjectiveBound() if found else None
+        gap = abs(objective - bound) / max(1.0, abs(objective)) if found else None
+        return {
+            'status': solver.StatusName(status),
+            'objective': objective,
+            'best_bound': bound,
+            'gap': gap,
+            'wall_time': solver.WallTime(),
+        }
+
     # def add_tri_roster_constraint(self):
     #     # No member should be rostered three weeks in a row
     #     for m in self.all_members:
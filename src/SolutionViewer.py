@@ -1,10 +1,9 @@
 import pandas as pd
 import numpy as np
 import ScheduleModel
-import plotly.express as px
 
 class SolutionViewer:
-    def __init__(self, solver, model:ScheduleModel):
+    def __init__(self, solver, model:ScheduleModel, solution=None):
         """
         Initializes the ScheduleGenerator with the solver and scheduling constraints.
         
@@ -15,49 +14,67 @@ class SolutionViewer:
         :param all_members: List of all members.
         :param all_weeks: List of all weeks.
         :param all_jobs: List of all jobs.
+        :param solution: Optional array of variable values (e.g. from a solution callback) to view instead of the solver's final one.
         """
         self.solver = solver
-        self.shifts = model.shifts
         self.total_assignments = model.total_assignments
         self.squared_assignment_deviation = model.squared_assignment_deviation
         self.back_to_back = model.back_to_back
         self.all_members = model.all_members
         self.all_weeks = model.all_weeks
         self.all_jobs = model.all_jobs
+        self.proficiency_matrix = model.proficiency_matrix
+        self.squared_deviation_table = model.squared_deviation_table
 
         self.total_proficiency_per_week = model.total_proficiency_per_week
+
+        # Pull every shift value in one go into an M x W x J array, together with the fixed assignments
+        if solution is None:
+            solution = solver.ResponseProto().solution
+        self.assignment = model.get_assignment(solution)
         
         self.schedule_df = None
 
     def generate_schedule_df(self):
         """Converts the solver result into a Pandas DataFrame."""
-        solution_df = pd.DataFrame()
-        solution_df["Job"] = self.all_jobs
-
-        for w in self.all_weeks:
-            week_list = []
-            for j in self.all_jobs:
-                job_filled = False
-                for m in self.all_members:
-                    if self.solver.Value(self.shifts[(m, w, j)]):
-                        week_list.append(m)
-                        job_filled = True
-                        break
-                if not job_filled:
-                    week_list.append(np.nan)
-            solution_df[f"{w}"] = week_list
+        # Each (week, job) has at most one member, so argmax finds them all at once
+        filled = self.assignment.any(axis=0)  # W x J
+        member_idx = self.assignment.argmax(axis=0)  # W x J
+        schedule = np.where(filled, np.asarray(self.all_members, dtype=object)[member_idx], np.nan)
+
+        solution_df = pd.DataFrame(schedule.T, columns=[f"{w}" for w in self.all_weeks])
+        solution_df.insert(0, "Job", self.all_jobs)
 
         self.schedule_df = solution_df
         return solution_df
 
+    def get_metrics(self):
+        """Per-member totals, back to back counts and weekly proficiency, derived from the assignment array."""
+        rostered = self.assignment.any(axis=2)  # M x W
+        total_assignments = self.assignment.sum(axis=(1, 2))
+        back_to_back = (rostered[:, :-1] & rostered[:, 1:]).sum(axis=1)
+        proficiency = (self.assignment * self.proficiency_matrix[:, None, :]).sum(axis=(0, 2))
+        squared_assignment_deviation = np.array([
+            self.squared_deviation_table[m][t] for m, t in zip(self.all_members, total_assignments)
+        ])
+        return {
+            'total_assignments': pd.Series(total_assignments, index=self.all_members),
+            'back_to_back': pd.Series(back_to_back, index=self.all_members),
+            'squared_assignment_deviation': pd.Series(squared_assignment_deviation, index=self.all_members),
+            'total_proficiency_per_week': pd.Series(proficiency, index=self.all_weeks),
+        }
+
     def analyze_schedule(self):
         """Generates analytics based on the schedule."""
+        import plotly.express as px  # Only needed for charts, so headless runs never import plotly
+
         if self.schedule_df is None:
             raise ValueError("Schedule not generated. Call generate_schedule_df() first.")
 
+        metrics = self.get_metrics()
+
         # Total assignments per member
-        assignments = {m: self.solver.Value(self.total_assignments[m]) for m in self.all_members}
-        sorted_assignments = dict(sorted(assignments.items(), key=lambda item: item[1], reverse=True))
+        sorted_assignments = metrics['total_assignments'].sort_values(ascending=False, kind="stable").to_dict()
 
         # Bar chart for total assignments per member with different colors
         fig_assignments = px.bar(
@@ -75,7 +92,7 @@ class SolutionViewer:
         )
 
         # Total proficiency per week
-        proficiency = {w: self.solver.Value(self.total_proficiency_per_week[w]) for w in self.all_weeks}
+        proficiency = metrics['total_proficiency_per_week'].to_dict()
 
         # Bar chart for total proficiency per week with consistent hue
         fig_proficiency = px.bar(
@@ -93,8 +110,7 @@ class SolutionViewer:
         )
 
         # Back-to-back rosters heatmap
-        back_to_back_data = {m: self.solver.Value(self.back_to_back[m]) for m in self.all_members}
-        df_back_to_back = pd.DataFrame(list(back_to_back_data.items()), columns=["Member", "BackToBackCount"])
+        df_back_to_back = metrics['back_to_back'].rename_axis("Member").reset_index(name="BackToBackCount")
 
         # Group the data by back-to-back count and get the list of members
         back_to_back_summary = df_back_to_back.groupby('BackToBackCount').agg({
@@ -123,8 +139,8 @@ class SolutionViewer:
         )
 
         # Print additional metrics
-        print(f"Squared Assignment Deviation: {sum(self.solver.Value(self.squared_assignment_deviation[m]) for m in self.all_members)}")
-        print(f"Back to back rosters: {sum(self.solver.Value(self.back_to_back[m]) for m in self.all_members)}")
-        print(f"Kena Back to Back Roster: {[m for m in self.all_members if self.solver.Value(self.back_to_back[m]) > 0]}")
+        print(f"Squared Assignment Deviation: {metrics['squared_assignment_deviation'].sum()}")
+        print(f"Back to back rosters: {metrics['back_to_back'].sum()}")
+        print(f"Kena Back to Back Roster: {list(metrics['back_to_back'].index[metrics['back_to_back'] > 0])}")
 
         return fig_assignments, fig_proficiency, fig_back_to_back
\ No newline at end of file
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, asdict, fields
+
+# CP-SAT parameters applied for each presolve level ("default" leaves CP-SAT's own settings)
+PRESOLVE_LEVELS = {
+    "off": {'cp_model_presolve': False},
+    "light": {'max_presolve_iterations': 1, 'cp_model_probing_level': 0},
+    "default": {},
+    "aggressive": {'max_presolve_iterations': 10},
+}
+
+
+@dataclass
+class SolverConfig:
+    """
+    Settings passed to the CP-SAT solver in ScheduleModel.solve.
+
+    Args:
+        max_time_in_seconds: Stop the search after this long and keep the best roster found (None for no limit).
+        num_search_workers: Number of parallel search workers (0 lets CP-SAT decide).
+        relative_gap_limit: Stop once (objective - bound) / objective is at most this value.
+        random_seed: Seed for a deterministic search (None for CP-SAT's default).
+        log_search_progress: Print CP-SAT's search log to stdout.
+        presolve_level: One of "off", "light", "default" or "aggressive".
+        keep_solve_log: Keep CP-SAT's log in the response (without printing it), for the presolve statistics.
+                        Off by default, since logging slows every solve down a little.
+    """
+    max_time_in_seconds: float = 60.0
+    num_search_workers: int = 0
+    relative_gap_limit: float = 0.0
+    random_seed: int = None
+    log_search_progress: bool = False
+    presolve_level: str = "default"
+    keep_solve_log: bool = False
+
+    def __post_init__(self):
+        if self.presolve_level not in PRESOLVE_LEVELS:
+            raise ValueError(f"Unknown presolve level '{self.presolve_level}', choose from {list(PRESOLVE_LEVELS)}")
+
+    @classmethod
+    def from_value(cls, value):
+        """Builds a SolverConfig from None, a dict of settings or an existing SolverConfig."""
+        if value is None:
+            return cls()
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            known = {f.name for f in fields(cls)}
+            unknown = set(value) - known
+            if unknown:
+                raise ValueError(f"Unknown solver settings: {sorted(unknown)}")
+            return cls(**value)
+        raise TypeError(f"solver_config must be a SolverConfig or dict, got {type(value).__name__}")
+
+    def apply(self, solver):
+        """Copies the settings onto a cp_model.CpSolver."""
+        params = solver.parameters
+        if self.max_time_in_seconds is not None:
+            params.max_time_in_seconds = float(self.max_time_in_seconds)
+        params.num_workers = int(self.num_search_workers)
+        params.relative_gap_limit = float(self.relative_gap_limit)
+        if self.random_seed is not None:
+            params.random_seed = int(self.random_seed)
+        params.log_search_progress = bool(self.log_search_progress or self.keep_solve_log)
+        params.log_to_stdout = bool(self.log_search_progress)
+        params.log_to_response = bool(self.keep_solve_log)
+        for name, value in PRESOLVE_LEVELS[self.presolve_level].items():
+            setattr(params, name, value)
+        return solver
+
+    def to_dict(self):
+        return asdict(self)
@@ -0,0 +1,168 @@
+"""
+Generates synthetic roster inputs at any scale, in the shape of the files the app reads.
+
+Members have their own availability rates and the odd multi-week absence, some jobs are much
+scarcer than others, and every crucial job keeps enough skilled members to be coverable.
+A fraction of members get a max roster limit, and skilled members get a proficiency of 1 to 5.
+With n_profiles set, members are copies of that many distinct volunteers, giving large pools of
+interchangeable people.
+
+Usage:
+    python SyntheticData.py synthetic/ --members 500 --weeks 52 --jobs 20 --sets 10 --format parquet
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+FILE_NAMES = {
+    'availability_df': "availability",
+    'skills_df': "skills_mapping",
+    'jobs_df': "jobs",
+    'max_roster_df': "max_roster",
+    'proficiency_df': "proficiency",
+}
+
+
+def make_input_dfs(n_members=200, n_weeks=52, n_jobs=15, availability=0.6, skills=0.25, crucial_ratio=0.5,
+                   max_roster_ratio=0.2, seed=0, n_profiles=None):
+    """
+    Creates random input DataFrames, indexed as DataProcessor.load_data returns them.
+
+    Args:
+        n_members, n_weeks, n_jobs: Size of the roster.
+        availability: Average fraction of weeks a member is available.
+        skills: Average fraction of jobs a member can do.
+        crucial_ratio: Fraction of jobs that are crucial.
+        max_roster_ratio: Fraction of members with a max roster limit (0 for no max roster file).
+        seed: Random seed.
+        n_profiles: If set, every member copies the availability, skills, proficiency and limit of
+                    one of this many profiles (None for every member being different).
+
+    Returns:
+        dict: availability_df, skills_df, jobs_df, proficiency_df and, if max_roster_ratio > 0, max_roster_df.
+    """
+    rng = np.random.default_rng(seed)
+    all_members = pd.Index([f"MEMBER {i}" for i in range(n_members)], name="Names")
+    all_weeks = [str(d.date()) for d in pd.date_range("2025-01-05", periods=n_weeks, freq="7D")]
+    all_jobs = pd.Index([f"JOB {i}" for i in range(n_jobs)], name="Jobs")
+
+    # Each member has their own rate around the target, plus about two absences of 1-3 weeks a year
+    member_rate = np.clip(rng.normal(availability, 0.15, n_members), 0.05, 1.0)
+    available = rng.random((n_members, n_weeks)) < member_rate[:, None]
+    absences = rng.poisson(n_weeks / 26, n_members)
+    for m_idx in np.flatnonzero(absences):
+        for start in rng.integers(0, n_weeks, absences[m_idx]):
+            available[m_idx, start:start + rng.integers(1, 4)] = False
+
+    # Job popularity is skewed so some jobs are scarce, keeping the mean density near the target
+    popularity = rng.gamma(2.0, 1.0, n_jobs)
+    popularity = np.clip(popularity * skills / popularity.mean(), 0.02, 0.95)
+    skilled = rng.random((n_members, n_jobs)) < popularity[None, :]
+
+    # Crucial jobs get enough skilled members that absences rarely leave a week uncoverable.
+    # With profiles, the first n_profiles members are the profiles, so they are the ones that count,
+    # and as copies share their absences each crucial job needs cover from more of them.
+    n_distinct = n_members if n_profiles is None else n_profiles
+    crucial = np.arange(n_jobs) < round(n_jobs * crucial_ratio)
+    min_skilled = min(n_distinct, int(np.ceil((3 if n_profiles is None else 6) / max(availability, 0.05))))
+    for j_idx in np.flatnonzero(crucial):
+        missing = min_skilled - skilled[:n_distinct, j_idx].sum()
+        if missing > 0:
+            skilled[rng.choice(np.flatnonzero(~skilled[:n_distinct, j_idx]), missing, replace=False), j_idx] = True
+
+    proficiency = rng.integers(1, 6, (n_members, n_jobs)) * skilled
+    if max_roster_ratio > 0:
+        # Limits sit at or below the average share, so they actually bind
+        fair_share = max(1, n_weeks * n_jobs // n_members)
+        limited = rng.random(n_members) < max_roster_ratio
+        limits = np.where(limited, rng.integers(1, fair_share + 1, n_members), -1)
+
+    if n_profiles is not None:
+        # Everyone is a copy of a profile, and each profile is used at least once
+        profile = np.concatenate([np.arange(n_profiles), rng.integers(0, n_profiles, n_members - n_profiles)])
+        available, skilled, proficiency = available[profile], skilled[profile], proficiency[profile]
+        if max_roster_ratio > 0:
+            limits = limits[profile]
+
+    dfs = {
+        'availability_df': pd.DataFrame(available, index=all_members, columns=all_weeks),
+        'skills_df': pd.DataFrame(skilled, index=all_members, columns=all_jobs.rename(None)),
+        'jobs_df': pd.DataFrame({'Crucial': crucial.astype(int)}, index=all_jobs),
+        'proficiency_df': pd.DataFrame(proficiency, index=all_members, columns=all_jobs.rename(None)),
+    }
+    if max_roster_ratio > 0:
+        dfs['max_roster_df'] = pd.DataFrame({'max_roster': limits}, index=all_members)
+    return dfs
+
+
+def make_synthetic_data(n_members=200, n_weeks=52, n_jobs=15, availability=0.6, skills=0.25, crucial_ratio=0.5,
+                        max_roster_ratio=0.2, seed=0, n_profiles=None, **weights):
+    """Creates a random data dictionary in the shape DataProcessor.get_data returns, with the given weights."""
+    dfs = make_input_dfs(n_members, n_weeks, n_jobs, availability, skills, crucial_ratio, max_roster_ratio, seed, n_profiles)
+    jobs_df = dfs['jobs_df']
+
+    data_dict = {**weights, **dfs}
+    data_dict['all_members'] = list(dfs['availability_df'].index)
+    data_dict['all_weeks'] = list(dfs['availability_df'].columns)
+    data_dict['all_jobs'] = list(jobs_df.index)
+    data_dict['crucial_jobs'] = list(jobs_df.index[jobs_df['Crucial'] == 1])
+    data_dict['non_crucial_jobs'] = list(jobs_df.index[jobs_df['Crucial'] == 0])
+    return data_dict
+
+
+def write_input_set(directory, dfs, file_format="csv"):
+    """
+    Writes input DataFrames as files named the way RosterBatch recognises them.
+
+    Args:
+        directory: Created if missing.
+        dfs: DataFrames as from make_input_dfs.
+        file_format: "csv", "parquet" or "xlsx".
+
+    Returns:
+        dict: DataFrame name -> written path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, df in dfs.items():
+        path = os.path.join(directory, f"{FILE_NAMES[name]}.{file_format}")
+        if file_format == "csv":
+            df.to_csv(path)
+        elif file_format == "parquet":
+            df.to_parquet(path)
+        elif file_format == "xlsx":
+            df.to_excel(path)
+        else:
+            raise ValueError(f"Unknown file format '{file_format}', choose csv, parquet or xlsx")
+        paths[name] = path
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="Directory to write the input sets to")
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--jobs", type=int, default=15)
+    parser.add_argument("--availability", type=float, default=0.6, help="Average fraction of weeks a member is available")
+    parser.add_argument("--skills", type=float, default=0.25, help="Average fraction of jobs a member can do")
+    parser.add_argument("--crucial-ratio", type=float, default=0.5, help="Fraction of jobs that are crucial")
+    parser.add_argument("--max-roster-ratio", type=float, default=0.2, help="Fraction of members with a max roster limit")
+    parser.add_argument("--profiles", type=int, default=None, help="Make members copies of this many distinct volunteers")
+    parser.add_argument("--sets", type=int, default=1, help="Number of input sets, each with its own seed")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first input set")
+    parser.add_argument("--format", choices=["csv", "parquet", "xlsx"], default="csv")
+    args = parser.parse_args()
+
+    for i in range(args.sets):
+        dfs = make_input_dfs(args.members, args.weeks, args.jobs, args.availability, args.skills,
+                             args.crucial_ratio, args.max_roster_ratio, args.seed + i, args.profiles)
+        directory = os.path.join(args.output, f"set_{i:03d}") if args.sets > 1 else args.output
+        write_input_set(directory, dfs, args.format)
+        print(f"Wrote {args.members} members x {args.weeks} weeks x {args.jobs} jobs to {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
+import os
 from io import BytesIO
-from JobScheduler import JobScheduler
+from SolverConfig import SolverConfig, PRESOLVE_LEVELS
 from streamlit.components.v1 import html
 import time
 
@@ -14,10 +15,47 @@ def switch(tab):
     tab[{tab}].click()
     """
 
-def process_csv(**kwargs):
-    js = JobScheduler(**kwargs)
-    df, fig_assignments, fig_proficiency, fig_back_to_back = js.schedule_jobs()
-    return df, fig_assignments, fig_proficiency, fig_back_to_back
+@st.cache_resource
+def get_result_cache():
+    # Shared across reruns and sessions, so the same files and settings are only solved once
+    # The solver layers are imported on first use, so the page renders before ortools loads
+    from ResultCache import ResultCache
+    return ResultCache(max_entries=32, ttl_seconds=3600)
+
+DEMO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo")
+
+class UploadedContent(BytesIO):
+    """Rebuilds an uploaded file from its cached name, type and bytes."""
+    def __init__(self, name, type, content):
+        super().__init__(content)
+        self.name = name
+        self.type = type
+
+def get_file_content(file):
+    # Hashable stand-in for an UploadedFile, so caches are keyed on what was uploaded
+    return None if file is None else (file.name, file.type, file.getvalue())
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_data(files):
+    # Parsing and checking the uploads only happens when their content changes
+    import DataProcessor
+    uploads = {key: UploadedContent(*content) for key, content in files.items() if content is not None}
+    data = DataProcessor.get_data(**uploads)
+    return {k: v for k, v in data.items() if k not in uploads}
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def build_model(files):
+    # Weights and solver settings are applied to a clone per run, so slider changes reuse this model
+    from JobScheduler import JobScheduler
+    return JobScheduler.from_data(load_data(files)).build_model()
+
+def start_solve(files, **settings):
+    # The solve runs in a background thread; each rerun polls it for the latest schedule
+    from JobScheduler import JobScheduler
+    from BackgroundSolver import BackgroundSolve
+    data = {**load_data(files), **{k: v for k, v in settings.items() if v is not None}}
+    js = JobScheduler.from_data(data)
+    return BackgroundSolve(js, cache=get_result_cache(), model=build_model(files)).start()
 
 def convert_df_to_csv(df):
     output = BytesIO()
@@ -25,7 +63,9 @@ def convert_df_to_csv(df):
     output.seek(0)
     return output
 
-def load_demo_file(file_path):
+@st.cache_data(show_spinner=False)
+def load_demo_file(file_name):
+    file_path = os.path.join(DEMO_DIR, file_name)
     try:
         return pd.read_csv(file_path, index_col=0)
     except FileNotFoundError:
@@ -59,14 +99,38 @@ with st.sidebar:
 
     use_proficiency = st.checkbox("Include Proficiency File")
     proficiency_file = st.file_uploader("🔥 Upload Proficiency File", type=["csv", "xlsx"]) if use_proficiency else None
+
+    use_previous_schedule = st.checkbox("Start from a Previous Schedule", help="Reuse last month's generated schedule as a starting point. Assignments that are no longer possible are dropped.")
+    previous_schedule_file = st.file_uploader("♻️ Upload Previous Schedule", type=["csv", "xlsx"]) if use_previous_schedule else None
     
     st.subheader("⚙️ Adjust Scheduling Priorities")
     total_assignments_weight = st.slider("🔄 Ensure more jobs are assigned", 0, 100, 50, help="Higher values prioritize filling all jobs (When some are non-crucial).")
     assignment_deviation_weight = st.slider("⚖️ Balance workload among members", 0, 100, 50, help="Higher values distribute work evenly.")
     back_to_back_weight = st.slider("⏳ Reduce back-to-back assignments", 0, 100, 50, help="Higher values reduce consecutive duties.")
     proficiency_deviation_weight = st.slider("🔥 Balance and maximise proficiency across weeks", 0, 100, 50, help="Higher values distribute proficiency equally, and also increase proficiency across weeks.") if use_proficiency else None
+
+    with st.expander("🧮 Solver Settings"):
+        max_time_in_seconds = st.number_input("⏱️ Time limit (seconds)", min_value=1, max_value=3600, value=60, help="Stop searching after this long and keep the best schedule found so far.")
+        num_search_workers = st.number_input("🧵 Search workers", min_value=0, max_value=64, value=0, help="Number of parallel search workers. 0 lets the solver decide.")
+        relative_gap_limit = st.slider("🎯 Acceptable optimality gap (%)", 0.0, 20.0, 0.0, step=0.5, help="Stop early once the schedule is provably within this percentage of the best possible.")
+        use_random_seed = st.checkbox("🎲 Fix random seed", help="Makes repeated runs with the same inputs give the same schedule.")
+        random_seed = st.number_input("Random seed", min_value=0, value=0) if use_random_seed else None
+        presolve_level = st.selectbox("🧹 Presolve", list(PRESOLVE_LEVELS), index=list(PRESOLVE_LEVELS).index("default"), help="How much the solver simplifies the model before searching.")
+        log_search_progress = st.checkbox("📜 Print solver log to console")
+        keep_solve_log = st.checkbox("🔬 Collect presolve diagnostics", help="Record how much the solver's presolve simplified the model, shown under Solve Diagnostics. Slows the solve down slightly.")
+        quick_hint = st.checkbox("⚡ Start from a quick draft", help="Build a rough schedule in under a second and let the solver improve on it. Helps most on large rosters.")
+
+    solver_config = SolverConfig(
+        max_time_in_seconds=max_time_in_seconds,
+        num_search_workers=num_search_workers,
+        relative_gap_limit=relative_gap_limit / 100,
+        random_seed=random_seed,
+        log_search_progress=log_search_progress,
+        presolve_level=presolve_level,
+        keep_solve_log=keep_solve_log,
+    )
     
-    process_button = st.button("📝 Generate Schedule", disabled=not (date_availability_file and skills_mapping_file and jobs_file and (not use_max_roster or max_roster_file) and (not use_proficiency or proficiency_file)))
+    process_button = st.button("📝 Generate Schedule", disabled=not (date_availability_file and skills_mapping_file and jobs_file and (not use_max_roster or max_roster_file) and (not use_proficiency or proficiency_file) and (not use_previous_schedule or previous_schedule_file)))
 
 # Step Navigation
 tab1, tab2 = st.tabs(["📊 View Demo Data", "📌 Generate Schedule"])
@@ -85,11 +149,11 @@ with tab1:
     - **Proficiency File (Optional):** Provides proficiency scores.
     """)
     
-    demo_availability_file = load_demo_file('https://raw.githubusercontent.com/AndrewCheam/automatic-roster/refs/heads/main/src/demo/demo_date_availability.csv')
-    demo_skills_file = load_demo_file('https://raw.githubusercontent.com/AndrewCheam/automatic-roster/refs/heads/main/src/demo/demo_skills_mapping.csv')
-    demo_jobs_file = load_demo_file('https://raw.githubusercontent.com/AndrewCheam/automatic-roster/refs/heads/main/src/demo/demo_jobs.csv')
-    demo_max_roster_file = load_demo_file('https://raw.githubusercontent.com/AndrewCheam/automatic-roster/refs/heads/main/src/demo/demo_max_roster.csv')
-    demo_proficiency_file = load_demo_file('https://raw.githubusercontent.com/AndrewCheam/automatic-roster/refs/heads/main/src/demo/demo_proficiency.csv')
+    demo_availability_file = load_demo_file('demo_date_availability.csv')
+    demo_skills_file = load_demo_file('demo_skills_mapping.csv')
+    demo_jobs_file = load_demo_file('demo_jobs.csv')
+    demo_max_roster_file = load_demo_file('demo_max_roster.csv')
+    demo_proficiency_file = load_demo_file('demo_proficiency.csv')
     
     if demo_availability_file is not None:
         st.write("### 📅 Availability File", demo_availability_file)
@@ -102,44 +166,108 @@ with tab1:
     if demo_proficiency_file is not None:
         st.write("### 🔥 Proficiency File", demo_proficiency_file)
 
+if process_button:
+    try:
+        st.session_state['solve'] = start_solve(
+            {
+                'date_availability_file': get_file_content(date_availability_file),
+                'skills_mapping_file': get_file_content(skills_mapping_file),
+                'jobs_file': get_file_content(jobs_file),
+                'max_roster_file': get_file_content(max_roster_file),
+                'proficiency_file': get_file_content(proficiency_file),
+                'previous_schedule_file': get_file_content(previous_schedule_file),
+            },
+            total_assignments_weight=total_assignments_weight,
+            assignment_deviation_weight=assignment_deviation_weight,
+            back_to_back_weight=back_to_back_weight,
+            proficiency_deviation_weight=proficiency_deviation_weight,
+            solver_config=solver_config,
+            quick_hint=quick_hint or None,
+        )
+        st.session_state.pop('solve_error', None)
+    except Exception as e:
+        st.session_state.pop('solve', None)
+        st.session_state['solve_error'] = e
+
+solve = st.session_state.get('solve')
+
 with tab2:
     st.subheader("🚀 Generate Schedule")
-    if process_button:
-        with st.spinner("⏳ Processing schedule..."):
-            try:
-                processed_df, fig_assignments, fig_proficiency, fig_back_to_back = process_csv(
-                    date_availability_file=date_availability_file, 
-                    skills_mapping_file=skills_mapping_file, 
-                    jobs_file=jobs_file, 
-                    max_roster_file=max_roster_file,
-                    proficiency_file=proficiency_file,
-                    total_assignments_weight=total_assignments_weight,
-                    assignment_deviation_weight=assignment_deviation_weight,
-                    back_to_back_weight=back_to_back_weight,
-                    proficiency_deviation_weight=proficiency_deviation_weight
-                )
-                
+    if 'solve_error' in st.session_state:
+        # Markdown needs two trailing spaces to keep the line breaks of an infeasibility explanation
+        st.error(f"🚨 An error occurred: {st.session_state['solve_error']}".replace("\n", "  \n"))
+
+    elif solve is not None and solve.running:
+        if st.button("⏹️ Stop and keep best", help="Stop searching and use the best schedule found so far."):
+            solve.stop()
+        progress = solve.progress()
+        if progress is None:
+            st.info(f"⏳ Searching for a first schedule... ({time.time() - solve.started:.0f}s)")
+        else:
+            st.info(f"⏳ Still improving the schedule: showing the best found so far ({time.time() - solve.started:.0f}s).")
+            col_objective, col_bound, col_solutions, col_time = st.columns(4)
+            col_objective.metric("Objective", f"{progress['objective']:,.0f}")
+            col_bound.metric("Best Bound", f"{progress['best_bound']:,.0f}")
+            col_solutions.metric("Schedules Found", progress['solution'])
+            col_time.metric("Solve Time", f"{progress['wall_time']:.1f}s")
+            st.line_chart(pd.DataFrame(solve.streamer.get_history()).set_index('wall_time')[['objective', 'best_bound']])
+            st.dataframe(progress['schedule_df'], use_container_width=True)
+        time.sleep(1)
+        st.rerun()
+
+    elif solve is not None:
+        try:
+            processed_df, fig_assignments, fig_proficiency, fig_back_to_back = solve.result()
+            solve_info, hint_info, cache_info = solve.scheduler.solve_info, solve.scheduler.hint_info, solve.scheduler.cache_info
+
+            # The search also stops once the gap is within the acceptable gap, which CP-SAT reports as OPTIMAL
+            gap, gap_limit = solve_info['gap'], SolverConfig.from_value(solve.scheduler.data.get('solver_config')).relative_gap_limit
+            gap_reached = bool(gap_limit) and gap is not None and 1e-9 < gap <= gap_limit + 1e-9
+            if solve_info['status'] == "OPTIMAL" and not gap_reached:
                 st.success("✅ Schedule generated successfully!")
-                st.dataframe(processed_df, use_container_width=True)
-                
-                csv_data = convert_df_to_csv(processed_df)
-                st.download_button("⬇️ Download Processed Schedule", data=csv_data, file_name="processed_schedule.csv", mime="text/csv")
-                st.title("Schedule Analytics")
+            elif solve.streamer.stop_requested:
+                st.warning(f"⏹️ Stopped early: showing the best schedule found (within {solve_info['gap']:.1%} of the best possible).")
+            elif gap_reached:
+                st.success(f"🎯 Acceptable gap reached: the schedule is within {gap:.1%} of the best possible (limit {gap_limit:.1%}).")
+            else:
+                st.warning(f"⏱️ Stopped at the time limit: showing the best schedule found (within {solve_info['gap']:.1%} of the best possible).")
+            col_objective, col_bound, col_gap, col_time = st.columns(4)
+            col_objective.metric("Objective", f"{solve_info['objective']:,.0f}")
+            col_bound.metric("Best Bound", f"{solve_info['best_bound']:,.0f}")
+            col_gap.metric("Gap", f"{solve_info['gap']:.1%}")
+            col_time.metric("Solve Time", f"{solve_info['wall_time']:.1f}s")
+            if cache_info is not None and cache_info['hit']:
+                st.info("⚡ Same files and settings as an earlier run: showing the cached schedule.")
+            if hint_info is not None:
+                st.info(f"♻️ Reused {hint_info['hinted_assignments']} of {hint_info['previous_assignments']} assignments from the previous schedule "
+                        f"({hint_info['hint_completion']:.0%}); {hint_info['dropped_assignments']} are no longer possible.")
+            instrumentation = solve.scheduler.instrumentation
+            if instrumentation is not None:
+                with st.expander("🔬 Solve Diagnostics"):
+                    st.caption("Seconds spent in each phase, the size of the model and how hard the solver searched.")
+                    st.bar_chart(pd.Series(instrumentation['phases'], name="Seconds").rename_axis("Phase"), horizontal=True)
+                    col_model, col_solver = st.columns(2)
+                    col_model.markdown("**Model**")
+                    col_model.json(instrumentation['model'])
+                    col_solver.markdown("**Solver**")
+                    col_solver.json(instrumentation['solver'])
+            st.dataframe(processed_df, use_container_width=True)
+            
+            csv_data = convert_df_to_csv(processed_df)
+            st.download_button("⬇️ Download Processed Schedule", data=csv_data, file_name="processed_schedule.csv", mime="text/csv")
+            st.title("Schedule Analytics")
 
-                st.subheader("Total Assignments per Member")
-                st.plotly_chart(fig_assignments, use_container_width=True)
+            st.subheader("Total Assignments per Member")
+            st.plotly_chart(fig_assignments, use_container_width=True)
 
-                st.subheader("Number of Back to Back rosters")
-                st.plotly_chart(fig_back_to_back, use_container_width=True)
+            st.subheader("Number of Back to Back rosters")
+            st.plotly_chart(fig_back_to_back, use_container_width=True)
 
 
-                st.subheader("Total Proficiency per Week")
-                st.plotly_chart(fig_proficiency, use_container_width=True)
-            except Exception as e:
-                st.error(f"🚨 An error occurred: {e}")
+            st.subheader("Total Proficiency per Week")
+            st.plotly_chart(fig_proficiency, use_container_width=True)
+        except Exception as e:
+            st.error(f"🚨 An error occurred: {e}".replace("\n", "  \n"))
             
     else:
         st.info("💡 No schedule generated yet. Upload files and click 'Generate Schedule' to start!")
-
-
-
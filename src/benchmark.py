@@ -0,0 +1,642 @@
+"""
+Benchmarks ScheduleModel build size and solve time on the demo data and on synthetic instances.
+
+Each instance is built and solved in a fresh process, recording build time, variable and constraint
+counts, time to first feasible and to optimal, objective, SolutionViewer time and peak RSS. The
+results can be written as a JSON report and compared against an earlier one to catch regressions.
+
+Usage:
+    python benchmark.py --members 200 --weeks 52 --jobs 15 --time-limit 60
+    python benchmark.py --suite medium --output report.json --baseline main_report.json
+    python benchmark.py --rolling-window 8 --overlap 2   # compare against a rolling horizon solve
+    python benchmark.py --suite pools --compare-aggregation   # interchangeable members, with and without classes
+    python benchmark.py --compare-quick   # QuickRoster heuristic against CP-SAT, with and without its hint
+    python benchmark.py --suite large --compare-lns --lns-workers 4   # objective over time, LNS against one CP-SAT solve
+    python benchmark.py --suite large --compare-template   # build per request against a saved, instantiated template
+    python benchmark.py --imports --max-import-ms 1500   # cold start import times per module
+    python benchmark.py --check-validator   # validate_solution against slot by slot checks on broken schedules
+    python benchmark.py --check-objective   # LNS objective evaluation against CP-SAT, with integer and fractional weights
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import ortools
+import pandas as pd
+from ortools.sat.python import cp_model
+
+import DataProcessor
+from BackgroundSolver import SolutionStreamer
+from Instrumentation import model_stats, solver_stats
+from JobScheduler import JobScheduler, QUICK_TIME_LIMIT
+from ModelTemplate import ModelTemplate
+from NeighborhoodSearch import NeighborhoodSearch, objective_value
+from QuickRoster import QuickRoster
+from ScheduleModel import ScheduleModel
+from SolutionViewer import SolutionViewer
+from SolverConfig import SolverConfig
+from SyntheticData import make_synthetic_data
+from test import VIOLATION_MESSAGES, solution_report
+
+DEMO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo")
+DEMO_FILES = {
+    'date_availability_file': "demo_date_availability.csv",
+    'skills_mapping_file': "demo_skills_mapping.csv",
+    'jobs_file': "demo_jobs.csv",
+    'max_roster_file': "demo_max_roster.csv",
+    'proficiency_file': "demo_proficiency.csv",
+}
+DEFAULT_WEIGHTS = {
+    'total_assignments_weight': 50,
+    'assignment_deviation_weight': 50,
+    'back_to_back_weight': 50,
+    'proficiency_deviation_weight': 50,
+}
+# Named sets of instances; "demo" is the demo/ files, anything else is a make_synthetic_data call
+SUITES = {
+    'small': [{'name': "demo"}, {'name': "synthetic 50x26x8", 'n_members': 50, 'n_weeks': 26, 'n_jobs': 8}],
+    'medium': [{'name': "demo"}, {'name': "synthetic 200x52x15", 'n_members': 200, 'n_weeks': 52, 'n_jobs': 15}],
+    'large': [
+        {'name': "synthetic 200x52x15", 'n_members': 200, 'n_weeks': 52, 'n_jobs': 15},
+        {'name': "synthetic 500x52x20", 'n_members': 500, 'n_weeks': 52, 'n_jobs': 20},
+        {'name': "synthetic 1000x52x30", 'n_members': 1000, 'n_weeks': 52, 'n_jobs': 30},
+    ],
+    # Large pools of interchangeable members (copies of a few distinct profiles)
+    'pools': [
+        {'name': "synthetic 100x26x8, 20 profiles", 'n_members': 100, 'n_weeks': 26, 'n_jobs': 8, 'n_profiles': 20},
+        {'name': "synthetic 200x52x10, 25 profiles", 'n_members': 200, 'n_weeks': 52, 'n_jobs': 10, 'n_profiles': 25},
+        {'name': "synthetic 500x52x20, 40 profiles", 'n_members': 500, 'n_weeks': 52, 'n_jobs': 20, 'n_profiles': 40},
+    ],
+}
+# Shares of the time limit at which --compare-lns prints both objective curves
+CURVE_POINTS = [0.05, 0.1, 0.25, 0.5, 0.75, 1.0]
+# Fields that identify a violation record of each validate_solution rule, for comparing reports
+VIOLATION_KEYS = {
+    'unknown_job': ('job',),
+    'unknown_member': ('member', 'week', 'job'),
+    'unavailable': ('member', 'week', 'job'),
+    'missing_skill': ('member', 'week', 'job'),
+    'multiple_jobs': ('member', 'week'),
+    'max_roster': ('member',),
+    'crucial_unfilled': ('week', 'job'),
+}
+# Report fields compared against a baseline; an increase beyond the tolerance is a regression
+REGRESSION_FIELDS = ['build_time', 'variables', 'constraints', 'time_to_first_feasible', 'viewer_time', 'peak_rss_mb']
+
+
+# Module -> packages it must not pull in at import time, so each layer only loads what it needs
+IMPORT_LAYERS = {
+    'SolverConfig': ['numpy', 'pandas', 'ortools', 'plotly', 'streamlit'],
+    'RosterBatch': ['pandas', 'ortools', 'plotly', 'streamlit'],
+    'DataProcessor': ['ortools', 'plotly', 'streamlit'],
+    'ScheduleModel': ['plotly', 'streamlit'],
+    'JobScheduler': ['plotly', 'streamlit'],
+    'SolutionViewer': ['plotly', 'streamlit'],
+    'BackgroundSolver': ['plotly', 'streamlit'],
+    'QuickRoster': ['plotly', 'streamlit'],
+    'NeighborhoodSearch': ['plotly', 'streamlit'],
+    'ModelTemplate': ['plotly', 'streamlit'],
+    'RosterService': ['pandas', 'ortools', 'plotly', 'streamlit'],
+}
+
+
+class _CsvUpload(io.BytesIO):
+    """Mimics the Streamlit UploadedFile that DataProcessor expects."""
+    type = "text/csv"
+
+
+def load_demo_data(**weights):
+    """Loads the files in demo/ through DataProcessor, exactly as the app would."""
+    kwargs = {**DEFAULT_WEIGHTS, **weights}
+    for key, file_name in DEMO_FILES.items():
+        with open(os.path.join(DEMO_DIR, file_name), "rb") as f:
+            kwargs[key] = _CsvUpload(f.read())
+    with contextlib.redirect_stdout(io.StringIO()):
+        return DataProcessor.get_data(**kwargs)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_benchmark(data_dict, time_limit=60, num_workers=8, aggregate_members=True, quick_hint=False, keep_history=False):
+    """Builds and solves one instance, returning build time, model size, solve progress and viewer time (and every improving solution, with keep_history)."""
+    # The solve log is kept for the presolve time and size
+    solver_config = SolverConfig(max_time_in_seconds=time_limit, num_search_workers=num_workers, keep_solve_log=True)
+    start = time.perf_counter()
+    schedule_model = ScheduleModel(**data_dict, solver_config=solver_config, aggregate_members=aggregate_members)
+    if quick_hint:
+        schedule_model.hint_assignment(QuickRoster.from_model(schedule_model).solve(QUICK_TIME_LIMIT))
+    build_time = time.perf_counter() - start
+
+    streamer = SolutionStreamer()
+    streamer.schedule_model = schedule_model
+    solver, status = schedule_model.solve(streamer)
+    history = streamer.get_history()
+
+    result = {
+        'build_time': build_time,
+        'build_phases': schedule_model.timer.phases,
+        'member_classes': len(schedule_model.member_classes),
+        **model_stats(schedule_model.model),
+        **schedule_model.solve_info,
+        **{k: v for k, v in solver_stats(solver).items() if k in ('num_conflicts', 'num_branches', 'presolve_time', 'search_time', 'presolved_variables')},
+        'solutions': len(history),
+        'time_to_first_feasible': history[0]['wall_time'] if history else None,
+        'time_to_optimal': schedule_model.solve_info['wall_time'] if status == cp_model.OPTIMAL else None,
+        'viewer_time': None,
+    }
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        start = time.perf_counter()
+        viewer = SolutionViewer(solver, schedule_model)
+        viewer.generate_schedule_df()
+        viewer.get_metrics()
+        result['viewer_time'] = time.perf_counter() - start
+    if keep_history:
+        result['history'] = history
+    return result
+
+
+def load_instance(instance, weights):
+    """Data dictionary for a SUITES entry."""
+    params = {k: v for k, v in instance.items() if k != 'name'}
+    if instance['name'] == "demo":
+        return load_demo_data(**weights)
+    return make_synthetic_data(**params, **{**DEFAULT_WEIGHTS, **weights})
+
+
+def _run_instance(instance, weights, time_limit, num_workers):
+    """Process pool worker: generates, builds and solves one instance in a fresh process."""
+    start = time.perf_counter()
+    data_dict = load_instance(instance, weights)
+    generate_time = time.perf_counter() - start
+    result = run_benchmark(data_dict, time_limit, num_workers)
+    return {
+        **instance,
+        'members': len(data_dict['all_members']),
+        'weeks': len(data_dict['all_weeks']),
+        'jobs': len(data_dict['all_jobs']),
+        'generate_time': generate_time,
+        **result,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_suite(instances, weights=None, time_limit=60, num_workers=8):
+    """
+    Runs each instance in its own spawned process, so peak RSS is measured per instance.
+
+    Returns:
+        dict: Machine-readable report with the environment, settings and one result per instance.
+    """
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for instance in instances:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(_run_instance, instance, weights or {}, time_limit, num_workers).result())
+    return {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'environment': get_environment(),
+        'settings': {'time_limit': time_limit, 'num_workers': num_workers, 'weights': {**DEFAULT_WEIGHTS, **(weights or {})}},
+        'runs': runs,
+    }
+
+
+def get_environment():
+    """Versions and hardware the report was produced on."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DEMO_DIR, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'ortools': ortools.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': commit,
+    }
+
+
+def compare_reports(report, baseline, tolerance=0.25, min_seconds=0.25):
+    """
+    Lists regressions of report against baseline, for instances present in both.
+
+    A field regresses when it grows by more than tolerance (relative). Timings must also grow by
+    at least min_seconds, so noise on fast instances is ignored. An instance that was solved to
+    optimality in the baseline but not anymore is also a regression.
+
+    Returns:
+        list of str: One message per regression.
+    """
+    baseline_runs = {run['name']: run for run in baseline['runs']}
+    regressions = []
+    for run in report['runs']:
+        old = baseline_runs.get(run['name'])
+        if old is None:
+            continue
+        for field in REGRESSION_FIELDS:
+            new_value, old_value = run.get(field), old.get(field)
+            if new_value is None or old_value is None:
+                continue
+            is_time = field.endswith("time") or field.startswith("time")
+            if new_value > old_value * (1 + tolerance) and (not is_time or new_value - old_value >= min_seconds):
+                regressions.append(f"{run['name']}: {field} {old_value:.4g} -> {new_value:.4g}")
+        if old['status'] == "OPTIMAL" and run['status'] != "OPTIMAL":
+            regressions.append(f"{run['name']}: status OPTIMAL -> {run['status']}")
+    return regressions
+
+
+def run_rolling_benchmark(data_dict, window_size, overlap, time_limit=60, num_workers=8):
+    """Solves one instance with the rolling horizon, using time_limit per window."""
+    solver_config = SolverConfig(max_time_in_seconds=time_limit, num_search_workers=num_workers)
+    scheduler = JobScheduler.from_data({**data_dict, 'solver_config': solver_config})
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scheduler.schedule_jobs_rolling(window_size, overlap)
+    return {
+        'windows': len(scheduler.rolling_info['windows']),
+        'objective': scheduler.rolling_info['objective'],
+        'solve_time': scheduler.rolling_info['wall_time'],
+        'total_time': time.perf_counter() - start,
+    }
+
+
+def compare_rolling(name, data_dict, args):
+    """Prints the rolling horizon objective next to the monolithic solve."""
+    monolithic = run_benchmark(data_dict, args.time_limit, args.workers)
+    rolling = run_rolling_benchmark(data_dict, args.rolling_window, args.overlap, args.time_limit, args.workers)
+    print(f"\n{name}: monolithic vs rolling horizon ({args.rolling_window} week windows, {args.overlap} week overlap)")
+    print(f"  monolithic: objective {monolithic['objective']} ({monolithic['status']}, bound {monolithic['best_bound']}) in {monolithic['wall_time']:.2f}s")
+    print(f"  rolling:    objective {rolling['objective']} over {rolling['windows']} windows in {rolling['solve_time']:.2f}s")
+
+
+def compare_aggregation(name, data_dict, args):
+    """Prints the solve with interchangeable members grouped into classes next to the one without."""
+    print(f"\n{name}: members one by one vs grouped into classes of interchangeable members")
+    for label, aggregate in (("one by one", False), ("classes", True)):
+        result = run_benchmark(data_dict, args.time_limit, args.workers, aggregate_members=aggregate)
+        optimal = f"{result['time_to_optimal']:.2f}s" if result['time_to_optimal'] is not None else "not reached"
+        print(f"  {label + ':':<11} {result['member_classes']} classes, {result['variables']} variables, "
+              f"objective {result['objective']} ({result['status']}, bound {result['best_bound']}), "
+              f"optimal {optimal}, search {result.get('search_time', result['wall_time']):.2f}s")
+
+
+def compare_quick(name, data_dict, args):
+    """Prints QuickRoster's objective and time next to CP-SAT's, with and without the QuickRoster hint."""
+    start = time.perf_counter()
+    quick = QuickRoster.from_data(data_dict)
+    quick.solve(QUICK_TIME_LIMIT)
+    quick_time = time.perf_counter() - start
+    print(f"\n{name}: QuickRoster vs CP-SAT")
+    print(f"  quick:       objective {quick.info['objective']} in {quick_time:.2f}s "
+          f"(greedy {quick.info['initial_objective']}, {quick.info['iterations']} moves, {quick.info['unfilled_crucial']} crucial slots empty)")
+    for label, hint in (("cp-sat:", False), ("cp-sat+hint:", True)):
+        result = run_benchmark(data_dict, args.time_limit, args.workers, quick_hint=hint)
+        first = f"{result['time_to_first_feasible']:.2f}s" if result['time_to_first_feasible'] is not None else "never"
+        print(f"  {label:<12} objective {result['objective']} ({result['status']}, bound {result['best_bound']}) "
+              f"in {result['wall_time']:.2f}s, first schedule after {first}")
+
+
+def run_lns_benchmark(data_dict, time_limit=60, max_workers=1):
+    """Builds one instance and runs NeighborhoodSearch on it for time_limit seconds."""
+    start = time.perf_counter()
+    schedule_model = ScheduleModel(**data_dict)
+    build_time = time.perf_counter() - start
+    search = NeighborhoodSearch(schedule_model, max_workers=max_workers)
+    search.run(time_limit)
+    return {'build_time': build_time, **search.info}
+
+
+def objective_at(history, wall_time):
+    """Best objective of an objective-over-time history at wall_time, or None before its first solution."""
+    reached = [point['objective'] for point in history if point['wall_time'] <= wall_time]
+    return min(reached) if reached else None
+
+
+def compare_lns(name, data_dict, args):
+    """Prints the objective over time of large neighbourhood search next to one CP-SAT solve of the whole model."""
+    monolithic = run_benchmark(data_dict, args.time_limit, args.workers, keep_history=True)
+    lns = run_lns_benchmark(data_dict, args.time_limit, args.lns_workers)
+    print(f"\n{name}: CP-SAT ({args.workers} workers) vs large neighbourhood search ({args.lns_workers} processes)")
+    print(f"  {'seconds':>8} {'cp-sat':>12} {'lns':>12}")
+    for share in CURVE_POINTS:
+        seconds = share * args.time_limit
+        print(f"  {seconds:8.1f} {objective_at(monolithic['history'], seconds)!s:>12} {objective_at(lns['history'], seconds)!s:>12}")
+    print(f"  cp-sat: {monolithic['status']}, bound {monolithic['best_bound']}, {monolithic['solutions']} solutions")
+    print(f"  lns:    {lns['iterations']} neighbourhoods, {lns['improvements']} improvements, from {lns['initial_objective']}; "
+          + ", ".join(f"{kind} {stats['improved']}/{stats['tried']}" for kind, stats in lns['neighborhoods'].items()))
+
+
+def compare_template(name, data_dict, args):
+    """Prints the time to build a model per request next to saving, loading and instantiating a ModelTemplate."""
+    timings = {}
+    for names in (True, False):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            schedule_model = ScheduleModel(**data_dict, variable_names=names)
+        timings[names] = (time.perf_counter() - start, schedule_model.model.Proto().ByteSize() / 1024 ** 2)
+
+    start = time.perf_counter()
+    template = ModelTemplate(data_dict)
+    build_time = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "template.pkl")
+        template.save(path)
+        size_mb = os.path.getsize(path) / 1024 ** 2
+        start = time.perf_counter()
+        template = ModelTemplate.load(path)
+        load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    template.instantiate(data_dict)
+    instantiate_time = time.perf_counter() - start
+
+    print(f"\n{name}: a model built per request vs a model template")
+    print(f"  build:       {timings[True][0]:.2f}s, proto {timings[True][1]:.1f}MB ({timings[False][0]:.2f}s, {timings[False][1]:.1f}MB without names)")
+    print(f"  template:    built in {build_time:.2f}s, {size_mb:.1f}MB on disk, loaded in {load_time:.2f}s")
+    print(f"  instantiate: {instantiate_time:.2f}s per request")
+
+
+def broken_schedule(data_dict, seed=0):
+    """
+    Schedule of random members that breaks every rule validate_solution checks: unavailable and
+    unskilled members, double bookings, max roster overruns, empty crucial slots, and names and
+    jobs that are not in the data.
+    """
+    rng = np.random.default_rng(seed)
+    all_weeks, all_jobs = data_dict['all_weeks'], data_dict['all_jobs']
+    names = rng.choice(np.array(data_dict['all_members'], dtype=object), size=(len(all_jobs) + 1, len(all_weeks)))
+    names[rng.random(names.shape) < 0.1] = None
+    names[rng.random(names.shape) < 0.03] = "NOT A MEMBER"
+    schedule_df = pd.DataFrame(names, columns=all_weeks)
+    schedule_df.insert(0, 'Job', list(all_jobs) + ["NOT A JOB"])
+    return schedule_df
+
+
+def reference_violations(solution_df, availability_df, skills_df, max_roster_df=None, crucial_jobs=()):
+    """
+    Every validate_solution rule checked slot by slot with label lookups, the way the original
+    test_availability and test_skill_match loops checked availability and skills.
+
+    Returns:
+        dict: Rule -> set of violations, keyed by the rule's VIOLATION_KEYS.
+    """
+    schedule = solution_df.set_index('Job')
+    weeks = [week for week in schedule.columns if week in availability_df.columns]
+    found = {rule: set() for rule in VIOLATION_MESSAGES}
+    member_weeks = {}
+    for job in schedule.index:
+        if job not in skills_df.columns:
+            found['unknown_job'].add((job,))
+            continue
+        for week in weeks:
+            person = schedule.at[job, week]
+            if pd.isna(person):
+                if job in crucial_jobs:
+                    found['crucial_unfilled'].add((week, job))
+                continue
+            if person not in availability_df.index:
+                found['unknown_member'].add((person, week, job))
+                continue
+            if not availability_df.loc[person, week]:
+                found['unavailable'].add((person, week, job))
+            if not skills_df.loc[person, job]:
+                found['missing_skill'].add((person, week, job))
+            member_weeks.setdefault(person, []).append(week)
+
+    for person, person_weeks in member_weeks.items():
+        found['multiple_jobs'] |= {(person, week) for week in person_weeks if person_weeks.count(week) > 1}
+        limit = max_roster_df['max_roster'].get(person) if isinstance(max_roster_df, pd.DataFrame) else None
+        if limit is not None and not pd.isna(limit) and 0 <= limit < len(person_weeks):
+            found['max_roster'].add((person,))
+    return found
+
+
+def check_validator(name, data_dict, seeds=5):
+    """
+    Compares validate_solution with reference_violations on broken schedules and prints any difference.
+
+    Returns:
+        bool: Whether both flagged the same violations on every schedule.
+    """
+    jobs_df = data_dict['jobs_df']
+    crucial_jobs = list(jobs_df.index[jobs_df['Crucial'] == 1])
+    print(f"\n{name}: validate_solution vs slot by slot checks on {seeds} broken schedules")
+    matched = True
+    for seed in range(seeds):
+        schedule_df = broken_schedule(data_dict, seed)
+        start = time.perf_counter()
+        report = solution_report(schedule_df, data_dict['availability_df'], data_dict['skills_df'],
+                                 jobs_df, data_dict.get('max_roster_df'))
+        vectorized_time = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = reference_violations(schedule_df, data_dict['availability_df'], data_dict['skills_df'],
+                                        data_dict.get('max_roster_df'), crucial_jobs)
+        reference_time = time.perf_counter() - start
+
+        differences = []
+        for rule, fields in VIOLATION_KEYS.items():
+            flagged = {tuple(record[f] for f in fields) for record in report['violations'][rule]}
+            if flagged != expected[rule]:
+                differences.append(f"{rule}: {len(flagged - expected[rule])} extra, {len(expected[rule] - flagged)} missed")
+        counts = ", ".join(f"{rule} {len(found)}" for rule, found in expected.items())
+        print(f"  seed {seed}: {'same' if not differences else 'DIFFERENT'} ({counts}) "
+              f"in {vectorized_time * 1000:.1f}ms vs {reference_time * 1000:.1f}ms")
+        for difference in differences:
+            print(f"    {difference}")
+        matched = matched and not differences
+    return matched
+
+
+def check_objective(name, data_dict, time_limit=5):
+    """
+    Checks NeighborhoodSearch's objective evaluation against CP-SAT, with integer weights and with a
+    fractional one (which gives the model a floating point objective), and prints the results.
+
+    Returns:
+        bool: Whether objective_value matched CpSolver.ObjectiveValue, and the search's objective
+              and history matched its solution, in both cases.
+    """
+    print(f"\n{name}: objective_value vs CP-SAT")
+    matched = True
+    weights = {name: data_dict.get(name) for name in DEFAULT_WEIGHTS}
+    for label, extra in (("integer", {}), ("fractional", {'back_to_back_weight': (weights['back_to_back_weight'] or 50) + 0.5})):
+        solver_config = SolverConfig(max_time_in_seconds=time_limit, num_search_workers=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            schedule_model = ScheduleModel(**{**data_dict, **extra}, solver_config=solver_config)
+        floating = schedule_model.model.Proto().HasField('floating_point_objective')
+        solver, status = schedule_model.solve()
+        solution = solver.ResponseProto().solution
+        evaluated = objective_value(schedule_model.model, solution) if solution else None
+        solved = solver.ObjectiveValue() if solution else None
+
+        search = NeighborhoodSearch(schedule_model, sub_time_limit=min(1.0, time_limit))
+        search.run(time_limit)
+        objectives = [point['objective'] for point in search.history]
+        consistent = (abs(objective_value(schedule_model.model, search.solution) - search.objective) < 1e-6
+                      and all(b < a for a, b in zip(objectives, objectives[1:])))
+        ok = evaluated is not None and abs(evaluated - solved) < 1e-6 and consistent
+        print(f"  {label + ':':<11} {'floating point' if floating else 'integer'} objective, evaluated {evaluated} vs "
+              f"solver {solved}; search {search.info['initial_objective']} -> {search.objective} in "
+              f"{search.info['improvements']} improvements {'ok' if ok else 'MISMATCH'}")
+        matched = matched and ok
+    return matched
+
+
+def measure_import(module):
+    """
+    Imports a module in a fresh interpreter under python -X importtime.
+
+    Returns:
+        dict: Cumulative import time in ms, the slowest packages it pulled in, and any packages
+              it imported that IMPORT_LAYERS says it should not.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+    ).stderr
+    # Lines look like "import time:  self [us] | cumulative | imported.package", indented by depth.
+    # A module's own imports are the deeper-indented lines just before its line.
+    lines = re.findall(r"^import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)$", output, re.MULTILINE)
+    end = max(i for i, (_, _, name) in enumerate(lines) if name == module)
+    start = end
+    while start > 0 and len(lines[start - 1][1]) > len(lines[end][1]):
+        start -= 1
+    packages = {}
+    for cumulative, _, name in lines[start:end]:
+        top = name.split(".")[0]
+        packages[top] = max(packages.get(top, 0), int(cumulative))
+    return {
+        'module': module,
+        'import_ms': int(lines[end][0]) / 1000,
+        'slowest': {name: us / 1000 for name, us in sorted(packages.items(), key=lambda item: -item[1])[:5]},
+        'unexpected': [p for p in IMPORT_LAYERS.get(module, []) if p in packages],
+    }
+
+
+def run_import_benchmark(max_import_ms=None):
+    """Prints the import time of each layer; returns False if one breaks its layer or the time budget."""
+    ok = True
+    for module in IMPORT_LAYERS:
+        result = measure_import(module)
+        slowest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in result['slowest'].items())
+        print(f"{module:<18} {result['import_ms']:8.1f}ms   ({slowest})")
+        if result['unexpected']:
+            print(f"  -> imports {result['unexpected']} at load time")
+            ok = False
+        if max_import_ms is not None and result['import_ms'] > max_import_ms:
+            print(f"  -> over the {max_import_ms:.0f}ms budget")
+            ok = False
+    return ok
+
+
+def print_result(name, result):
+    print(f"\n{name}")
+    for k, v in result.items():
+        print(f"  {k}: {v}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--jobs", type=int, default=15)
+    parser.add_argument("--availability", type=float, default=0.6, help="Average fraction of weeks a synthetic member is available")
+    parser.add_argument("--skills", type=float, default=0.25, help="Average fraction of jobs a synthetic member can do")
+    parser.add_argument("--crucial-ratio", type=float, default=0.5, help="Fraction of synthetic jobs that are crucial")
+    parser.add_argument("--max-roster-ratio", type=float, default=0.2, help="Fraction of synthetic members with a max roster limit")
+    parser.add_argument("--profiles", type=int, default=None, help="Make synthetic members copies of this many distinct profiles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--suite", choices=list(SUITES), default=None, help="Run a predefined set of instances instead of demo + one synthetic")
+    parser.add_argument("--time-limit", type=float, default=60)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--weights", type=int, nargs=4, default=list(DEFAULT_WEIGHTS.values()),
+                        metavar=("TOTAL", "DEVIATION", "BACK_TO_BACK", "PROFICIENCY"), help="Objective weights, as in the app sliders")
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative increase over the baseline counted as a regression")
+    parser.add_argument("--rolling-window", type=int, default=None, help="Also solve with a rolling horizon of this many weeks and compare")
+    parser.add_argument("--overlap", type=int, default=2, help="Weeks of overlap between rolling horizon windows")
+    parser.add_argument("--compare-aggregation", action="store_true", help="Solve each instance with and without grouping interchangeable members, and compare")
+    parser.add_argument("--compare-quick", action="store_true", help="Run the QuickRoster heuristic on each instance and compare it with CP-SAT")
+    parser.add_argument("--compare-lns", action="store_true", help="Run large neighbourhood search on each instance and compare its objective over time with CP-SAT")
+    parser.add_argument("--lns-workers", type=int, default=1, help="With --compare-lns, neighbourhoods solved at once in separate processes")
+    parser.add_argument("--compare-template", action="store_true", help="Time building a model per request against instantiating a saved model template")
+    parser.add_argument("--check-objective", action="store_true", help="Check the LNS objective evaluation matches CP-SAT, with integer and fractional weights")
+    parser.add_argument("--check-validator", action="store_true", help="Check validate_solution flags the same violations as slot by slot checks")
+    parser.add_argument("--imports", action="store_true", help="Only measure cold start import times of each module")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="With --imports, fail if a module takes longer to import")
+    args = parser.parse_args()
+    if args.imports:
+        return 0 if run_import_benchmark(args.max_import_ms) else 1
+    weights = dict(zip(DEFAULT_WEIGHTS, args.weights))
+
+    instances = SUITES[args.suite] if args.suite else [
+        {'name': "demo"},
+        {
+            'name': f"synthetic {args.members}x{args.weeks}x{args.jobs}",
+            'n_members': args.members, 'n_weeks': args.weeks, 'n_jobs': args.jobs,
+            'availability': args.availability, 'skills': args.skills, 'crucial_ratio': args.crucial_ratio,
+            'max_roster_ratio': args.max_roster_ratio, 'n_profiles': args.profiles, 'seed': args.seed,
+        },
+    ]
+    if args.rolling_window:
+        for instance in instances:
+            compare_rolling(instance['name'], load_instance(instance, weights), args)
+        return 0
+    if args.compare_aggregation:
+        for instance in instances:
+            compare_aggregation(instance['name'], load_instance(instance, weights), args)
+        return 0
+    if args.compare_quick:
+        for instance in instances:
+            compare_quick(instance['name'], load_instance(instance, weights), args)
+        return 0
+    if args.compare_lns:
+        for instance in instances:
+            compare_lns(instance['name'], load_instance(instance, weights), args)
+        return 0
+    if args.compare_template:
+        for instance in instances:
+            compare_template(instance['name'], load_instance(instance, weights), args)
+        return 0
+    if args.check_objective:
+        matched = [check_objective(instance['name'], load_instance(instance, weights), min(args.time_limit, 5)) for instance in instances]
+        return 0 if all(matched) else 1
+    if args.check_validator:
+        matched = [check_validator(instance['name'], load_instance(instance, weights)) for instance in instances]
+        return 0 if all(matched) else 1
+
+    report = run_suite(instances, weights, args.time_limit, args.workers)
+    for run in report['runs']:
+        print_result(run['name'], run)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nReport written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(report, json.load(f), args.tolerance)
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,5 @@
 
+import numpy as np
 import pandas as pd
 def test_data(**kwargs):
 
@@ -50,38 +51,139 @@ def check_names(**kwargs):
         prev_df = df  # Update previous value for the next iteration
         prev_df_name = df_name
 
-def test_solution(solution_df, availability_df, skills_df):
+def test_solution(solution_df, availability_df, skills_df, jobs_df=None, max_roster_df=None, weeks=None):
     # Test Cases based on user custom choices
 
     # Basic Solution Test Cases
     # test_n_roster_constraint(solution_df, max_b2b = 2)
-    test_availability(solution_df, availability_df)
-    test_skill_match(solution_df, skills_df)
-
-def test_availability(solution_df, availability_df):
-    date_cols = solution_df.columns[1:]
-
-    for date in date_cols:
-        people = solution_df[date].dropna().values  # Get assigned people
-        
-        # Ensure all people exist in availability_df before checking availability
-        missing_people = [name for name in people if name not in availability_df.index]
-        assert not missing_people, f"Roster contains people not in availability data on {date}: {missing_people}"
-
-        # Find people assigned on a "taboo" date
-        unavailable_people = [name for name in people if not availability_df.loc[name, date]]
-        assert not unavailable_people, f"Rostered on a taboo date ({date}): {unavailable_people}"
-
-def test_skill_match(solution_df, skills_df):
-    temp_df = solution_df.set_index('Job')  # Set 'Job' as index
-
-    for job in temp_df.index:
-        people = temp_df.loc[job].dropna().values  # Get assigned people
-
-        # Check if they have the required skills
-        invalid_people = [person for person in people if not skills_df.loc[person, job]]
-        
-        assert not invalid_people, f"People without required skills for {job}: {invalid_people}"
+    report = solution_report(solution_df, availability_df, skills_df, jobs_df, max_roster_df, weeks)
+    check_report(report)
+    return report
+
+def solution_report(solution_df, availability_df, skills_df, jobs_df=None, max_roster_df=None, weeks=None):
+    """validate_solution report of a schedule, with the masks built from the input DataFrames."""
+    all_members = list(availability_df.index)
+    all_weeks = list(availability_df.columns)
+    all_jobs = list(skills_df.columns)
+    availability_mask = availability_df.reindex(index=all_members, columns=all_weeks).fillna(False).to_numpy(dtype=bool)
+    skills_mask = skills_df.reindex(index=all_members, columns=all_jobs).fillna(False).to_numpy(dtype=bool)
+    max_roster_limits = None
+    if isinstance(max_roster_df, pd.DataFrame):
+        max_roster_limits = max_roster_df["max_roster"].reindex(all_members).fillna(-1).to_numpy(dtype=np.int64)
+    crucial_jobs = list(jobs_df.index[jobs_df['Crucial'] == 1]) if isinstance(jobs_df, pd.DataFrame) else []
+
+    return validate_solution(
+        solution_df, all_members, all_weeks, all_jobs, availability_mask, skills_mask,
+        max_roster_limits=max_roster_limits, crucial_jobs=crucial_jobs, weeks=weeks,
+    )
+
+def check_report(report, max_examples=5):
+    """Raises an AssertionError listing every violated rule in a validate_solution report."""
+    lines = []
+    for rule, records in report['violations'].items():
+        if records:
+            examples = ", ".join(str(r) for r in records[:max_examples])
+            more = f" (and {len(records) - max_examples} more)" if len(records) > max_examples else ""
+            lines.append(f"{VIOLATION_MESSAGES[rule]}: {examples}{more}")
+    assert not lines, "Solution failed validation:\n" + "\n".join(lines)
+
+VIOLATION_MESSAGES = {
+    'unknown_job': "Roster contains jobs not in the jobs data",
+    'unknown_member': "Roster contains people not in availability data",
+    'unavailable': "Rostered on a taboo date",
+    'missing_skill': "People without required skills",
+    'multiple_jobs': "People rostered on more than one job in a week",
+    'max_roster': "People rostered more than their max roster",
+    'crucial_unfilled': "Crucial jobs left unfilled",
+}
+
+def validate_solution(solution_df, all_members, all_weeks, all_jobs, availability_mask, skills_mask,
+                      max_roster_limits=None, crucial_jobs=(), weeks=None):
+    """
+    Checks a schedule against the precomputed masks, with one NumPy pass per rule.
+
+    The schedule is turned into a job x week matrix of member indices (-1 for an empty slot),
+    so the cost does not grow with per-name lookups on large rosters.
+
+    Args:
+        solution_df (pd.DataFrame): Schedule shaped like SolutionViewer.generate_schedule_df.
+        all_members, all_weeks, all_jobs (list): Labels the masks are aligned to.
+        availability_mask (np.ndarray): M x W bool, as from DataProcessor.get_masks.
+        skills_mask (np.ndarray): M x J bool.
+        max_roster_limits (np.ndarray): M int, -1 for no limit. None skips the check.
+        crucial_jobs (list): Jobs that must be filled every checked week.
+        weeks (list): Weeks to check slot by slot (default every week in the schedule).
+                      Max roster always counts the whole schedule, taking unchecked weeks as given.
+
+    Returns:
+        dict: 'valid' (bool), 'checked_assignments' (int) and 'violations', a dict from rule
+              name to a list of offending records.
+    """
+    schedule = solution_df.set_index('Job') if 'Job' in solution_df.columns else solution_df
+    week_lookup = {str(w): i for i, w in enumerate(all_weeks)}
+    job_lookup = {j: i for i, j in enumerate(all_jobs)}
+
+    columns = [c for c in schedule.columns if str(c) in week_lookup]
+    rows = [j for j in schedule.index if j in job_lookup]
+    week_idx = np.array([week_lookup[str(c)] for c in columns], dtype=np.int64)
+    job_idx = np.array([job_lookup[j] for j in rows], dtype=np.int64)
+    checked_weeks = {str(w) for w in weeks} if weeks is not None else set(week_lookup)
+    checked = np.array([str(c) in checked_weeks for c in columns], dtype=bool)
+
+    # Job x week matrix of member indices into all_members
+    names = schedule.loc[rows, columns].to_numpy(dtype=object)
+    assigned = pd.notna(names)
+    member_idx = pd.Index(all_members).get_indexer(names.ravel()).reshape(names.shape)
+    member_idx[~assigned] = -1
+    unknown = assigned & (member_idx == -1)
+    known = (member_idx >= 0) & checked[None, :]
+
+    r, c = np.nonzero(known)
+    m, w, j = member_idx[r, c], week_idx[c], job_idx[r]
+
+    def records(rr, cc):
+        return [{'member': names[a, b], 'week': columns[b], 'job': rows[a]} for a, b in zip(rr, cc)]
+
+    violations = {
+        'unknown_job': [{'job': j} for j in schedule.index if j not in job_lookup],
+        'unknown_member': records(*np.nonzero(unknown & checked[None, :])),
+    }
+
+    bad = ~availability_mask[m, w]
+    violations['unavailable'] = records(r[bad], c[bad])
+    bad = ~skills_mask[m, j]
+    violations['missing_skill'] = records(r[bad], c[bad])
+
+    # A member appearing more than once in a week column
+    counts = np.zeros((len(all_members), len(columns)), dtype=np.int64)
+    np.add.at(counts, (m, c), 1)
+    violations['multiple_jobs'] = [
+        {'member': all_members[a], 'week': columns[b], 'jobs': [rows[x] for x in np.flatnonzero(member_idx[:, b] == a)]}
+        for a, b in np.argwhere(counts > 1)
+    ]
+
+    violations['max_roster'] = []
+    if max_roster_limits is not None:
+        totals = np.bincount(member_idx[member_idx >= 0], minlength=len(all_members))
+        # Assignments in unchecked weeks are taken as given, even if they alone exceed the limit
+        given = member_idx[:, ~checked]
+        limits = np.maximum(max_roster_limits, np.bincount(given[given >= 0], minlength=len(all_members)))
+        over = np.flatnonzero((max_roster_limits >= 0) & (totals > limits))
+        violations['max_roster'] = [
+            {'member': all_members[a], 'assignments': int(totals[a]), 'max_roster': int(max_roster_limits[a])} for a in over
+        ]
+
+    crucial_rows = np.isin(np.array(rows, dtype=object), list(crucial_jobs))
+    missing = [j for j in crucial_jobs if j not in schedule.index]
+    violations['crucial_unfilled'] = [
+        {'week': columns[b], 'job': rows[a]} for a, b in np.argwhere(crucial_rows[:, None] & ~assigned & checked[None, :])
+    ] + [{'week': columns[b], 'job': j} for j in missing for b in np.flatnonzero(checked)]
+
+    return {
+        'valid': not any(violations.values()),
+        'checked_assignments': int(known.sum()),
+        'violations': violations,
+    }
 
 # def test_n_roster_constraint(solution_df, max_b2b):
 #     counter = {}